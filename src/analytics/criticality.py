@@ -0,0 +1,407 @@
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from typing import Callable, Collection, Dict, Hashable, List, Optional, Sequence, Tuple
+from data_structures.graph import Graph
+from data_structures.arrays import gather
+from monitoring.metrics import timed
+from .risk import _matches
+
+# Array name -> (shared memory block name, dtype, shape); small enough to send with every task
+Handle = Dict[str, Tuple[str, str, Tuple[int, ...]]]
+Path = Tuple[int, ...]
+
+TASKS_PER_WORKER = 4  # more chunks than workers, so one slow chunk does not idle the rest
+# Worker side: shared arrays this process has attached, by the name of their first block
+_attached: Dict[str, Tuple[List[shared_memory.SharedMemory], Dict[str, np.ndarray]]] = {}
+
+
+class SharedArrays:
+    """NumPy arrays copied into shared memory blocks, owned by the creating process.
+
+    handle is all another process needs to map the same memory (attach()),
+    so tasks carry a few names instead of a pickled copy of the arrays.
+    close() unlinks the blocks; views of arrays must not outlive it.
+    """
+
+    def __init__(self, **arrays: np.ndarray):
+        self._blocks: List[shared_memory.SharedMemory] = []
+        self.handle: Handle = {}
+        for key, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+            self._blocks.append(block)
+            self.handle[key] = (block.name, array.dtype.str, array.shape)
+        self.arrays: Optional[Dict[str, np.ndarray]] = _views(self._blocks, self.handle)
+
+    def close(self) -> None:
+        if self.arrays is None:
+            return
+        self.arrays = None
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+
+    def __enter__(self) -> "SharedArrays":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _views(blocks: List[shared_memory.SharedMemory], handle: Handle) -> Dict[str, np.ndarray]:
+    views = {}
+    for block, (key, (_, dtype, shape)) in zip(blocks, handle.items()):
+        view = np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+        view.flags.writeable = False
+        views[key] = view
+    return views
+
+
+def _key(handle: Handle) -> str:
+    return next(iter(handle.values()))[0]
+
+
+def attach(handle: Handle, live: Optional[Collection[str]] = None) -> Dict[str, np.ndarray]:
+    """Read-only views of the arrays behind handle, mapped once per process.
+
+    live is the set of keys (first block names) the parent still holds;
+    attached arrays outside it are closed first, since their blocks have
+    been unlinked and the mapping is all that keeps the memory alive.
+    """
+    if live is not None:
+        for stale in [key for key in _attached if key not in live]:
+            blocks, views = _attached.pop(stale)
+            del views
+            for block in blocks:
+                block.close()
+    key = _key(handle)
+    if key not in _attached:
+        blocks = [shared_memory.SharedMemory(name=name) for name, _, _ in handle.values()]
+        _attached[key] = (blocks, _views(blocks, handle))
+    return _attached[key][1]
+
+
+def _in_worker(fn: Callable, handles: Sequence[Handle], live: Collection[str], *args):
+    return fn(*[attach(handle, live) for handle in handles], *args)
+
+
+class SharedSnapshot(SharedArrays):
+    """Compact read-only CSR adjacency of a Graph in shared memory.
+
+    Node positions follow graph.node_ids(). Only edges whose name is in
+    edges are kept (all edges when None); an undirected graph stores both
+    directions. Arrays: offsets/targets (targets of node i are
+    targets[offsets[i]:offsets[i + 1]]) and the risk_column of each entry.
+    """
+
+    def __init__(self, graph: Graph, edges: Optional[Sequence[str]] = None, risk_column: str = "risk_score"):
+        self.nodes = pd.Index(graph.node_ids(), dtype=object, tupleize_cols=False)
+        self.version = graph.version
+        src, dst = graph.edge_index()
+        risk = np.asarray(graph.edge_values(risk_column), dtype=float)
+        if edges is not None:
+            keep = _matches(graph.edge_values("name"), edges)
+            src, dst, risk = src[keep], dst[keep], risk[keep]
+        if not graph.properties.directed:
+            src, dst, risk = np.concatenate([src, dst]), np.concatenate([dst, src]), np.concatenate([risk, risk])
+        n = len(self.nodes)
+        order = np.argsort(src, kind="stable")
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=offsets[1:])
+        super().__init__(offsets=offsets, targets=dst[order].astype(np.int64), risk=risk[order])
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+
+# -- per-source work, run in worker processes ---------------------------------
+
+def _expand(offsets: np.ndarray, targets: np.ndarray, frontier: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(tail, head) of every edge leaving frontier"""
+    tails = np.repeat(frontier, offsets[frontier + 1] - offsets[frontier])
+    return tails, targets[gather(offsets, frontier)]
+
+
+def _dependencies(offsets: np.ndarray, targets: np.ndarray, source: int, dist: np.ndarray,
+                  sigma: np.ndarray, delta: np.ndarray, total: np.ndarray) -> None:
+    """Add source's Brandes dependencies to total; dist/sigma/delta are scratch buffers left reset"""
+    dist[source], sigma[source] = 0, 1.0
+    frontier = np.array([source])
+    visited, levels = [frontier], []
+    depth = 0
+    # Level-synchronous BFS counting shortest paths (sigma), one array op per level
+    while len(frontier):
+        depth += 1
+        tails, heads = _expand(offsets, targets, frontier)
+        frontier = np.unique(heads[dist[heads] < 0])
+        dist[frontier] = depth
+        on_path = dist[heads] == depth
+        tails, heads = tails[on_path], heads[on_path]
+        np.add.at(sigma, heads, sigma[tails])
+        levels.append((tails, heads))
+        visited.append(frontier)
+    # Dependencies flow back from the deepest level
+    for tails, heads in reversed(levels):
+        np.add.at(delta, tails, sigma[tails] / sigma[heads] * (1.0 + delta[heads]))
+    reached = np.concatenate(visited)
+    total[reached[1:]] += delta[reached[1:]]
+    dist[reached], sigma[reached], delta[reached] = -1, 0.0, 0.0
+
+
+def _betweenness_chunk(snapshot: Dict[str, np.ndarray], sources: np.ndarray) -> np.ndarray:
+    offsets, targets = snapshot["offsets"], snapshot["targets"]
+    n = len(offsets) - 1
+    dist, sigma, delta, total = np.full(n, -1, dtype=np.int64), np.zeros(n), np.zeros(n), np.zeros(n)
+    for source in sources:
+        _dependencies(offsets, targets, int(source), dist, sigma, delta, total)
+    return total
+
+
+def _shortest_path(offsets: np.ndarray, targets: np.ndarray, start: int, is_target: np.ndarray,
+                   blocked: np.ndarray, skip: List[int], hops: int, parent: np.ndarray) -> Optional[Path]:
+    """Fewest-hop path from start to the nearest target avoiding blocked nodes and start -> skip edges.
+
+    Targets end a path (they are not expanded). parent is a scratch
+    buffer of -1s, left reset.
+    """
+    frontier = np.array([start])
+    parent[start] = start
+    seen, found = [frontier], -1
+    for hop in range(hops):
+        tails, heads = _expand(offsets, targets, frontier)
+        keep = (parent[heads] < 0) & ~blocked[heads]
+        if hop == 0 and skip:
+            keep &= ~np.isin(heads, skip)
+        heads, first = np.unique(heads[keep], return_index=True)
+        if not len(heads):
+            break
+        parent[heads] = tails[keep][first]
+        seen.append(heads)
+        hits = heads[is_target[heads]]
+        if len(hits):
+            found = int(hits[0])
+            break
+        frontier = heads
+    path = None
+    if found >= 0:
+        path = [found]
+        while path[-1] != start:
+            path.append(int(parent[path[-1]]))
+        path = tuple(reversed(path))
+    parent[np.concatenate(seen)] = -1
+    return path
+
+
+def _k_shortest(offsets: np.ndarray, targets: np.ndarray, source: int, is_target: np.ndarray, k: int,
+                max_hops: int, blocked: np.ndarray, parent: np.ndarray) -> List[Path]:
+    """Yen's k shortest simple paths from source to any target, fewest hops first"""
+    first = _shortest_path(offsets, targets, source, is_target, blocked, [], max_hops, parent)
+    if first is None:
+        return []
+    paths, candidates, queued = [first], [], {first}
+    while len(paths) < k:
+        last = paths[-1]
+        for i in range(len(last) - 1):
+            root = last[:i + 1]
+            skip = [path[i + 1] for path in paths if path[:i + 1] == root]
+            blocked[list(root[:-1])] = True
+            spur = _shortest_path(offsets, targets, last[i], is_target, blocked, skip, max_hops - i, parent)
+            blocked[list(root[:-1])] = False
+            if spur is not None:
+                path = root[:-1] + spur
+                if path not in queued:
+                    queued.add(path)
+                    heapq.heappush(candidates, (len(path), path))
+        if not candidates:
+            break
+        paths.append(heapq.heappop(candidates)[1])
+    return paths
+
+
+def _path_risk(offsets: np.ndarray, targets: np.ndarray, risk: np.ndarray, path: Path) -> float:
+    """Highest risk_score on the path's edges (NaN when none is scored)"""
+    scores = []
+    for tail, head in zip(path[:-1], path[1:]):
+        lo, hi = offsets[tail], offsets[tail + 1]
+        scores.append(risk[lo + np.flatnonzero(targets[lo:hi] == head)[0]])
+    scores = np.array(scores)
+    return float(np.nanmax(scores)) if not np.isnan(scores).all() else np.nan
+
+
+def _attack_paths_chunk(snapshot: Dict[str, np.ndarray], goal: Dict[str, np.ndarray], sources: np.ndarray,
+                        k: int, max_hops: int) -> List[Tuple[int, int, Path, float]]:
+    offsets, targets, risk = snapshot["offsets"], snapshot["targets"], snapshot["risk"]
+    n = len(offsets) - 1
+    blocked, parent = np.zeros(n, dtype=bool), np.full(n, -1, dtype=np.int64)
+    rows = []
+    for source in sources:
+        paths = _k_shortest(offsets, targets, int(source), goal["is_target"], k, max_hops, blocked, parent)
+        for rank, path in enumerate(paths, 1):
+            rows.append((int(source), rank, path, _path_risk(offsets, targets, risk, path)))
+    return rows
+
+
+# -- the parent side ------------------------------------------------------------
+
+class GraphAnalytics:
+    """Attack paths and node criticality over a Graph, fanned out to worker processes.
+
+    The graph is copied once per edge selection into a SharedSnapshot;
+    workers of a ProcessPoolExecutor map it by name and each task only
+    carries a chunk of source positions, so per-source work (one BFS per
+    betweenness source, Yen's algorithm per threat) scales with the
+    number of processes. Snapshots are rebuilt when Graph.version
+    changes. workers=1 runs everything in this process. Call close() (or
+    use as a context manager) to stop the pool and free the shared memory.
+    """
+
+    def __init__(self, graph: Graph, workers: Optional[int] = None, risk_column: str = "risk_score",
+                 threat_type: str = "threat"):
+        self.graph = graph
+        self.workers = workers or os.cpu_count() or 1
+        self.risk_column = risk_column
+        self.threat_type = threat_type
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._snapshots: Dict[Optional[Tuple[str, ...]], SharedSnapshot] = {}
+
+    def snapshot(self, edges: Optional[Sequence[str]] = None) -> SharedSnapshot:
+        """Shared snapshot of the given edge names (all when None), cached until the graph changes"""
+        key = tuple(edges) if edges is not None else None
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None and snapshot.version != self.graph.version:
+            snapshot.close()
+            snapshot = None
+        if snapshot is None:
+            snapshot = self._snapshots[key] = SharedSnapshot(self.graph, edges, self.risk_column)
+        return snapshot
+
+    def _map(self, fn: Callable, shared: Sequence[SharedArrays], sources: np.ndarray, *args) -> List:
+        """fn(*arrays, chunk, *args) for chunks of sources, in worker processes unless workers == 1"""
+        if not len(sources):
+            return []
+        if self.workers == 1:
+            return [fn(*[item.arrays for item in shared], sources, *args)]
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        chunks = np.array_split(sources, min(len(sources), self.workers * TASKS_PER_WORKER))
+        handles = [item.handle for item in shared]
+        # Let workers drop arrays the parent has since freed, e.g. snapshots of an older graph version
+        live = frozenset(_key(item.handle) for item in [*shared, *self._snapshots.values()])
+        futures = [self._pool.submit(_in_worker, fn, handles, live, chunk, *args) for chunk in chunks]
+        return [future.result() for future in futures]
+
+    def _positions(self, snapshot: SharedSnapshot, nodes: Optional[Sequence[Hashable]], asset_type: str) -> np.ndarray:
+        if nodes is None:
+            return np.flatnonzero(_matches(self.graph.node_values("asset_type"), [asset_type]))
+        positions = snapshot.nodes.get_indexer(list(nodes))
+        return positions[positions >= 0]
+
+    @timed()
+    def attack_paths(self, k: int = 3, threats: Optional[Sequence[Hashable]] = None,
+                     targets: Optional[Sequence[Hashable]] = None, target_type: str = "server",
+                     edges: Optional[Sequence[str]] = None, max_hops: int = 10) -> pd.DataFrame:
+        """Up to k fewest-hop simple paths from each threat to any target, shortest and riskiest first.
+
+        Threats default to nodes of threat_type and targets to nodes of
+        target_type; a path ends at the first target it reaches. risk is
+        the highest risk_column on the path's edges.
+        """
+        snapshot = self.snapshot(edges)
+        sources = self._positions(snapshot, threats, self.threat_type)
+        is_target = np.zeros(len(snapshot), dtype=bool)
+        is_target[self._positions(snapshot, targets, target_type)] = True
+        with SharedArrays(is_target=is_target) as goal:
+            chunks = self._map(_attack_paths_chunk, [snapshot, goal], sources, k, max_hops)
+        rows = [row for chunk in chunks for row in chunk]
+        nodes = snapshot.nodes
+        frame = pd.DataFrame({
+            "threat": nodes[[source for source, _, _, _ in rows]],
+            "rank": np.array([rank for _, rank, _, _ in rows], dtype=np.int64),
+            "target": nodes[[path[-1] for _, _, path, _ in rows]],
+            "hops": np.array([len(path) - 1 for _, _, path, _ in rows], dtype=np.int64),
+            "risk": np.array([risk for _, _, _, risk in rows], dtype=float),
+            "path": [list(nodes[list(path)]) for _, _, path, _ in rows],
+        })
+        return frame.sort_values(["hops", "risk", "rank"], ascending=[True, False, True], ignore_index=True)
+
+    @timed()
+    def betweenness(self, edges: Optional[Sequence[str]] = ("connects",), k: Optional[int] = None,
+                    seed: Optional[int] = None, normalized: bool = True) -> pd.DataFrame:
+        """Shortest-path (hop count) betweenness of every node, highest first.
+
+        With k, only k sampled sources are searched and the sums are
+        scaled by n / k: an estimate whose cost is k BFS instead of n.
+        Scaling matches nx.betweenness_centrality.
+        """
+        snapshot = self.snapshot(edges)
+        n = len(snapshot)
+        sources = np.arange(n)
+        if k is not None and k < n:
+            sources = np.sort(np.random.default_rng(seed).choice(n, k, replace=False))
+        scores = np.zeros(n)
+        for chunk in self._map(_betweenness_chunk, [snapshot], sources):
+            scores += chunk
+        scale = None
+        if normalized:
+            scale = 1.0 / ((n - 1) * (n - 2)) if n > 2 else None
+        elif not self.graph.properties.directed:
+            scale = 0.5
+        if scale is not None:
+            if len(sources) < n:
+                scale *= n / len(sources)
+            scores *= scale
+        return (pd.DataFrame({"node_id": snapshot.nodes, "betweenness": scores})
+                .sort_values("betweenness", ascending=False, ignore_index=True))
+
+    @timed()
+    def pagerank(self, edges: Optional[Sequence[str]] = ("connects",), alpha: float = 0.85,
+                 tol: float = 1e-6, max_iter: int = 100) -> pd.DataFrame:
+        """PageRank of every node, highest first (same convergence rule as nx.pagerank).
+
+        One power iteration is a bincount over the edges, so this runs
+        in-process; it does not need the pool.
+        """
+        snapshot = self.snapshot(edges)
+        offsets, targets = snapshot.arrays["offsets"], snapshot.arrays["targets"]
+        n = len(snapshot)
+        out_degree = np.diff(offsets)
+        tails = np.repeat(np.arange(n), out_degree)
+        dangling = out_degree == 0
+        rank = np.full(n, 1.0 / n)
+        for _ in range(max_iter):
+            share = np.where(dangling, 0.0, rank / np.maximum(out_degree, 1))
+            updated = (alpha * np.bincount(targets, weights=share[tails], minlength=n)
+                       + (alpha * rank[dangling].sum() + 1.0 - alpha) / n)
+            change = np.abs(updated - rank).sum()
+            rank = updated
+            if change < n * tol:
+                break
+        return (pd.DataFrame({"node_id": snapshot.nodes, "pagerank": rank})
+                .sort_values("pagerank", ascending=False, ignore_index=True))
+
+    def criticality(self, edges: Optional[Sequence[str]] = ("connects",), k: Optional[int] = None,
+                    seed: Optional[int] = None) -> pd.DataFrame:
+        """Betweenness and PageRank side by side with asset_type, most between first"""
+        types = pd.Series(self.graph.node_values("asset_type"), index=self.snapshot(edges).nodes, dtype=object)
+        frame = self.betweenness(edges, k, seed).merge(self.pagerank(edges), on="node_id", sort=False)
+        return frame.assign(asset_type=frame["node_id"].map(types))[["node_id", "asset_type", "betweenness",
+                                                                    "pagerank"]]
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        for snapshot in self._snapshots.values():
+            snapshot.close()
+        self._snapshots.clear()
+
+    def __enter__(self) -> "GraphAnalytics":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
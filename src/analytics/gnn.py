@@ -0,0 +1,230 @@
+import time
+import numpy as np
+import pandas as pd
+import torch
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence, Tuple
+from data_structures.graph import Graph
+from .risk import RiskPropagation
+
+
+@dataclass
+class GraphTensors:
+    """Node features and neighbour lists of a graph, ready for message passing.
+
+    features holds one row per node of nodes: a one-hot asset_type
+    followed by log1p in/out degree and log1p sum/max of the risk_score
+    on incident edges. indptr/indices list the neighbours of every node
+    in both edge directions (CSR over node positions); they stay NumPy
+    arrays for the sampler.
+    """
+    nodes: pd.Index
+    features: torch.Tensor
+    feature_names: List[str]
+    indptr: np.ndarray
+    indices: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def adjacency(self) -> torch.Tensor:
+        """Row-normalized sparse adjacency (mean over neighbours) for full-batch propagation"""
+        counts = np.diff(self.indptr)
+        rows = np.repeat(np.arange(len(self.nodes)), counts)
+        values = 1.0 / counts[rows]
+        return torch.sparse_csr_tensor(torch.from_numpy(self.indptr), torch.from_numpy(self.indices),
+                                       torch.from_numpy(values.astype(np.float32)), size=(len(self), len(self)))
+
+
+def graph_tensors(graph: Any, asset_types: Optional[Sequence[str]] = None,
+                  risk_column: str = "risk_score") -> GraphTensors:
+    """GraphTensors of a Graph or NetworkX graph (e.g. create_asset_graph()).
+
+    asset_types fixes the one-hot columns, so a model trained on one
+    graph can score another; by default they are the types present.
+    """
+    if not isinstance(graph, Graph):
+        graph = Graph.from_networkx(graph)
+    nodes = pd.Index(graph.node_ids(), dtype=object, tupleize_cols=False)
+    n = len(nodes)
+    src, dst = graph.edge_index()
+    types = pd.Series(graph.node_values("asset_type"), dtype=object).fillna("unknown").astype(str)
+    categories = list(asset_types) if asset_types is not None else sorted(types.unique())
+    codes = pd.Categorical(types, categories=categories).codes
+    one_hot = np.zeros((n, len(categories)), dtype=np.float32)
+    one_hot[np.flatnonzero(codes >= 0), codes[codes >= 0]] = 1.0
+
+    risk = np.nan_to_num(np.asarray(graph.edge_values(risk_column), dtype=float)) if len(src) else np.zeros(0)
+    ends = np.concatenate([src, dst])
+    incident = np.concatenate([risk, risk])
+    risk_max = np.zeros(n)
+    np.maximum.at(risk_max, ends, incident)
+    numeric = np.column_stack([
+        np.bincount(dst, minlength=n), np.bincount(src, minlength=n),
+        np.bincount(ends, weights=incident, minlength=n), risk_max,
+    ])
+    features = np.hstack([one_hot, np.log1p(numeric).astype(np.float32)])
+
+    order = np.argsort(ends, kind="stable")
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(ends, minlength=n), out=indptr[1:])
+    indices = np.concatenate([dst, src])[order]
+    names = [f"asset_type={name}" for name in categories] + ["in_degree", "out_degree", "risk_sum", "risk_max"]
+    return GraphTensors(nodes, torch.from_numpy(features), names, indptr, indices)
+
+
+@dataclass
+class Block:
+    """One layer of a sampled computation graph: edges from src nodes into the first num_dst of them"""
+    num_dst: int
+    num_src: int
+    dst: np.ndarray  # local positions < num_dst
+    src: np.ndarray  # local positions < num_src
+
+    def matrix(self) -> torch.Tensor:
+        """(num_dst, num_src) sparse matrix averaging over each dst node's sampled neighbours"""
+        counts = np.bincount(self.dst, minlength=self.num_dst)
+        values = torch.from_numpy((1.0 / counts[self.dst]).astype(np.float32))
+        index = torch.from_numpy(np.vstack([self.dst, self.src]))
+        return torch.sparse_coo_tensor(index, values, (self.num_dst, self.num_src)).coalesce()
+
+
+class NeighborSampler:
+    """GraphSAGE-style neighbour sampling over a CSR adjacency.
+
+    For each layer, nodes with at most fanout neighbours keep all of
+    them and the rest draw fanout neighbours with replacement, so the
+    computation graph of a batch is bounded by batch * prod(fanouts)
+    whatever the size of the graph. Everything is vectorized over the
+    batch.
+    """
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, fanouts: Sequence[int] = (10, 10), seed: int = 0):
+        self.indptr = indptr
+        self.indices = indices
+        self.fanouts = list(fanouts)
+        self.rng = np.random.default_rng(seed)
+
+    def _neighbours(self, nodes: np.ndarray, fanout: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(position in nodes, neighbour id) pairs"""
+        starts = self.indptr[nodes]
+        degree = self.indptr[nodes + 1] - starts
+        full = np.flatnonzero((degree > 0) & (degree <= fanout))
+        counts = degree[full]
+        # All neighbours of low-degree nodes
+        offsets = np.repeat(starts[full] - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        dst_full = np.repeat(full, counts)
+        # fanout draws for the others
+        sampled = np.flatnonzero(degree > fanout)
+        dst_sampled = np.repeat(sampled, fanout)
+        picks = starts[dst_sampled] + (self.rng.random(len(dst_sampled)) * degree[dst_sampled]).astype(np.int64)
+        return (np.concatenate([dst_full, dst_sampled]),
+                self.indices[np.concatenate([offsets, picks])])
+
+    def sample(self, targets: np.ndarray) -> Tuple[np.ndarray, List[Block]]:
+        """Input node ids and blocks (first layer first) computing the targets"""
+        nodes = np.asarray(targets, dtype=np.int64)
+        blocks = []
+        for fanout in reversed(self.fanouts):
+            dst, neighbours = self._neighbours(nodes, fanout)
+            # Destination nodes first, then new neighbours in order of appearance
+            local, frontier = pd.factorize(np.concatenate([nodes, neighbours]))
+            blocks.append(Block(len(nodes), len(frontier), dst, local[len(nodes):]))
+            nodes = np.asarray(frontier, dtype=np.int64)
+        return nodes, blocks[::-1]
+
+
+class GraphSAGE(torch.nn.Module):
+    """Mean-aggregator GraphSAGE with a sigmoid risk head.
+
+    Layer i computes relu(W_self h_v + W_neigh mean(h_u for sampled u));
+    the output is a score in [0, 1] per target node.
+    """
+
+    def __init__(self, in_features: int, hidden: int = 64, layers: int = 2):
+        super().__init__()
+        sizes = [in_features] + [hidden] * layers
+        self.self_linear = torch.nn.ModuleList(torch.nn.Linear(a, b) for a, b in zip(sizes[:-1], sizes[1:]))
+        self.neigh_linear = torch.nn.ModuleList(torch.nn.Linear(a, b, bias=False) for a, b in zip(sizes[:-1], sizes[1:]))
+        self.output = torch.nn.Linear(hidden, 1)
+
+    def forward(self, blocks: Sequence[torch.Tensor], x: torch.Tensor) -> torch.Tensor:
+        """Scores of the dst nodes of the last block; x are the features of the first block's src nodes"""
+        h = x
+        for block, self_linear, neigh_linear in zip(blocks, self.self_linear, self.neigh_linear):
+            h = torch.relu(self_linear(h[:block.shape[0]]) + neigh_linear(torch.sparse.mm(block, h)))
+        return torch.sigmoid(self.output(h)).squeeze(-1)
+
+    def full_graph(self, adjacency: torch.Tensor, x: torch.Tensor) -> torch.Tensor:
+        """Scores of every node without sampling (graph must fit in memory)"""
+        return self.forward([adjacency] * len(self.self_linear), x)
+
+
+@dataclass
+class RunStats:
+    """Nodes processed and throughput of a training or inference run"""
+    nodes: int = 0
+    seconds: float = 0.0
+    loss: Optional[float] = None
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.seconds if self.seconds else 0.0
+
+
+def risk_targets(graph: Any, tensors: GraphTensors, scale: float = 10.0) -> np.ndarray:
+    """Training targets: propagated exposure (RiskPropagation) / scale per asset, NaN for threats"""
+    if not isinstance(graph, Graph):
+        graph = Graph.from_networkx(graph)
+    exposure = RiskPropagation(graph).run()
+    return (exposure.reindex(tensors.nodes).to_numpy(dtype=float) / scale).clip(0.0, 1.0)
+
+
+def _batches(nodes: np.ndarray, batch_size: int) -> List[np.ndarray]:
+    return [nodes[start:start + batch_size] for start in range(0, len(nodes), batch_size)]
+
+
+def train_risk_model(tensors: GraphTensors, targets: np.ndarray, model: Optional[GraphSAGE] = None,
+                     epochs: int = 3, batch_size: int = 1024, fanouts: Sequence[int] = (10, 10),
+                     lr: float = 0.01, seed: int = 0) -> Tuple[GraphSAGE, RunStats]:
+    """Fit a GraphSAGE model to targets (NaN = unlabeled) with mini-batches of sampled neighbourhoods"""
+    torch.manual_seed(seed)
+    model = model or GraphSAGE(tensors.features.shape[1], layers=len(fanouts))
+    sampler = NeighborSampler(tensors.indptr, tensors.indices, fanouts, seed)
+    optimizer = torch.optim.Adam(model.parameters(), lr=lr)
+    labeled = np.flatnonzero(~np.isnan(targets))
+    y = torch.from_numpy(np.nan_to_num(targets).astype(np.float32))
+    rng = np.random.default_rng(seed)
+    stats = RunStats()
+    start = time.perf_counter()
+    model.train()
+    for _ in range(epochs):
+        for batch in _batches(rng.permutation(labeled), batch_size):
+            inputs, blocks = sampler.sample(batch)
+            scores = model([block.matrix() for block in blocks], tensors.features[torch.from_numpy(inputs)])
+            loss = torch.nn.functional.mse_loss(scores, y[torch.from_numpy(batch)])
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            stats.nodes += len(batch)
+            stats.loss = float(loss)
+    stats.seconds = time.perf_counter() - start
+    model.eval()
+    return model, stats
+
+
+def predict_risk(model: GraphSAGE, tensors: GraphTensors, batch_size: int = 4096,
+                 fanouts: Optional[Sequence[int]] = None, seed: int = 0) -> Tuple[pd.Series, RunStats]:
+    """Risk score of every node, computed batch by batch over sampled neighbourhoods"""
+    sampler = NeighborSampler(tensors.indptr, tensors.indices, fanouts or [10] * len(model.self_linear), seed)
+    scores = np.empty(len(tensors), dtype=np.float32)
+    stats = RunStats()
+    start = time.perf_counter()
+    with torch.inference_mode():
+        for batch in _batches(np.arange(len(tensors)), batch_size):
+            inputs, blocks = sampler.sample(batch)
+            scores[batch] = model([block.matrix() for block in blocks],
+                                  tensors.features[torch.from_numpy(inputs)]).numpy()
+            stats.nodes += len(batch)
+    stats.seconds = time.perf_counter() - start
+    return pd.Series(scores, index=tensors.nodes, name="gnn_risk"), stats
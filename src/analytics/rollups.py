@@ -0,0 +1,201 @@
+import json
+import os
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+# Bucket widths in seconds, finest first
+GRANULARITIES = {"minute": 60, "hour": 3_600, "day": 86_400}
+
+
+def epoch_seconds(timestamps) -> np.ndarray:
+    """Seconds since the epoch for datetime-like values"""
+    return np.asarray(pd.to_datetime(timestamps), dtype="datetime64[s]").astype(np.int64)
+
+
+def _grow(array: np.ndarray, rows: int) -> np.ndarray:
+    """array with room for at least rows rows, doubling the capacity"""
+    if rows <= len(array):
+        return array
+    grown = np.zeros((max(rows, 2 * len(array)),) + array.shape[1:], dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class Rollup:
+    """Event counts per time bucket and key at one granularity.
+
+    Buckets are kept sorted, with a running prefix sum over them, so the
+    total for any bucket range is two binary searches and one subtraction.
+    Appends in time order only touch the last rows; late events shift the
+    arrays once per batch.
+    """
+
+    def __init__(self, width: int, keys: Sequence[Hashable] = ()):
+        self.width = width
+        self.keys: List[Hashable] = list(keys)
+        self.codes: Dict[Hashable, int] = {key: i for i, key in enumerate(self.keys)}
+        self.size = 0
+        self.buckets = np.zeros(0, dtype=np.int64)
+        self.counts = np.zeros((0, len(self.keys)), dtype=np.int64)
+        # prefix[i] = counts[:i].sum(axis=0)
+        self.prefix = np.zeros((1, len(self.keys)), dtype=np.int64)
+
+    def _add_keys(self, keys: Sequence[Hashable]) -> None:
+        new = [key for key in dict.fromkeys(keys) if key not in self.codes]
+        if not new:
+            return
+        for key in new:
+            self.codes[key] = len(self.keys)
+            self.keys.append(key)
+        self.counts = np.pad(self.counts, ((0, 0), (0, len(new))))
+        self.prefix = np.pad(self.prefix, ((0, 0), (0, len(new))))
+
+    def add(self, seconds: np.ndarray, keys: Sequence[Hashable]) -> None:
+        """Count events at the given epoch seconds with the given keys"""
+        if not len(seconds):
+            return
+        codes, labels = pd.factorize(pd.Series(keys, dtype=object))
+        if (codes < 0).any():
+            # Events without a key are not counted
+            seconds, codes = seconds[codes >= 0], codes[codes >= 0]
+            if not len(seconds):
+                return
+        self._add_keys(labels.tolist())
+        codes = np.array([self.codes[key] for key in labels], dtype=np.int64)[codes]
+        k = len(self.keys)
+        buckets, rows = np.unique(seconds // self.width, return_inverse=True)
+        batch = np.bincount(rows * k + codes, minlength=len(buckets) * k).reshape(len(buckets), k)
+        existing = self.buckets[:self.size]
+        position = np.searchsorted(existing, buckets)
+        found = np.zeros(len(buckets), dtype=bool)
+        inside = position < self.size
+        found[inside] = existing[position[inside]] == buckets[inside]
+        np.add.at(self.counts, position[found], batch[found])
+        start = int(position.min())
+        new = ~found
+        if new.any():
+            if (position[new] == self.size).all():
+                # In time order: new buckets go at the end
+                end = self.size + int(new.sum())
+                self.buckets = _grow(self.buckets, end)
+                self.counts = _grow(self.counts, end)
+                self.buckets[self.size:end] = buckets[new]
+                self.counts[self.size:end] = batch[new]
+            else:
+                end = self.size + int(new.sum())
+                self.buckets = np.insert(existing, position[new], buckets[new])
+                self.counts = np.insert(self.counts[:self.size], position[new], batch[new], axis=0)
+            self.size = end
+        self.prefix = _grow(self.prefix, self.size + 1)
+        self.prefix[start + 1:self.size + 1] = self.prefix[start] + np.cumsum(self.counts[start:self.size], axis=0)
+
+    def _span(self, start: Optional[int], end: Optional[int]) -> Tuple[int, int]:
+        """Row range of the buckets in [start, end) epoch seconds (None = unbounded)"""
+        buckets = self.buckets[:self.size]
+        i = 0 if start is None else int(np.searchsorted(buckets, -(-start // self.width)))
+        j = self.size if end is None else int(np.searchsorted(buckets, -(-end // self.width)))
+        return i, max(i, j)
+
+    def total(self, start: Optional[int] = None, end: Optional[int] = None) -> np.ndarray:
+        """Counts per key over the buckets inside [start, end)"""
+        i, j = self._span(start, end)
+        return self.prefix[j] - self.prefix[i]
+
+    def rows(self, start: Optional[int] = None, end: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(bucket start seconds, counts per key) for the buckets inside [start, end)"""
+        i, j = self._span(start, end)
+        return self.buckets[i:j] * self.width, self.counts[i:j]
+
+
+class RollupStore:
+    """Pre-aggregated event counts per time bucket, for each dimension and granularity.
+
+    append() folds a batch of events (a timestamp column plus one column
+    per dimension) into minute, hour and day rollups. Range queries pick
+    the coarsest granularity whose buckets line up with the range, so a
+    whole-day range reads day buckets and arbitrary ranges fall back to
+    minutes; either way it is a binary search plus a prefix-sum lookup.
+    """
+
+    def __init__(self, dimensions: Sequence[str], time_column: str = "timestamp",
+                 granularities: Optional[Dict[str, int]] = None):
+        self.dimensions = list(dimensions)
+        self.time_column = time_column
+        self.granularities = dict(granularities or GRANULARITIES)
+        self.rollups = {(dimension, name): Rollup(width)
+                        for dimension in self.dimensions for name, width in self.granularities.items()}
+        self.events = 0
+        self.version = 0
+        self.lock = threading.Lock()
+
+    def append(self, events: pd.DataFrame) -> None:
+        seconds = epoch_seconds(events[self.time_column])
+        with self.lock:
+            for (dimension, _), rollup in self.rollups.items():
+                rollup.add(seconds, events[dimension].to_numpy())
+            self.events += len(events)
+            self.version += 1
+
+    def _granularity(self, start: Optional[int], end: Optional[int]) -> str:
+        """Coarsest granularity whose buckets start at both range ends"""
+        names = sorted(self.granularities, key=self.granularities.get, reverse=True)
+        for name in names:
+            width = self.granularities[name]
+            if all(bound is None or bound % width == 0 for bound in (start, end)):
+                return name
+        raise ValueError(f"Range [{start}, {end}) does not align with any granularity")
+
+    @staticmethod
+    def _bounds(start, end) -> Tuple[Optional[int], Optional[int]]:
+        return tuple(None if bound is None else pd.Timestamp(bound).value // 10 ** 9 for bound in (start, end))
+
+    def counts(self, dimension: str, start=None, end=None) -> pd.Series:
+        """Events per key of dimension with timestamps in [start, end)"""
+        start, end = self._bounds(start, end)
+        with self.lock:
+            rollup = self.rollups[dimension, self._granularity(start, end)]
+            return pd.Series(rollup.total(start, end), index=pd.Index(rollup.keys, dtype=object), name="count")
+
+    def series(self, dimension: str, granularity: str = "day", start=None, end=None,
+               by_key: bool = False) -> pd.DataFrame:
+        """Events per bucket in [start, end): a count column, or one column per key with by_key"""
+        start, end = self._bounds(start, end)
+        with self.lock:
+            rollup = self.rollups[dimension, granularity]
+            buckets, counts = rollup.rows(start, end)
+            keys = list(rollup.keys)
+        index = pd.DatetimeIndex(buckets.astype("datetime64[s]"), name=self.time_column)
+        if by_key:
+            return pd.DataFrame(counts, index=index, columns=keys)
+        return pd.DataFrame({"count": counts.sum(axis=1)}, index=index)
+
+    def save(self, directory: str) -> None:
+        """Write every rollup as .npy arrays plus a JSON manifest"""
+        os.makedirs(directory, exist_ok=True)
+        manifest = {"dimensions": self.dimensions, "time_column": self.time_column,
+                    "granularities": self.granularities, "events": self.events, "rollups": []}
+        with self.lock:
+            for i, ((dimension, name), rollup) in enumerate(self.rollups.items()):
+                np.save(os.path.join(directory, f"rollup{i}.buckets.npy"), rollup.buckets[:rollup.size])
+                np.save(os.path.join(directory, f"rollup{i}.counts.npy"), rollup.counts[:rollup.size])
+                manifest["rollups"].append({"dimension": dimension, "granularity": name, "keys": rollup.keys})
+        with open(os.path.join(directory, "manifest.json"), "w") as f:
+            json.dump(manifest, f)
+
+    @classmethod
+    def load(cls, directory: str) -> "RollupStore":
+        with open(os.path.join(directory, "manifest.json")) as f:
+            manifest = json.load(f)
+        store = cls(manifest["dimensions"], manifest["time_column"], manifest["granularities"])
+        store.events = manifest["events"]
+        for i, entry in enumerate(manifest["rollups"]):
+            rollup = store.rollups[entry["dimension"], entry["granularity"]] = Rollup(
+                store.granularities[entry["granularity"]], entry["keys"])
+            rollup.buckets = np.load(os.path.join(directory, f"rollup{i}.buckets.npy"))
+            rollup.counts = np.load(os.path.join(directory, f"rollup{i}.counts.npy"))
+            rollup.size = len(rollup.buckets)
+            rollup.prefix = np.zeros((rollup.size + 1, len(rollup.keys)), dtype=np.int64)
+            np.cumsum(rollup.counts, axis=0, out=rollup.prefix[1:])
+        return store
@@ -0,0 +1,40 @@
+"""Process-pool analytics throughput per worker count, vs. NetworkX on one core.
+
+Run from src/:  python -m benchmarks.criticality [edges] [samples] [max_workers]
+"""
+import os
+import sys
+import time
+import networkx as nx
+from analytics.criticality import GraphAnalytics
+from data_structures.synthetic import generate_threat_graph
+
+
+def timed(fn, *args, **kwargs) -> float:
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main(edges: int = 100_000, samples: int = 256, max_workers: int = 0) -> None:
+    graph = generate_threat_graph(edges=edges)
+    threats = int((graph.nodes_frame()["asset_type"] == "threat").sum())
+    connects = nx.DiGraph()
+    connects.add_edges_from((s, t) for s, t, d in graph.graph.edges(data=True) if d.get("name") == "connects")
+    base = timed(nx.betweenness_centrality, connects, k=samples, seed=0)
+    print(f"{edges} edges, {threats} threats; networkx betweenness (k={samples}) {base:.2f}s")
+    print(f"{'workers':>8}{'betweenness s':>16}{'sources/s':>12}{'speedup':>9}{'attack paths s':>17}{'threats/s':>12}{'speedup':>9}")
+    single = None
+    for workers in range(1, (max_workers or os.cpu_count() or 1) + 1):
+        with GraphAnalytics(graph, workers=workers) as analytics:
+            # Warm up: snapshot build and pool start-up are not per-source work
+            analytics.betweenness(k=workers, seed=0)
+            between = timed(analytics.betweenness, k=samples, seed=0)
+            paths = timed(analytics.attack_paths, k=3)
+        single = single or (between, paths)
+        print(f"{workers:>8}{between:>16.2f}{samples / between:>12.1f}{single[0] / between:>8.1f}x"
+              f"{paths:>17.2f}{threats / paths:>12.1f}{single[1] / paths:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,58 @@
+"""Reachability index vs. nx.descendants / nx.ancestors.
+
+Run from src/:  python -m benchmarks.reachability [assets] [threats] [queries]
+"""
+import sys
+import time
+import networkx as nx
+import numpy as np
+from data_structures.graph import Graph, GraphProperties
+
+
+def build_graph(assets: int, threats: int, seed: int = 0) -> Graph:
+    """Directed asset graph with mostly forward connects edges and threat fan-out"""
+    rng = np.random.default_rng(seed)
+    graph = Graph(GraphProperties(directed=True, backend="csr"))
+    graph.add_nodes_bulk({"node_id": np.arange(assets), "asset_type": np.full(assets, "server", dtype=object)})
+    graph.add_nodes_bulk({"node_id": np.arange(assets, assets + threats),
+                          "asset_type": np.full(threats, "threat", dtype=object)})
+    source = rng.integers(0, assets, 3 * assets)
+    target = np.minimum(source + rng.geometric(0.01, len(source)), assets - 1)
+    graph.add_edges_bulk({"source": source, "target": target})
+    graph.add_edges_bulk({"source": rng.integers(assets, assets + threats, 5 * threats),
+                          "target": rng.integers(0, assets, 5 * threats)})
+    return graph
+
+
+def timed(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main(assets: int = 100_000, threats: int = 500, queries: int = 50) -> None:
+    graph = build_graph(assets, threats)
+    nx_graph = graph.graph
+    rng = np.random.default_rng(1)
+    threat_ids = rng.integers(assets, assets + threats, queries).tolist()
+    asset_ids = rng.integers(0, assets, queries).tolist()
+    threat_set = set(range(assets, assets + threats))
+
+    build = timed(graph.reachability_index)
+    index = graph.reachability
+    rows = [
+        ("descendants(threat)", lambda t: nx.descendants(nx_graph, t), index.reachable_from, threat_ids),
+        ("threats reaching asset", lambda a: nx.ancestors(nx_graph, a) & threat_set, index.sources_reaching, asset_ids),
+        ("reaches(threat, asset)", lambda p: nx.has_path(nx_graph, *p), lambda p: index.reaches(*p),
+         list(zip(threat_ids, asset_ids))),
+    ]
+    print(f"{assets} assets, {threats} threats, {nx_graph.number_of_edges()} edges; index build {build:.3f}s")
+    print(f"{'query':<26}{'networkx ms':>14}{'index ms':>12}{'speedup':>10}")
+    for name, baseline, indexed, args in rows:
+        base = sum(timed(baseline, arg) for arg in args) / len(args) * 1e3
+        fast = sum(timed(indexed, arg) for arg in args) / len(args) * 1e3
+        print(f"{name:<26}{base:>14.3f}{fast:>12.3f}{base / fast:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,189 @@
+"""Graph benchmark suite: time and peak memory per operation on synthetic threat graphs.
+
+Run from src/:  python -m benchmarks.suite [--edges 1000 100000 ...] [--only construct_csr layout ...]
+                                           [--save results.json] [--compare baseline.json]
+
+Each case is timed (best of --repeat runs) and then run once more under
+tracemalloc for its peak allocation. --save writes the results as JSON;
+--compare reads an earlier file and exits non-zero when any case got
+slower or bigger than --tolerance allows, so it can gate a CI job.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+from data_structures.graph import Graph, GraphProperties
+from data_structures.layout import LayoutCache
+from data_structures.synthetic import ThreatGraphSpec, generate_threat_graph, threat_graph_frames
+
+EDGES = [1_000, 10_000, 100_000, 1_000_000]
+QUERIES = 1_000
+
+
+@dataclass
+class Case:
+    """setup(edges) builds the state that run(state) is measured on; sizes above max_edges are skipped"""
+    name: str
+    setup: Callable[[int], Any]
+    run: Callable[[Any], Any]
+    max_edges: Optional[int] = None
+
+
+def _spec(edges: int) -> ThreatGraphSpec:
+    return ThreatGraphSpec(edges=edges)
+
+
+def _build(frames, backend: str = "csr") -> Graph:
+    nodes, edges = frames
+    graph = Graph(GraphProperties(directed=True, backend=backend))
+    graph.add_nodes_bulk(nodes, chunk_size=1_000_000)
+    graph.add_edges_bulk(edges, chunk_size=1_000_000)
+    return graph
+
+
+def _saved(edges: int, format: str):
+    # The directory is removed when the state is dropped
+    directory = tempfile.TemporaryDirectory(prefix="graph-bench-")
+    path = os.path.join(directory.name, "graph")
+    generate_threat_graph(_spec(edges)).save(path, format=format)
+    return directory, path
+
+
+def _save(graph: Graph, format: str) -> None:
+    with tempfile.TemporaryDirectory(prefix="graph-bench-") as directory:
+        graph.save(os.path.join(directory, "graph"), format=format)
+
+
+def _load(state, format: str) -> Graph:
+    graph = Graph(GraphProperties(directed=True, backend="csr" if format == "columnar" else "networkx"))
+    graph.load(state[1])
+    return graph
+
+
+def _queries(edges: int):
+    graph = generate_threat_graph(_spec(edges))
+    nodes = graph.node_ids()
+    picks = np.random.default_rng(1).integers(0, len(nodes), QUERIES)
+    return graph, [nodes[i] for i in picks]
+
+
+def _neighbors(state) -> None:
+    graph, nodes = state
+    for node in nodes:
+        graph.get_neighbors(node)
+
+
+def _layout(graph: Graph) -> Dict:
+    graph.layout_cache = LayoutCache()
+    return graph.layout()
+
+
+def _figure_state(edges: int):
+    # The dashboard page imports streamlit; only this case needs it
+    from interface.pages.threat_graph import asset_graph_figure
+    G = generate_threat_graph(_spec(edges)).graph
+    cache = LayoutCache()
+    asset_graph_figure(G, cache)
+    return asset_graph_figure, G, cache
+
+
+def _figure(state) -> None:
+    asset_graph_figure, G, cache = state
+    asset_graph_figure(G, cache)
+
+
+CASES = [
+    Case("generate", _spec, threat_graph_frames),
+    Case("construct_csr", lambda edges: threat_graph_frames(_spec(edges)), _build),
+    Case("construct_networkx", lambda edges: threat_graph_frames(_spec(edges)),
+         lambda frames: _build(frames, "networkx"), max_edges=1_000_000),
+    Case("save_columnar", lambda edges: generate_threat_graph(_spec(edges)), lambda graph: _save(graph, "columnar")),
+    Case("load_columnar", lambda edges: _saved(edges, "columnar"), lambda state: _load(state, "columnar")),
+    Case("save_json", lambda edges: generate_threat_graph(_spec(edges)), lambda graph: _save(graph, "json"),
+         max_edges=1_000_000),
+    Case("load_json", lambda edges: _saved(edges, "json"), lambda state: _load(state, "json"), max_edges=1_000_000),
+    Case("get_neighbors", _queries, _neighbors),
+    Case("layout", lambda edges: generate_threat_graph(_spec(edges)), _layout),
+    # Traces of display_asset_graph over warm layout positions
+    Case("display_traces", _figure_state, _figure, max_edges=1_000_000),
+]
+
+
+def measure(case: Case, edges: int, repeat: int = 3) -> Dict[str, float]:
+    """Best wall time of repeat runs and the peak traced allocation of one more, in seconds and MB"""
+    state = case.setup(edges)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        case.run(state)
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        case.run(state)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"seconds": min(times), "peak_mb": peak / 2 ** 20}
+
+
+def run_suite(edges: List[int], only: Optional[List[str]] = None, repeat: int = 3) -> Dict[str, Dict[str, float]]:
+    """Results keyed "case@edges", printed as they complete"""
+    results = {}
+    print(f"{'case':<22}{'edges':>12}{'seconds':>12}{'peak MB':>12}")
+    for case in CASES:
+        if only and case.name not in only:
+            continue
+        for size in edges:
+            if case.max_edges is not None and size > case.max_edges:
+                continue
+            result = results[f"{case.name}@{size}"] = measure(case, size, repeat)
+            print(f"{case.name:<22}{size:>12}{result['seconds']:>12.4f}{result['peak_mb']:>12.1f}", flush=True)
+    return results
+
+
+def regressions(results: Dict, baseline: Dict, tolerance: float = 0.25) -> List[str]:
+    """Cases slower or bigger than baseline by more than tolerance (a fraction)"""
+    found = []
+    for key, result in results.items():
+        before = baseline.get(key)
+        if before is None:
+            continue
+        for metric in ("seconds", "peak_mb"):
+            # Ignore noise on tiny cases
+            floor = 0.005 if metric == "seconds" else 1.0
+            if result[metric] > max(before[metric], floor) * (1 + tolerance):
+                found.append(f"{key} {metric}: {before[metric]:.4f} -> {result[metric]:.4f}")
+    return found
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--edges", type=int, nargs="+", default=EDGES)
+    parser.add_argument("--only", nargs="+", choices=[case.name for case in CASES])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.edges, args.only, args.repeat)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            found = regressions(results, json.load(f), args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}")
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
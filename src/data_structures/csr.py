@@ -0,0 +1,582 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+from .ingest import intern_many, is_present
+from .arrays import gather
+
+# Marker for "attribute not set" in object columns
+MISSING = object()
+
+
+def _resize(array: np.ndarray, capacity: int, fill) -> np.ndarray:
+    """Copy array into a new buffer of the given capacity"""
+    resized = np.full(capacity, fill, dtype=array.dtype)
+    count = min(len(array), capacity)
+    resized[:count] = array[:count]
+    return resized
+
+
+def _kind_of(value: Any) -> str:
+    """Column kind able to hold value: float, category or object"""
+    if isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, (bool, np.bool_)):
+        return "float"
+    try:
+        hash(value)
+    except TypeError:
+        return "object"
+    return "category"
+
+
+class Column:
+    """Single attribute column.
+
+    Numbers are stored as float64 (NaN = unset), hashable values such as
+    asset types as int32 codes into a category table (-1 = unset) and
+    anything else as Python objects.
+    """
+
+    def __init__(self, kind: str, capacity: int = 0):
+        self.kind = kind
+        self.integral = True
+        self.categories: List[Any] = []
+        self.codes: Dict[Any, int] = {}
+        if kind == "float":
+            self.data = np.full(capacity, np.nan)
+        elif kind == "category":
+            self.data = np.full(capacity, -1, dtype=np.int32)
+        else:
+            self.data = np.full(capacity, MISSING, dtype=object)
+
+    @property
+    def fill(self) -> Any:
+        return {"float": np.nan, "category": -1}.get(self.kind, MISSING)
+
+    def reserve(self, capacity: int) -> None:
+        if capacity > len(self.data):
+            self.data = _resize(self.data, capacity, self.fill)
+
+    def accepts(self, value: Any) -> bool:
+        return self.kind == "object" or _kind_of(value) == self.kind
+
+    def code(self, value: Any) -> int:
+        """Category code for value, adding it to the table if needed"""
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.categories)
+            self.codes[value] = code
+            self.categories.append(value)
+        return code
+
+    def set(self, row: int, value: Any) -> None:
+        if self.kind == "float":
+            if not isinstance(value, (int, np.integer)):
+                self.integral = False
+            self.data[row] = value
+        elif self.kind == "category":
+            self.data[row] = self.code(value)
+        else:
+            self.data[row] = value
+
+    def get(self, row: int) -> Any:
+        value = self.data[row]
+        if self.kind == "float":
+            if np.isnan(value):
+                return MISSING
+            return int(value) if self.integral else float(value)
+        if self.kind == "category":
+            return MISSING if value < 0 else self.categories[value]
+        return value
+
+    def values(self, rows: np.ndarray) -> List[Any]:
+        """Decoded values for rows, MISSING where unset"""
+        data = self.data[rows]
+        if self.kind == "float":
+            missing = np.isnan(data)
+            values = (np.where(missing, 0, data).astype(np.int64) if self.integral else data).tolist()
+            for row in np.flatnonzero(missing):
+                values[row] = MISSING
+            return values
+        if self.kind == "category":
+            table = np.fromiter(self.categories + [MISSING], dtype=object, count=len(self.categories) + 1)
+            return table[data].tolist()
+        return data.tolist()
+
+    def take(self, index: np.ndarray, capacity: int) -> None:
+        """Keep only the rows in index, in that order"""
+        self.data = _resize(self.data[index], capacity, self.fill)
+
+    def to_object(self) -> "Column":
+        """Copy of this column as an object column"""
+        column = Column("object", len(self.data))
+        for row in range(len(self.data)):
+            column.data[row] = self.get(row)
+        return column
+
+
+class ColumnStore:
+    """Columnar attribute table addressed by integer row"""
+
+    def __init__(self):
+        self.columns: Dict[str, Column] = {}
+        self.capacity = 0
+
+    def reserve(self, capacity: int) -> None:
+        if capacity > self.capacity:
+            self.capacity = capacity
+            for column in self.columns.values():
+                column.reserve(capacity)
+
+    def set_row(self, row: int, attrs: Dict) -> None:
+        for key, value in attrs.items():
+            column = self.columns.get(key)
+            if column is None:
+                column = self.columns[key] = Column(_kind_of(value), self.capacity)
+            elif not column.accepts(value):
+                column = self.columns[key] = column.to_object()
+            column.set(row, value)
+
+    def set_column(self, rows: np.ndarray, key: str, values: np.ndarray) -> None:
+        """Vectorized set_row for one attribute; NaN/None cells are left unset"""
+        column = self.columns.get(key)
+        if values.dtype.kind in "iuf" and (column is None or column.kind == "float"):
+            if column is None:
+                column = self.columns[key] = Column("float", self.capacity)
+            valid = ~np.isnan(values) if values.dtype.kind == "f" else np.ones(len(values), dtype=bool)
+            if values.dtype.kind == "f" and valid.any():
+                column.integral = False
+            column.data[rows[valid]] = values[valid]
+            return
+        if values.dtype.kind not in "iufb" and (column is None or column.kind == "category"):
+            try:
+                codes, uniques = pd.factorize(values)
+            except TypeError:
+                codes, uniques = None, []
+            if codes is not None and all(_kind_of(value) == "category" for value in uniques):
+                if column is None:
+                    column = self.columns[key] = Column("category", self.capacity)
+                mapped = np.array([column.code(value) for value in uniques], dtype=np.int32)
+                valid = codes >= 0
+                column.data[rows[valid]] = mapped[codes[valid]]
+                return
+        for row, value in zip(rows, values):
+            if is_present(value):
+                self.set_row(row, {key: value.item() if isinstance(value, np.generic) else value})
+
+    def get_row(self, row: int) -> Dict:
+        attrs = {}
+        for key, column in self.columns.items():
+            value = column.get(row)
+            if value is not MISSING:
+                attrs[key] = value
+        return attrs
+
+    def array(self, key: str, rows: np.ndarray) -> Any:
+        """Values of one column for rows: float array (NaN = unset), Categorical or object array"""
+        column = self.columns.get(key)
+        if column is None:
+            return np.full(len(rows), np.nan)
+        if column.kind == "float":
+            return column.data[rows].astype(float)
+        if column.kind == "category":
+            return pd.Categorical.from_codes(column.data[rows], categories=pd.Index(column.categories, dtype=object))
+        return np.fromiter((None if value is MISSING else value for value in column.values(rows)),
+                           dtype=object, count=len(rows))
+
+    def frame(self, rows: np.ndarray) -> pd.DataFrame:
+        """All columns for rows as a DataFrame of typed arrays"""
+        return pd.DataFrame({key: self.array(key, rows) for key in self.columns}, index=pd.RangeIndex(len(rows)))
+
+    def records(self, rows: np.ndarray) -> List[Dict]:
+        """get_row for many rows, decoding one column at a time"""
+        records = [{} for _ in range(len(rows))]
+        for key, column in self.columns.items():
+            for record, value in zip(records, column.values(rows)):
+                if value is not MISSING:
+                    record[key] = value
+        return records
+
+    def take(self, index: np.ndarray, capacity: int) -> None:
+        self.capacity = capacity
+        for column in self.columns.values():
+            column.take(index, capacity)
+
+
+class CSRStorage:
+    """Array-backed graph storage.
+
+    Node ids are interned to consecutive integers. Edges live in COO arrays
+    (src, dst) with columnar attributes; a sorted, deduplicated prefix of
+    those arrays backs a CSR adjacency (offsets/neighbors) that is rebuilt
+    lazily once enough unsorted edges have been appended. Undirected edges
+    are stored once with src <= dst.
+    """
+
+    def __init__(self, directed: bool = False):
+        self.directed = directed
+        self.ids: Dict[Hashable, int] = {}
+        self.names: List[Hashable] = []
+        self.node_alive = np.zeros(0, dtype=bool)
+        self.node_attrs = ColumnStore()
+        self.edge_count = 0
+        self.src = np.zeros(0, dtype=np.int64)
+        self.dst = np.zeros(0, dtype=np.int64)
+        self.edge_alive = np.zeros(0, dtype=bool)
+        self.edge_attrs = ColumnStore()
+        # Edges [0, sorted_count) are unique and ordered by (src, dst)
+        self.sorted_count = 0
+        self._adjacency: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+        self._reverse: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+        self._view: Optional[nx.Graph] = None
+
+    # -- nodes ---------------------------------------------------------
+
+    def _reserve_nodes(self, size: int) -> None:
+        if size > len(self.node_alive):
+            capacity = max(size, 2 * len(self.node_alive), 16)
+            self.node_alive = _resize(self.node_alive, capacity, False)
+            self.node_attrs.reserve(capacity)
+
+    def intern(self, node_id: Hashable) -> int:
+        """Integer id of node_id, adding the node if it is new"""
+        index = self.ids.get(node_id)
+        if index is None:
+            index = len(self.names)
+            self.ids[node_id] = index
+            self.names.append(node_id)
+            self._reserve_nodes(index + 1)
+            self.node_alive[index] = True
+        return index
+
+    def _index(self, node_id: Hashable) -> int:
+        index = self.ids.get(node_id)
+        if index is None:
+            raise nx.NetworkXError(f"The node {node_id} is not in the graph.")
+        return index
+
+    def add_node(self, node_id: Hashable, attrs: Dict) -> None:
+        self.node_attrs.set_row(self.intern(node_id), attrs)
+        self._view = None
+
+    def add_nodes_frame(self, ids: np.ndarray, attrs: pd.DataFrame) -> None:
+        rows = intern_many(self, ids)
+        for key in attrs.columns:
+            self.node_attrs.set_column(rows, key, attrs[key].to_numpy())
+        self._view = None
+
+    def remove_node(self, node_id: Hashable) -> None:
+        index = self._index(node_id)
+        del self.ids[node_id]
+        self.node_alive[index] = False
+        count = self.edge_count
+        incident = (self.src[:count] == index) | (self.dst[:count] == index)
+        self.edge_alive[:count][incident] = False
+        self._view = None
+
+    def has_node(self, node_id: Hashable) -> bool:
+        return node_id in self.ids
+
+    def node_attributes(self, node_id: Hashable) -> Dict:
+        return self.node_attrs.get_row(self.ids[node_id])
+
+    def number_of_nodes(self) -> int:
+        return len(self.ids)
+
+    def node_indices(self) -> np.ndarray:
+        """Integer ids of the live nodes"""
+        return np.flatnonzero(self.node_alive[:len(self.names)])
+
+    # -- edges ---------------------------------------------------------
+
+    def _reserve_edges(self, size: int) -> None:
+        if size > len(self.src):
+            self._resize_edges(max(size, 2 * len(self.src), 16))
+
+    def _resize_edges(self, capacity: int) -> None:
+        self.src = _resize(self.src, capacity, 0)
+        self.dst = _resize(self.dst, capacity, 0)
+        self.edge_alive = _resize(self.edge_alive, capacity, False)
+        self.edge_attrs.reserve(capacity)
+        self._adjacency = self._reverse = None
+
+    def add_edge(self, source: Hashable, target: Hashable, attrs: Dict) -> None:
+        u, v = self.intern(source), self.intern(target)
+        if not self.directed and u > v:
+            u, v = v, u
+        row = self.edge_count
+        self._reserve_edges(row + 1)
+        self.src[row] = u
+        self.dst[row] = v
+        self.edge_alive[row] = True
+        self.edge_attrs.set_row(row, attrs)
+        self.edge_count += 1
+        self._view = None
+        self._maybe_consolidate()
+
+    def add_edges_frame(self, sources: np.ndarray, targets: np.ndarray, attrs: pd.DataFrame) -> None:
+        u, v = intern_many(self, sources), intern_many(self, targets)
+        if not self.directed:
+            u, v = np.minimum(u, v), np.maximum(u, v)
+        start = self.edge_count
+        self._reserve_edges(start + len(u))
+        rows = np.arange(start, start + len(u))
+        self.src[rows] = u
+        self.dst[rows] = v
+        self.edge_alive[rows] = True
+        self.edge_count += len(u)
+        for key in attrs.columns:
+            self.edge_attrs.set_column(rows, key, attrs[key].to_numpy())
+        self._view = None
+        # Repeated upserts of the same edges (e.g. a live feed) would otherwise grow the
+        # COO arrays with event count until the next read
+        self._maybe_consolidate()
+
+    def _find_edges(self, source: Hashable, target: Hashable) -> np.ndarray:
+        """Live COO rows for source->target, oldest first"""
+        u, v = self.ids.get(source), self.ids.get(target)
+        if u is None or v is None:
+            return np.zeros(0, dtype=np.int64)
+        if not self.directed and u > v:
+            u, v = v, u
+        self._maybe_consolidate()
+        rows = []
+        src, dst = self.src[:self.sorted_count], self.dst[:self.sorted_count]
+        lo, hi = np.searchsorted(src, u, "left"), np.searchsorted(src, u, "right")
+        row = lo + np.searchsorted(dst[lo:hi], v)
+        if row < hi and dst[row] == v and self.edge_alive[row]:
+            rows.append(row)
+        pending = slice(self.sorted_count, self.edge_count)
+        match = (self.src[pending] == u) & (self.dst[pending] == v) & self.edge_alive[pending]
+        return np.concatenate([np.array(rows, dtype=np.int64), np.flatnonzero(match) + self.sorted_count])
+
+    def remove_edge(self, source: Hashable, target: Hashable) -> None:
+        rows = self._find_edges(source, target)
+        if not len(rows):
+            raise nx.NetworkXError(f"The edge {source}-{target} is not in the graph")
+        self.edge_alive[rows] = False
+        self._view = None
+
+    def has_edge(self, source: Hashable, target: Hashable) -> bool:
+        return len(self._find_edges(source, target)) > 0
+
+    def edge_attributes(self, source: Hashable, target: Hashable) -> Dict:
+        rows = self._find_edges(source, target)
+        if not len(rows):
+            raise KeyError(f"The edge {source}-{target} is not in the graph.")
+        attrs = {}
+        for row in rows:
+            attrs.update(self.edge_attrs.get_row(row))
+        return attrs
+
+    def number_of_edges(self) -> int:
+        self.consolidate()
+        return int(self.edge_alive[:self.edge_count].sum())
+
+    # -- CSR -----------------------------------------------------------
+
+    def _maybe_consolidate(self) -> None:
+        if self.edge_count - self.sorted_count > max(4096, self.sorted_count // 4):
+            self.consolidate()
+
+    def consolidate(self) -> None:
+        """Drop removed edges, merge duplicates and sort all edges by (src, dst)"""
+        if self.sorted_count == self.edge_count and self.edge_alive[:self.edge_count].all():
+            return
+        count, done = self.edge_count, self.sorted_count
+        keys = self.src[:count] * max(len(self.names), 1) + self.dst[:count]
+        # Sort only the unsorted tail and merge it into the sorted prefix;
+        # equal keys keep insertion order so newer duplicates come last
+        tail = done + np.argsort(keys[done:], kind="stable")
+        order = np.insert(np.arange(done), np.searchsorted(keys[:done], keys[tail], side="right"), tail)
+        order = order[self.edge_alive[order]]
+        keys = keys[order]
+        last = np.ones(len(order), dtype=bool)
+        last[:-1] = keys[1:] != keys[:-1]
+        # Fold attributes of repeated add_edge calls into the newest row
+        for position in np.flatnonzero(~last):
+            merged = self.edge_attrs.get_row(order[position])
+            merged.update(self.edge_attrs.get_row(order[position + 1]))
+            self.edge_attrs.set_row(order[position + 1], merged)
+        keep = order[last]
+        capacity = max(len(keep), 16)
+        self.src = _resize(self.src[keep], capacity, 0)
+        self.dst = _resize(self.dst[keep], capacity, 0)
+        self.edge_alive = _resize(np.ones(len(keep), dtype=bool), capacity, False)
+        self.edge_attrs.take(keep, capacity)
+        self.edge_count = self.sorted_count = len(keep)
+        self._adjacency = self._reverse = None
+
+    def adjacency(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(offsets, neighbors, edge rows) over the sorted edge prefix.
+
+        Neighbors of node i are neighbors[offsets[i]:offsets[i + 1]]; edge
+        rows point back into the COO arrays so attribute columns and the
+        alive mask can be gathered for them.
+        """
+        if self._adjacency is None:
+            count = self.sorted_count
+            src, dst = self.src[:count], self.dst[:count]
+            rows = np.arange(count)
+            if not self.directed:
+                loops = src == dst
+                src, dst = np.concatenate([src, dst[~loops]]), np.concatenate([dst, src[~loops]])
+                rows = np.concatenate([rows, rows[~loops]])
+                order = np.lexsort((dst, src))
+                src, dst, rows = src[order], dst[order], rows[order]
+            offsets = np.zeros(len(self.names) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(src, minlength=len(self.names)), out=offsets[1:])
+            self._adjacency = (offsets, dst, rows)
+        return self._adjacency
+
+    def reverse_adjacency(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(offsets, predecessors, edge rows) over the sorted edge prefix; adjacency() when undirected"""
+        if not self.directed:
+            return self.adjacency()
+        if self._reverse is None:
+            count = self.sorted_count
+            order = np.argsort(self.dst[:count], kind="stable")
+            offsets = np.zeros(len(self.names) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.dst[:count], minlength=len(self.names)), out=offsets[1:])
+            self._reverse = (offsets, self.src[:count][order], order)
+        return self._reverse
+
+    def _adjacent(self, index: int, adjacency: Tuple[np.ndarray, np.ndarray, np.ndarray],
+                  pending: List[np.ndarray]) -> List:
+        """Names of index's neighbours in adjacency plus those among the unsorted edges, first seen first"""
+        offsets, neighbors, rows = adjacency
+        found = [np.zeros(0, dtype=np.int64)]
+        if index + 1 < len(offsets):
+            lo, hi = offsets[index], offsets[index + 1]
+            found.append(neighbors[lo:hi][self.edge_alive[rows[lo:hi]]])
+        found = np.concatenate(found + pending)
+        _, first = np.unique(found, return_index=True)
+        return [self.names[i] for i in found[np.sort(first)]]
+
+    def neighbors(self, node_id: Hashable) -> List:
+        index = self._index(node_id)
+        self._maybe_consolidate()
+        pending = slice(self.sorted_count, self.edge_count)
+        src, dst, alive = self.src[pending], self.dst[pending], self.edge_alive[pending]
+        found = [dst[(src == index) & alive]]
+        if not self.directed:
+            found.append(src[(dst == index) & alive])
+        return self._adjacent(index, self.adjacency(), found)
+
+    def predecessors(self, node_id: Hashable) -> List:
+        """Sources of edges into node_id; the same as neighbors() when undirected"""
+        if not self.directed:
+            return self.neighbors(node_id)
+        index = self._index(node_id)
+        self._maybe_consolidate()
+        pending = slice(self.sorted_count, self.edge_count)
+        src, dst, alive = self.src[pending], self.dst[pending], self.edge_alive[pending]
+        return self._adjacent(index, self.reverse_adjacency(), [src[(dst == index) & alive]])
+
+    def _incident_rows(self, index: int, adjacency: Tuple[np.ndarray, np.ndarray, np.ndarray]) -> np.ndarray:
+        offsets, _, rows = adjacency
+        if index + 1 >= len(offsets):
+            return np.zeros(0, dtype=np.int64)
+        found = rows[offsets[index]:offsets[index + 1]]
+        return found[self.edge_alive[found]]
+
+    def incident_edges(self, node_id: Hashable) -> List[Tuple[Hashable, Hashable, Dict]]:
+        """(source, target, attrs) of every edge touching node_id, attributes decoded a column at a time"""
+        index = self._index(node_id)
+        self._maybe_consolidate()
+        rows = [self._incident_rows(index, self.adjacency())]
+        if self.directed:
+            rows.append(self._incident_rows(index, self.reverse_adjacency()))
+        pending = np.arange(self.sorted_count, self.edge_count)
+        touches = (self.src[pending] == index) | (self.dst[pending] == index)
+        rows.append(pending[touches & self.edge_alive[pending]])
+        # Oldest row first, so repeated add_edge calls merge like consolidate() does
+        rows = np.unique(np.concatenate(rows))
+        edges: Dict[Tuple[int, int], Dict] = {}
+        for u, v, attrs in zip(self.src[rows].tolist(), self.dst[rows].tolist(), self.edge_attrs.records(rows)):
+            edges.setdefault((u, v), {}).update(attrs)
+        return [(self.names[u], self.names[v], attrs) for (u, v), attrs in edges.items()]
+
+    def degrees(self, node_ids: Sequence[Hashable]) -> np.ndarray:
+        """Edges touching each node, both directions (0 for unknown nodes).
+
+        Counts distinct edges like NetworkX: repeated add_edge calls that
+        are not consolidated yet count once, and a self-loop counts twice.
+        """
+        self._maybe_consolidate()
+        index = np.array([self.ids.get(node_id, -1) for node_id in node_ids], dtype=np.int64)
+        known = np.flatnonzero(index >= 0)
+        size = max(len(self.names), 1)
+        hits = np.zeros(len(self.names))
+        for offsets, _, rows in [self.adjacency()] + ([self.reverse_adjacency()] if self.directed else []):
+            ends = index[known][index[known] + 1 < len(offsets)]
+            lengths = offsets[ends + 1] - offsets[ends]
+            alive = self.edge_alive[rows[gather(offsets, ends)]]
+            hits += np.bincount(np.repeat(ends, lengths), weights=alive, minlength=len(self.names))
+        done = self.sorted_count
+        if not self.directed:
+            # adjacency() lists an undirected self-loop once; NetworkX counts both of its ends
+            loops = (self.src[:done] == self.dst[:done]) & self.edge_alive[:done]
+            hits += np.bincount(self.src[:done][loops], minlength=len(self.names))
+        pending = np.arange(done, self.edge_count)
+        pending = pending[self.edge_alive[pending]]
+        if len(pending):
+            # Each pending (src, dst) once, and only if the sorted prefix does not already hold it live
+            keys = np.unique(self.src[pending] * size + self.dst[pending])
+            sorted_keys = self.src[:done] * size + self.dst[:done]
+            position = np.minimum(np.searchsorted(sorted_keys, keys), max(done - 1, 0))
+            if done:
+                keys = keys[~((sorted_keys[position] == keys) & self.edge_alive[position])]
+            hits += np.bincount(np.concatenate([keys // size, keys % size]), minlength=len(self.names))
+        counts = np.zeros(len(index), dtype=np.int64)
+        counts[known] = hits[index[known]]
+        return counts
+
+    # -- columnar access -----------------------------------------------
+
+    def node_ids(self) -> List:
+        return [self.names[i] for i in self.node_indices()]
+
+    def edge_index(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Edge endpoints as positions into node_ids()"""
+        self.consolidate()
+        alive = self.node_indices()
+        position = np.full(len(self.names), -1, dtype=np.int64)
+        position[alive] = np.arange(len(alive))
+        return position[self.src[:self.edge_count]], position[self.dst[:self.edge_count]]
+
+    def node_values(self, key: str) -> Any:
+        return self.node_attrs.array(key, self.node_indices())
+
+    def edge_values(self, key: str) -> Any:
+        self.consolidate()
+        return self.edge_attrs.array(key, np.arange(self.edge_count))
+
+    def node_frame(self) -> pd.DataFrame:
+        return self.node_attrs.frame(self.node_indices())
+
+    def edge_frame(self) -> pd.DataFrame:
+        self.consolidate()
+        return self.edge_attrs.frame(np.arange(self.edge_count))
+
+    # -- NetworkX interop ----------------------------------------------
+
+    def to_networkx(self) -> nx.Graph:
+        """NetworkX snapshot of the store, cached until the next mutation"""
+        if self._view is None:
+            graph = nx.DiGraph() if self.directed else nx.Graph()
+            nodes = self.node_indices()
+            graph.add_nodes_from(zip([self.names[i] for i in nodes], self.node_attrs.records(nodes)))
+            self.consolidate()
+            rows = np.arange(self.edge_count)
+            sources = [self.names[i] for i in self.src[rows].tolist()]
+            targets = [self.names[i] for i in self.dst[rows].tolist()]
+            graph.add_edges_from(zip(sources, targets, self.edge_attrs.records(rows)))
+            self._view = graph
+        return self._view
+
+    def from_networkx(self, graph: nx.Graph) -> None:
+        self.__init__(directed=graph.is_directed())
+        for node, attrs in graph.nodes(data=True):
+            self.add_node(node, attrs)
+        for source, target, attrs in graph.edges(data=True):
+            self.add_edge(source, target, attrs)
@@ -0,0 +1,184 @@
+import glob
+import json
+import os
+import re
+import shutil
+import threading
+import numpy as np
+import pandas as pd
+from typing import Any, List, Optional, Tuple
+from .csr import CSRStorage
+from .snapshot import freeze, read_snapshot, write_snapshot
+
+# A delta log directory holds numbered segments and snapshots:
+#
+#   snapshot-<k>/    columnar snapshot of the graph before segment k
+#   delta-<k>.log    JSON lines, one mutation per line
+#
+# The graph is the newest complete snapshot plus every segment >= its number.
+
+
+def segment_path(directory: str, seq: int) -> str:
+    return os.path.join(directory, f"delta-{seq:08d}.log")
+
+
+def snapshot_path(directory: str, seq: int) -> str:
+    return os.path.join(directory, f"snapshot-{seq:08d}")
+
+
+def _numbered(directory: str, pattern: str) -> List[Tuple[int, str]]:
+    found = []
+    for path in glob.glob(os.path.join(directory, pattern)):
+        match = re.search(r"-(\d+)(\.log)?$", path)
+        if match:
+            found.append((int(match.group(1)), path))
+    return sorted(found)
+
+
+def latest_snapshot(directory: str) -> Optional[Tuple[int, str]]:
+    """(seq, path) of the newest snapshot with a manifest, i.e. fully written"""
+    complete = [(seq, path) for seq, path in _numbered(directory, "snapshot-*")
+                if os.path.exists(os.path.join(path, "manifest.json"))]
+    return complete[-1] if complete else None
+
+
+def has_state(directory: str) -> bool:
+    return latest_snapshot(directory) is not None or bool(_numbered(directory, "delta-*.log"))
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _ids(values: List) -> np.ndarray:
+    return np.fromiter((freeze(value) for value in values), dtype=object, count=len(values))
+
+
+def replay(storage: CSRStorage, path: str) -> int:
+    """Apply the mutations in one segment to storage; returns how many"""
+    count = 0
+    with open(path) as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break  # torn write at the end of a crashed segment
+            op, *args = json.loads(line)
+            if op == "add_node":
+                storage.add_node(freeze(args[0]), args[1])
+            elif op == "add_edge":
+                storage.add_edge(freeze(args[0]), freeze(args[1]), args[2])
+            elif op == "remove_node":
+                storage.remove_node(freeze(args[0]))
+            elif op == "remove_edge":
+                storage.remove_edge(freeze(args[0]), freeze(args[1]))
+            elif op == "add_nodes":
+                storage.add_nodes_frame(_ids(args[0]), pd.DataFrame(args[1], index=range(len(args[0]))))
+            elif op == "add_edges":
+                storage.add_edges_frame(_ids(args[0]), _ids(args[1]), pd.DataFrame(args[2], index=range(len(args[0]))))
+            else:
+                raise ValueError(f"Unknown delta log operation: {op}")
+            count += 1
+    return count
+
+
+def load_state(directory: str, directed: bool = False) -> CSRStorage:
+    """Newest snapshot plus replay of the segments written after it"""
+    latest = latest_snapshot(directory)
+    if latest is None:
+        base, storage = 0, CSRStorage(directed=directed)
+    else:
+        base, storage = latest[0], read_snapshot(latest[1])
+    for seq, path in _numbered(directory, "delta-*.log"):
+        if seq >= base:
+            replay(storage, path)
+    return storage
+
+
+def compact_segments(directory: str, upto: int, directed: bool = False) -> str:
+    """Fold every segment < upto into snapshot-<upto> and drop what it replaces"""
+    storage = CSRStorage(directed=directed)
+    latest = latest_snapshot(directory)
+    base = 0
+    if latest is not None and latest[0] <= upto:
+        base, storage = latest[0], read_snapshot(latest[1])
+    for seq, path in _numbered(directory, "delta-*.log"):
+        if base <= seq < upto:
+            replay(storage, path)
+    target = snapshot_path(directory, upto)
+    tmp = target + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    write_snapshot(storage, tmp)
+    os.rename(tmp, target)
+    for seq, path in _numbered(directory, "delta-*.log"):
+        if seq < upto:
+            os.remove(path)
+    for seq, path in _numbered(directory, "snapshot-*"):
+        if seq < upto:
+            shutil.rmtree(path, ignore_errors=True)
+    return target
+
+
+class DeltaLog:
+    """Append-only mutation log with background snapshot compaction"""
+
+    def __init__(self, directory: str, sync: bool = False):
+        self.directory = directory
+        self.sync = sync
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        numbered = _numbered(directory, "delta-*.log") + _numbered(directory, "snapshot-*")
+        self.segment = max([seq for seq, _ in numbered], default=0)
+        self._file = open(segment_path(directory, self.segment), "a")
+        self._compaction: Optional[threading.Thread] = None
+
+    def append(self, op: str, *args: Any) -> None:
+        line = json.dumps([op, *args], default=_json_default) + "\n"
+        with self.lock:
+            self._file.write(line)
+            self._file.flush()
+            if self.sync:
+                os.fsync(self._file.fileno())
+
+    def rotate(self) -> int:
+        """Start a new segment; returns its number"""
+        with self.lock:
+            self._file.close()
+            self.segment += 1
+            self._file = open(segment_path(self.directory, self.segment), "a")
+            return self.segment
+
+    def replace(self, storage: CSRStorage) -> str:
+        """Record that the graph was replaced wholesale: storage becomes the snapshot the next segment builds on.
+
+        A replacement is not a mutation replay can repeat, so the new
+        contents are written out before anything else is logged.
+        """
+        seq = self.rotate()
+        target = snapshot_path(self.directory, seq)
+        tmp = target + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        write_snapshot(storage, tmp)
+        os.rename(tmp, target)
+        return target
+
+    def compact(self, directed: bool = False, wait: bool = False) -> threading.Thread:
+        """Fold all closed segments into a new snapshot on a background thread.
+
+        Mutations keep going to a fresh segment meanwhile; the fold reads
+        only files that are no longer written to, so it never touches the
+        live graph.
+        """
+        if self._compaction is None or not self._compaction.is_alive():
+            upto = self.rotate()
+            self._compaction = threading.Thread(target=compact_segments, args=(self.directory, upto, directed))
+            self._compaction.start()
+        if wait:
+            self._compaction.join()
+        return self._compaction
+
+    def close(self) -> None:
+        if self._compaction is not None:
+            self._compaction.join()
+        with self.lock:
+            self._file.close()
@@ -0,0 +1,126 @@
+import functools
+import networkx as nx
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Hashable, List, Optional, Set, Tuple
+from .graph import Graph
+
+# (neighbour, (source, target) of the connecting edge, edge attributes)
+Adjacent = Tuple[Hashable, Tuple[Hashable, Hashable], Dict]
+
+
+@dataclass
+class EgoView:
+    """The part of a graph on screen: nodes with their hop distance from center, and edges between them"""
+    center: Hashable
+    nodes: Dict[Hashable, int] = field(default_factory=dict)
+    edges: Dict[Tuple[Hashable, Hashable], Dict] = field(default_factory=dict)
+    expanded: Set[Hashable] = field(default_factory=set)
+
+    def frontier(self) -> List[Hashable]:
+        """Visible nodes whose neighbours have not been fetched, nearest first"""
+        return sorted((node for node in self.nodes if node not in self.expanded), key=self.nodes.get)
+
+
+class EgoExplorer:
+    """Lazily expanded k-hop neighbourhoods of a Graph.
+
+    Nothing is computed for the graph as a whole: each expansion reads
+    one node's edges in both directions with their attributes in a single
+    get_incident_edges call, drops edges below min_risk, and keeps the
+    max_neighbors strongest by the risk_score of the connecting edge or
+    by neighbour degree (one get_degrees call). Fetched neighbourhoods and node attributes sit
+    in LRU caches keyed on Graph.version, so revisiting a node is free
+    and any mutation of the graph makes them stale.
+    """
+
+    def __init__(self, graph: Graph, max_neighbors: int = 25, max_nodes: int = 500, rank_by: str = "risk",
+                 min_risk: Optional[float] = None, risk_column: str = "risk_score", cache_size: int = 4096):
+        if rank_by not in ("risk", "degree"):
+            raise ValueError(f"Unknown ranking: {rank_by}")
+        self.graph = graph
+        self.max_neighbors = max_neighbors
+        self.max_nodes = max_nodes
+        self.rank_by = rank_by
+        self.min_risk = min_risk
+        self.risk_column = risk_column
+        self._adjacent = functools.lru_cache(maxsize=cache_size)(self._fetch_adjacent)
+        self._attributes = functools.lru_cache(maxsize=cache_size)(self._fetch_attributes)
+
+    def _risk(self, attrs: Dict) -> float:
+        risk = attrs.get(self.risk_column)
+        return float(risk) if risk is not None else float("-inf")
+
+    def _fetch_adjacent(self, node: Hashable, version: int) -> Tuple[Tuple[Adjacent, ...], FrozenSet[Hashable]]:
+        """node's ranked, capped neighbours and the ids of all its neighbours that pass min_risk"""
+        # One read for all incident edges and their attributes, one more for degrees when ranking by them
+        found = {}
+        for source, target, attrs in self.graph.get_incident_edges(node):
+            neighbor = target if source == node else source
+            if neighbor not in found or source == node:
+                found[neighbor] = ((source, target), attrs)
+        adjacent = [(neighbor, edge, attrs) for neighbor, (edge, attrs) in found.items()]
+        if self.min_risk is not None:
+            # Edges without a score (e.g. connects) are kept
+            adjacent = [item for item in adjacent
+                        if self.risk_column not in item[2] or self._risk(item[2]) >= self.min_risk]
+        if self.rank_by == "risk":
+            adjacent.sort(key=lambda item: self._risk(item[2]), reverse=True)
+        elif adjacent:
+            degrees = self.graph.get_degrees([neighbor for neighbor, _, _ in adjacent])
+            adjacent = [adjacent[i] for i in np.argsort(-degrees, kind="stable")]
+        return tuple(adjacent[:self.max_neighbors]), frozenset(neighbor for neighbor, _, _ in adjacent)
+
+    def _fetch_attributes(self, node: Hashable, version: int) -> Dict:
+        return self.graph.get_node_attributes(node)
+
+    def adjacent(self, node: Hashable) -> Tuple[Tuple[Adjacent, ...], FrozenSet[Hashable]]:
+        return self._adjacent(node, self.graph.version)
+
+    def node_attributes(self, node: Hashable) -> Dict:
+        return self._attributes(node, self.graph.version)
+
+    def hidden(self, view: EgoView, node: Hashable) -> int:
+        """Neighbours of node that are not on screen (0 until node has been expanded)"""
+        if node not in view.expanded:
+            return 0
+        # Neighbours beyond the cap may be on screen anyway, reached through another node
+        _, neighbors = self.adjacent(node)
+        return sum(1 for neighbor in neighbors if neighbor not in view.nodes)
+
+    def expand(self, view: EgoView, node: Hashable) -> EgoView:
+        """Add node's neighbours to view, up to max_nodes visible nodes"""
+        if node in view.expanded or node not in view.nodes:
+            return view
+        adjacent, _ = self.adjacent(node)
+        for neighbor, edge, attrs in adjacent:
+            if not self.graph.properties.directed and edge[::-1] in view.edges:
+                continue
+            if neighbor not in view.nodes:
+                if len(view.nodes) >= self.max_nodes:
+                    continue
+                view.nodes[neighbor] = view.nodes[node] + 1
+            view.edges[edge] = attrs
+        view.expanded.add(node)
+        return view
+
+    def ego(self, center: Hashable, hops: int = 1) -> EgoView:
+        """View of center's neighbourhood expanded hops times, breadth first"""
+        if not self.graph.storage.has_node(center):
+            raise nx.NetworkXError(f"The node {center} is not in the graph.")
+        view = EgoView(center, {center: 0})
+        for depth in range(hops):
+            for node in [node for node, distance in view.nodes.items() if distance == depth]:
+                self.expand(view, node)
+        return view
+
+    def subgraph(self, view: EgoView) -> nx.Graph:
+        """NetworkX graph of the visible nodes and edges, with their attributes"""
+        graph = nx.DiGraph() if self.graph.properties.directed else nx.Graph()
+        graph.add_nodes_from((node, self.node_attributes(node)) for node in view.nodes)
+        graph.add_edges_from((source, target, attrs) for (source, target), attrs in view.edges.items())
+        return graph
+
+    def cache_info(self) -> Dict[str, Any]:
+        info = self._adjacent.cache_info()
+        return {"hits": info.hits, "misses": info.misses, "size": info.currsize}
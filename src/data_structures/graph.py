@@ -1,50 +1,232 @@
 import networkx as nx
+import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
 import json
-from typing import Dict, List, Any, Optional
+import os
+import threading
+from typing import Dict, List, Any, Optional, Sequence, Tuple
 from dataclasses import dataclass
+from .ingest import IngestStats, iter_frames
+from .storage import NetworkXStorage
+from .csr import CSRStorage
+from .neo4j_storage import Neo4jStorage
+from .snapshot import read_snapshot, write_snapshot
+from .delta_log import DeltaLog, has_state, load_state, snapshot_path
+from .reachability import ReachabilityIndex
+from .layout import LayoutCache
+from monitoring.metrics import timed
 
 @dataclass
 class GraphProperties:
     directed: bool = False
     weighted: bool = False
     labeled: bool = True
+    backend: str = "networkx"  # "networkx", "csr" (array-backed) or "neo4j" (shared database)
+
+STORAGE_BACKENDS = {
+    "networkx": NetworkXStorage,
+    "csr": CSRStorage,
+    "neo4j": Neo4jStorage,
+}
+
+def _columns(attrs) -> Dict[str, List]:
+    """JSON-ready attribute columns, None marking unset cells"""
+    return {key: attrs[key].astype(object).where(attrs[key].notna(), None).tolist() for key in attrs.columns}
 
 class Graph:
-    def __init__(self, properties: Optional[GraphProperties] = None):
+    def __init__(self, properties: Optional[GraphProperties] = None, storage: Any = None):
+        """storage, if given, is a ready storage object for the backend, e.g. Neo4jStorage with its own client"""
         self.properties = properties or GraphProperties()
-        self.graph = nx.DiGraph() if self.properties.directed else nx.Graph()
+        if self.properties.backend not in STORAGE_BACKENDS:
+            raise ValueError(f"Unknown graph backend: {self.properties.backend}")
+        if storage is None:
+            storage = STORAGE_BACKENDS[self.properties.backend](directed=self.properties.directed)
+        self.storage = storage
+        self.delta_log: Optional[DeltaLog] = None
+        # Bumped on every mutation so derived data (indexes, layouts) can be cached
+        self.version = 0
+        self.reachability: Optional[ReachabilityIndex] = None
+        self.layout_cache = LayoutCache()
+
+    @classmethod
+    def from_networkx(cls, graph: nx.Graph) -> "Graph":
+        """Graph over an existing NetworkX graph (not copied), e.g. the asset graph of the dashboard"""
+        wrapped = cls(GraphProperties(directed=graph.is_directed()))
+        wrapped.graph = graph
+        return wrapped
+
+    @property
+    def graph(self) -> nx.Graph:
+        """NetworkX graph; for the csr backend a read-only snapshot built on demand"""
+        return self.storage.to_networkx()
+
+    @graph.setter
+    def graph(self, graph: nx.Graph) -> None:
+        self.storage.from_networkx(graph)
+        self.version += 1
+        self._replaced()
+
+    def _adopt(self, storage: CSRStorage) -> None:
+        """Replace the graph contents with a loaded CSRStorage"""
+        if isinstance(self.storage, CSRStorage):
+            self.storage = storage
+            self.version += 1
+            self._replaced()
+        else:
+            self.graph = storage.to_networkx()
+
+    def _columnar(self) -> CSRStorage:
+        """The storage as a CSRStorage, converted when the backend is another one"""
+        if isinstance(self.storage, CSRStorage):
+            return self.storage
+        storage = CSRStorage(directed=self.properties.directed)
+        storage.from_networkx(self.graph)
+        return storage
+
+    def _replaced(self) -> None:
+        # Wholesale replacements cannot be replayed from the log; snapshot the new contents instead
+        if self.delta_log:
+            self.delta_log.replace(self._columnar())
         
+    @timed()
     def add_node(self, node_id: str, **attrs) -> None:
         """Add node with attributes"""
-        self.graph.add_node(node_id, **attrs)
+        self.storage.add_node(node_id, attrs)
+        self.version += 1
+        if self.delta_log:
+            self.delta_log.append("add_node", node_id, attrs)
         
+    @timed()
     def add_edge(self, source: str, target: str, **attrs) -> None:
         """Add edge with attributes"""
         if self.properties.weighted and 'weight' not in attrs:
             attrs['weight'] = 1.0
-        self.graph.add_edge(source, target, **attrs)
+        self.storage.add_edge(source, target, attrs)
+        self.version += 1
+        if self.reachability:
+            self.reachability.edge_added(source, target)
+        if self.delta_log:
+            self.delta_log.append("add_edge", source, target, attrs)
         
+    @timed()
+    def add_nodes_bulk(self, nodes: Any, id_column: str = "node_id", chunk_size: int = 100_000) -> IngestStats:
+        """Add nodes from a DataFrame, dict of column arrays or iterable of ids / (id, attrs)"""
+        stats = IngestStats()
+        for frame in iter_frames(nodes, [id_column], chunk_size):
+            ids, attrs = frame[id_column].to_numpy(), frame.drop(columns=id_column)
+            self.storage.add_nodes_frame(ids, attrs)
+            self.version += 1
+            if self.delta_log:
+                self.delta_log.append("add_nodes", ids.tolist(), _columns(attrs))
+            stats.rows += len(frame)
+        return stats.finish()
+
+    @timed()
+    def add_edges_bulk(self, edges: Any, source_column: str = "source", target_column: str = "target",
+                       chunk_size: int = 100_000) -> IngestStats:
+        """Add edges from a DataFrame, dict of column arrays or iterable of (source, target[, attrs])"""
+        stats = IngestStats()
+        for frame in iter_frames(edges, [source_column, target_column], chunk_size):
+            attrs = frame.drop(columns=[source_column, target_column])
+            if self.properties.weighted:
+                attrs = attrs.assign(weight=attrs["weight"].fillna(1.0) if "weight" in attrs else 1.0)
+            sources, targets = frame[source_column].to_numpy(), frame[target_column].to_numpy()
+            self.storage.add_edges_frame(sources, targets, attrs)
+            self.version += 1
+            if self.delta_log:
+                self.delta_log.append("add_edges", sources.tolist(), targets.tolist(), _columns(attrs))
+            stats.rows += len(frame)
+        return stats.finish()
+
+    @timed()
     def remove_node(self, node_id: str) -> None:
         """Remove node and its edges"""
-        self.graph.remove_node(node_id)
+        self.storage.remove_node(node_id)
+        self.version += 1
+        if self.delta_log:
+            self.delta_log.append("remove_node", node_id)
         
+    @timed()
     def remove_edge(self, source: str, target: str) -> None:
         """Remove edge between nodes"""
-        self.graph.remove_edge(source, target)
+        self.storage.remove_edge(source, target)
+        self.version += 1
+        if self.delta_log:
+            self.delta_log.append("remove_edge", source, target)
         
+    @timed()
     def get_neighbors(self, node_id: str) -> List[str]:
         """Get list of neighboring nodes"""
-        return list(self.graph.neighbors(node_id))
+        return self.storage.neighbors(node_id)
+
+    @timed()
+    def get_predecessors(self, node_id: str) -> List[str]:
+        """Get list of nodes with an edge into node_id (the neighbors when undirected)"""
+        return self.storage.predecessors(node_id)
         
+    @timed()
+    def get_incident_edges(self, node_id: str) -> List[Tuple[str, str, Dict]]:
+        """(source, target, attrs) of every edge touching node_id, in one storage read"""
+        return self.storage.incident_edges(node_id)
+
+    @timed()
+    def get_degrees(self, node_ids: Sequence[str]) -> np.ndarray:
+        """Number of edges touching each node, both directions; 0 for unknown nodes"""
+        return self.storage.degrees(node_ids)
+
+    @timed()
     def get_node_attributes(self, node_id: str) -> Dict:
         """Get all attributes of a node"""
-        return dict(self.graph.nodes[node_id])
+        return self.storage.node_attributes(node_id)
         
+    @timed()
     def get_edge_attributes(self, source: str, target: str) -> Dict:
         """Get all attributes of an edge"""
-        return dict(self.graph.edges[source, target])
+        return self.storage.edge_attributes(source, target)
         
+    @timed()
+    def node_ids(self) -> List:
+        """Node ids in the order used by edge_index and node_values"""
+        return self.storage.node_ids()
+
+    @timed()
+    def edge_index(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Edge endpoints as integer positions into node_ids()"""
+        return self.storage.edge_index()
+
+    def node_values(self, key: str) -> Any:
+        """One node attribute for all nodes: float array (NaN = unset), Categorical or object array"""
+        return self.storage.node_values(key)
+
+    def edge_values(self, key: str) -> Any:
+        """One edge attribute aligned with edge_index()"""
+        return self.storage.edge_values(key)
+
+    @timed()
+    def nodes_frame(self) -> pd.DataFrame:
+        """Nodes as a wide DataFrame: node_id plus one typed column per attribute"""
+        frame = self.storage.node_frame()
+        frame.insert(0, "node_id", pd.Series(self.node_ids(), dtype=object))
+        return frame
+
+    @timed()
+    def edges_frame(self) -> pd.DataFrame:
+        """Edges as a wide DataFrame: source and target (categorical over node ids) plus attributes"""
+        frame = self.storage.edge_frame()
+        nodes = pd.Index(self.node_ids(), dtype=object, tupleize_cols=False)
+        src, dst = self.edge_index()
+        frame.insert(0, "source", pd.Categorical.from_codes(src, categories=nodes))
+        frame.insert(1, "target", pd.Categorical.from_codes(dst, categories=nodes))
+        return frame
+
+    @timed()
+    def reachability_index(self, sources: Optional[List] = None) -> ReachabilityIndex:
+        """Attach a reachability index (sources default to threat nodes); kept current across mutations"""
+        if self.reachability is None or sources is not None:
+            self.reachability = ReachabilityIndex(self, sources)
+        return self.reachability
+
     def to_dict(self) -> Dict:
         """Export graph to dictionary"""
         return nx.node_link_data(self.graph)
@@ -53,20 +235,54 @@ class Graph:
         """Import graph from dictionary"""
         self.graph = nx.node_link_graph(data)
         
-    def save(self, filepath: str) -> None:
-        """Save graph to JSON file"""
+    @timed()
+    def save(self, filepath: str, format: str = "json") -> None:
+        """Save graph to JSON file, or to a columnar snapshot directory with format="columnar" """
+        if format == "columnar":
+            write_snapshot(self._columnar(), filepath)
+            return
         with open(filepath, 'w') as f:
             json.dump(self.to_dict(), f)
             
-    def load(self, filepath: str) -> None:
-        """Load graph from JSON file"""
+    @timed()
+    def load(self, filepath: str, mmap: bool = True) -> None:
+        """Load graph from JSON file or columnar snapshot directory (memory-mapped by default)"""
+        if os.path.isdir(filepath):
+            self._adopt(read_snapshot(filepath, mmap=mmap))
+            return
         with open(filepath, 'r') as f:
             self.from_dict(json.load(f))
             
+    def open_delta_log(self, directory: str, sync: bool = False) -> None:
+        """Record mutations to an append-only log in directory, restoring any state already there"""
+        if has_state(directory):
+            self._adopt(load_state(directory, self.properties.directed))
+        else:
+            self.save(snapshot_path(directory, 0), format="columnar")
+        self.delta_log = DeltaLog(directory, sync=sync)
+
+    def compact(self, wait: bool = False) -> threading.Thread:
+        """Fold the delta log into a new snapshot on a background thread"""
+        return self.delta_log.compact(self.properties.directed, wait=wait)
+
+    def close_delta_log(self) -> None:
+        """Stop recording mutations, waiting for a running compaction"""
+        if self.delta_log:
+            self.delta_log.close()
+            self.delta_log = None
+
+    @timed()
+    def layout(self) -> Dict:
+        """Node positions from the cached force layout, refined incrementally after changes"""
+        nodes = self.node_ids()
+        positions = self.layout_cache.positions_for(nodes, *self.edge_index(), key=self.version)
+        return dict(zip(nodes, positions))
+
+    @timed()
     def visualize(self, figsize=(10,10)) -> None:
         """Visualize graph using NetworkX"""
         plt.figure(figsize=figsize)
-        pos = nx.spring_layout(self.graph)
+        pos = self.layout()
         nx.draw(self.graph, pos, 
                 with_labels=self.properties.labeled,
                 node_color='lightblue',
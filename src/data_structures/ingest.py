@@ -0,0 +1,98 @@
+import time
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+from itertools import chain, islice
+from typing import Any, Iterable, Iterator, List, Mapping
+
+
+@dataclass
+class IngestStats:
+    """Row count and throughput of one bulk load"""
+    rows: int = 0
+    seconds: float = 0.0
+    started: float = field(default_factory=time.perf_counter, repr=False)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def finish(self) -> "IngestStats":
+        self.seconds = time.perf_counter() - self.started
+        return self
+
+
+def is_present(value: Any) -> bool:
+    """False for None/NaN/NA cells, which mean "attribute not set" """
+    if value is None or value is pd.NA or value is pd.NaT:
+        return False
+    return not (isinstance(value, float) and value != value)
+
+
+def _records_frame(rows: List, key_columns: List[str]) -> pd.DataFrame:
+    """Frame from id tuples, optionally followed by an attribute dict"""
+    keys, attrs = [], []
+    width = len(key_columns)
+    for row in rows:
+        if width == 1 and not (isinstance(row, tuple) and len(row) == 2 and isinstance(row[1], dict)):
+            row = (row, {})
+        elif len(row) == width:
+            row = tuple(row) + ({},)
+        keys.append(row[:width])
+        attrs.append(row[width])
+    frame = pd.DataFrame(keys, columns=key_columns)
+    return pd.concat([frame, pd.DataFrame(attrs, index=frame.index)], axis=1)
+
+
+def iter_frames(data: Any, key_columns: List[str], chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Split bulk input into DataFrame chunks of at most chunk_size rows.
+
+    Accepts a DataFrame, a mapping of column name -> array, an iterable of
+    DataFrames (e.g. pd.read_sql with chunksize) or an iterable of rows,
+    where a row is ``id``/``(id, attrs)`` for nodes and
+    ``(source, target)``/``(source, target, attrs)`` for edges.
+    """
+    if isinstance(data, Mapping):
+        data = pd.DataFrame({key: np.asarray(values) for key, values in data.items()})
+    if isinstance(data, pd.DataFrame):
+        missing = [key for key in key_columns if key not in data.columns]
+        if missing:
+            raise KeyError(f"Bulk input is missing columns: {missing}")
+        for start in range(0, len(data), chunk_size):
+            yield data.iloc[start:start + chunk_size]
+        return
+    rows = iter(data)
+    first = next(rows, None)
+    if first is None:
+        return
+    rows = chain([first], rows)
+    if isinstance(first, pd.DataFrame):
+        # Pull one frame at a time so chunked readers never hold more than one chunk
+        for frame in rows:
+            yield from iter_frames(frame, key_columns, chunk_size)
+        return
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield _records_frame(chunk, key_columns)
+
+
+def intern_many(storage, ids: np.ndarray) -> np.ndarray:
+    """Integer ids for an array of node ids, interning each distinct id once"""
+    codes, uniques = pd.factorize(ids)
+    if (codes < 0).any():
+        raise ValueError("Node ids must not be missing")
+    interned = np.fromiter((storage.intern(node_id) for node_id in uniques.tolist()), dtype=np.int64, count=len(uniques))
+    return interned[codes]
+
+
+def frame_records(attrs: pd.DataFrame) -> Iterable[dict]:
+    """Per-row attribute dicts with unset (NaN/None) cells dropped"""
+    if not len(attrs.columns):
+        # to_dict("records") yields nothing for a frame without columns
+        for _ in range(len(attrs)):
+            yield {}
+        return
+    for record in attrs.to_dict("records"):
+        yield {key: value for key, value in record.items() if is_present(value)}
@@ -0,0 +1,605 @@
+import os
+import re
+import threading
+import time
+import networkx as nx
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+from .ingest import frame_records, is_present
+from .storage import typed_array, typed_frame
+
+_drivers: Dict[Tuple[str, str], Any] = {}
+_drivers_lock = threading.Lock()
+
+# (node ids, node attribute dicts, edge sources, edge targets, edge attribute dicts)
+Snapshot = Tuple[List, List[Dict], List, List, List[Dict]]
+
+
+def get_driver(uri: Optional[str] = None, user: Optional[str] = None, password: Optional[str] = None,
+               pool_size: int = 50) -> Any:
+    """One pooled Neo4j driver per (uri, user), created on first use.
+
+    Unset arguments come from NEO4J_URI, NEO4J_USER and NEO4J_PASSWORD.
+    The driver keeps a pool of up to pool_size connections that every
+    session borrows from, so all dashboard workers in a process share it.
+    """
+    uri = uri or os.environ.get("NEO4J_URI", "bolt://localhost:7687")
+    user = user or os.environ.get("NEO4J_USER", "neo4j")
+    password = password if password is not None else os.environ.get("NEO4J_PASSWORD", "")
+    with _drivers_lock:
+        driver = _drivers.get((uri, user))
+        if driver is None:
+            from neo4j import GraphDatabase
+            driver = _drivers[(uri, user)] = GraphDatabase.driver(uri, auth=(user, password),
+                                                                  max_connection_pool_size=pool_size)
+        return driver
+
+
+def close_drivers() -> None:
+    with _drivers_lock:
+        for driver in _drivers.values():
+            driver.close()
+        _drivers.clear()
+
+
+def _property(value: Any) -> Any:
+    # The driver takes plain Python values only
+    return value.item() if hasattr(value, "item") else value
+
+
+def _properties(attrs: Dict) -> Dict:
+    """attrs as Neo4j properties: unset values dropped, NumPy scalars converted"""
+    return {str(key): _property(value) for key, value in attrs.items() if is_present(value)}
+
+
+class Neo4jClient:
+    """Graph reads and batched writes as Cypher against a Neo4j database.
+
+    Nodes are (:label {id, ...attributes}) and edges [:relationship
+    {...attributes}]. Every write takes a list of rows and runs as a
+    single UNWIND $rows statement in one transaction, which also bumps a
+    version counter kept on a (:GraphVersion {label}) node; writes return
+    the new version so other processes can tell their caches are stale.
+    Undirected graphs store one relationship per edge and match it in
+    either direction.
+    """
+
+    def __init__(self, driver: Any, directed: bool = False, database: Optional[str] = None,
+                 label: str = "Node", relationship: str = "EDGE"):
+        for name in (label, relationship):
+            if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", name):
+                raise ValueError(f"Invalid Neo4j label or relationship type: {name}")
+        self.driver = driver
+        self.directed = directed
+        self.database = database
+        self.label = label
+        self.relationship = relationship
+        self.arrow = "->" if directed else "-"
+        # Schema changes may not share a transaction with data writes, so no version bump here
+        with self.driver.session(database=self.database) as session:
+            session.execute_write(lambda tx: tx.run(f"CREATE CONSTRAINT IF NOT EXISTS FOR (n:{label}) "
+                                                    f"REQUIRE n.id IS UNIQUE").consume())
+
+    def _write(self, query: str, **params: Any) -> int:
+        def work(tx) -> int:
+            tx.run(query, **params).consume()
+            record = tx.run("MERGE (v:GraphVersion {label: $label}) SET v.version = coalesce(v.version, 0) + 1 "
+                            "RETURN v.version AS version", label=self.label).single()
+            return record["version"]
+
+        with self.driver.session(database=self.database) as session:
+            return session.execute_write(work)
+
+    def _read(self, query: str, **params: Any) -> List[Any]:
+        with self.driver.session(database=self.database) as session:
+            return session.execute_read(lambda tx: list(tx.run(query, **params)))
+
+    def version(self) -> int:
+        """Number of writes so far, by any process"""
+        records = self._read("MATCH (v:GraphVersion {label: $label}) RETURN v.version AS version", label=self.label)
+        return records[0]["version"] if records else 0
+
+    def merge_nodes(self, rows: List[Dict]) -> int:
+        """rows of {"id", "attrs"}; attributes are merged into existing nodes"""
+        return self._write(f"UNWIND $rows AS row MERGE (n:{self.label} {{id: row.id}}) SET n += row.attrs", rows=rows)
+
+    def merge_edges(self, rows: List[Dict]) -> int:
+        """rows of {"source", "target", "attrs"}; missing endpoints are created"""
+        return self._write(f"UNWIND $rows AS row "
+                    f"MERGE (a:{self.label} {{id: row.source}}) MERGE (b:{self.label} {{id: row.target}}) "
+                    f"MERGE (a)-[r:{self.relationship}]{self.arrow}(b) SET r += row.attrs", rows=rows)
+
+    def delete_nodes(self, rows: List[Dict]) -> int:
+        return self._write(f"UNWIND $rows AS row MATCH (n:{self.label} {{id: row.id}}) DETACH DELETE n", rows=rows)
+
+    def delete_edges(self, rows: List[Dict]) -> int:
+        return self._write(f"UNWIND $rows AS row MATCH (:{self.label} {{id: row.source}})"
+                    f"-[r:{self.relationship}]{self.arrow}(:{self.label} {{id: row.target}}) DELETE r", rows=rows)
+
+    def clear(self) -> int:
+        return self._write(f"MATCH (n:{self.label}) DETACH DELETE n")
+
+    def node(self, node_id: Hashable) -> Optional[Dict]:
+        records = self._read(f"MATCH (n:{self.label} {{id: $id}}) RETURN properties(n) AS attrs", id=node_id)
+        if not records:
+            return None
+        attrs = dict(records[0]["attrs"])
+        attrs.pop("id", None)
+        return attrs
+
+    def edge(self, source: Hashable, target: Hashable) -> Optional[Dict]:
+        records = self._read(f"MATCH (:{self.label} {{id: $source}})-[r:{self.relationship}]{self.arrow}"
+                             f"(:{self.label} {{id: $target}}) RETURN properties(r) AS attrs LIMIT 1",
+                             source=source, target=target)
+        return dict(records[0]["attrs"]) if records else None
+
+    def neighbors(self, node_id: Hashable) -> List:
+        records = self._read(f"MATCH (:{self.label} {{id: $id}})-[:{self.relationship}]{self.arrow}(m:{self.label}) "
+                             f"RETURN DISTINCT m.id AS id", id=node_id)
+        return [record["id"] for record in records]
+
+    def predecessors(self, node_id: Hashable) -> List:
+        records = self._read(f"MATCH (m:{self.label})-[:{self.relationship}]{self.arrow}(:{self.label} {{id: $id}}) "
+                             f"RETURN DISTINCT m.id AS id", id=node_id)
+        return [record["id"] for record in records]
+
+    def incident_edges(self, node_id: Hashable) -> List[Tuple[Hashable, Hashable, Dict]]:
+        records = self._read(f"MATCH (:{self.label} {{id: $id}})-[r:{self.relationship}]-(:{self.label}) "
+                             f"WITH DISTINCT r RETURN startNode(r).id AS source, endNode(r).id AS target, "
+                             f"properties(r) AS attrs", id=node_id)
+        return [(record["source"], record["target"], dict(record["attrs"])) for record in records]
+
+    def degrees(self, node_ids: List) -> List[int]:
+        records = self._read(f"UNWIND $ids AS id OPTIONAL MATCH (n:{self.label} {{id: id}}) "
+                             f"RETURN CASE WHEN n IS NULL THEN 0 "
+                             f"ELSE COUNT {{ (n)-[:{self.relationship}]-() }} END AS degree", ids=node_ids)
+        return [record["degree"] for record in records]
+
+    def expand(self, node_ids: List, hops: int) -> List:
+        """Nodes within hops edges of node_ids, found by the database"""
+        records = self._read(f"MATCH (n:{self.label}) WHERE n.id IN $ids "
+                             f"MATCH (n)-[:{self.relationship}*1..{int(hops)}]{self.arrow}(m:{self.label}) "
+                             f"RETURN DISTINCT m.id AS id", ids=node_ids)
+        return [record["id"] for record in records]
+
+    def counts(self) -> Tuple[int, int]:
+        nodes = self._read(f"MATCH (n:{self.label}) RETURN count(n) AS count")[0]["count"]
+        edges = self._read(f"MATCH (:{self.label})-[r:{self.relationship}]->(:{self.label}) "
+                           f"RETURN count(r) AS count")[0]["count"]
+        return nodes, edges
+
+    def snapshot(self) -> Snapshot:
+        nodes = self._read(f"MATCH (n:{self.label}) RETURN n.id AS id, properties(n) AS attrs")
+        edges = self._read(f"MATCH (a:{self.label})-[r:{self.relationship}]->(b:{self.label}) "
+                           f"RETURN a.id AS source, b.id AS target, properties(r) AS attrs")
+        node_attrs = []
+        for record in nodes:
+            attrs = dict(record["attrs"])
+            attrs.pop("id", None)
+            node_attrs.append(attrs)
+        return ([record["id"] for record in nodes], node_attrs, [record["source"] for record in edges],
+                [record["target"] for record in edges], [dict(record["attrs"]) for record in edges])
+
+
+class InMemoryClient:
+    """In-process stand-in for Neo4jClient with the same methods, for tests and demos without a server.
+
+    transactions counts the write calls, i.e. the UNWIND statements a
+    real database would have run; it doubles as the version counter.
+    reads counts the read queries, version() checks included.
+    """
+
+    def __init__(self, directed: bool = False):
+        self.directed = directed
+        self.nodes: Dict[Hashable, Dict] = {}
+        self.edges: Dict[Tuple[Hashable, Hashable], Dict] = {}
+        self.adjacency: Dict[Hashable, Set] = {}
+        self.incoming: Dict[Hashable, Set] = {}
+        self.transactions = 0
+        self.reads = 0
+        self.lock = threading.Lock()
+
+    def _key(self, source: Hashable, target: Hashable) -> Tuple[Hashable, Hashable]:
+        if self.directed or (source, target) in self.edges:
+            return source, target
+        return (target, source) if (target, source) in self.edges else (source, target)
+
+    def _merge_node(self, node_id: Hashable) -> Dict:
+        self.adjacency.setdefault(node_id, set())
+        self.incoming.setdefault(node_id, set())
+        return self.nodes.setdefault(node_id, {})
+
+    def version(self) -> int:
+        self.reads += 1
+        with self.lock:
+            return self.transactions
+
+    def merge_nodes(self, rows: List[Dict]) -> int:
+        with self.lock:
+            self.transactions += 1
+            for row in rows:
+                self._merge_node(row["id"]).update(row["attrs"])
+            return self.transactions
+
+    def merge_edges(self, rows: List[Dict]) -> int:
+        with self.lock:
+            self.transactions += 1
+            for row in rows:
+                source, target = row["source"], row["target"]
+                self._merge_node(source)
+                self._merge_node(target)
+                self.edges.setdefault(self._key(source, target), {}).update(row["attrs"])
+                self.adjacency[source].add(target)
+                self.incoming[target].add(source)
+                if not self.directed:
+                    self.adjacency[target].add(source)
+                    self.incoming[source].add(target)
+            return self.transactions
+
+    def delete_nodes(self, rows: List[Dict]) -> int:
+        with self.lock:
+            self.transactions += 1
+            for row in rows:
+                node_id = row["id"]
+                if node_id not in self.nodes:
+                    continue
+                for key in [key for key in self.edges if node_id in key]:
+                    del self.edges[key]
+                del self.nodes[node_id]
+                del self.adjacency[node_id]
+                del self.incoming[node_id]
+                for neighbors in list(self.adjacency.values()) + list(self.incoming.values()):
+                    neighbors.discard(node_id)
+            return self.transactions
+
+    def delete_edges(self, rows: List[Dict]) -> int:
+        with self.lock:
+            self.transactions += 1
+            for row in rows:
+                source, target = row["source"], row["target"]
+                if self.edges.pop(self._key(source, target), None) is not None:
+                    self.adjacency[source].discard(target)
+                    self.incoming[target].discard(source)
+                    if not self.directed:
+                        self.adjacency[target].discard(source)
+                        self.incoming[source].discard(target)
+            return self.transactions
+
+    def clear(self) -> int:
+        with self.lock:
+            self.transactions += 1
+            self.nodes.clear()
+            self.edges.clear()
+            self.adjacency.clear()
+            self.incoming.clear()
+            return self.transactions
+
+    def node(self, node_id: Hashable) -> Optional[Dict]:
+        self.reads += 1
+        attrs = self.nodes.get(node_id)
+        return dict(attrs) if attrs is not None else None
+
+    def edge(self, source: Hashable, target: Hashable) -> Optional[Dict]:
+        self.reads += 1
+        attrs = self.edges.get(self._key(source, target))
+        return dict(attrs) if attrs is not None else None
+
+    def neighbors(self, node_id: Hashable) -> List:
+        self.reads += 1
+        return list(self.adjacency.get(node_id, ()))
+
+    def predecessors(self, node_id: Hashable) -> List:
+        self.reads += 1
+        return list(self.incoming.get(node_id, ()))
+
+    def incident_edges(self, node_id: Hashable) -> List[Tuple[Hashable, Hashable, Dict]]:
+        self.reads += 1
+        with self.lock:
+            keys = {self._key(node_id, other) for other in self.adjacency.get(node_id, ())}
+            keys.update(self._key(other, node_id) for other in self.incoming.get(node_id, ()))
+            return [(source, target, dict(self.edges[source, target])) for source, target in keys]
+
+    def degrees(self, node_ids: List) -> List[int]:
+        self.reads += 1
+        with self.lock:
+            return [len({self._key(node_id, other) for other in self.adjacency.get(node_id, ())}
+                        | {self._key(other, node_id) for other in self.incoming.get(node_id, ())})
+                    for node_id in node_ids]
+
+    def expand(self, node_ids: List, hops: int) -> List:
+        self.reads += 1
+        found: Set = set()
+        frontier = [node for node in node_ids if node in self.adjacency]
+        for _ in range(int(hops)):
+            frontier = [m for node in frontier for m in self.adjacency[node] if m not in found]
+            found.update(frontier)
+        return list(found)
+
+    def counts(self) -> Tuple[int, int]:
+        return len(self.nodes), len(self.edges)
+
+    def snapshot(self) -> Snapshot:
+        self.reads += 1
+        with self.lock:
+            edges = list(self.edges.items())
+            return (list(self.nodes), [dict(attrs) for attrs in self.nodes.values()],
+                    [source for (source, _), _ in edges], [target for (_, target), _ in edges],
+                    [dict(attrs) for _, attrs in edges])
+
+
+class _LRU:
+    """Thread-safe least-recently-used map with hit/miss counts"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def discard(self, *keys: Hashable) -> None:
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+class Neo4jStorage:
+    """Graph storage in Neo4j, so one large graph can be shared by every dashboard worker.
+
+    - Mutations are buffered in order and flushed as batched UNWIND
+      writes, batch_size rows per statement, when the buffer fills or
+      before anything is read.
+    - Node attributes and neighbour lists of hot nodes are kept in a
+      read-through LRU cache; mutations evict the entries they touch.
+    - neighbors() and expand() run as Cypher in the database; the bulk
+      columnar reads (node_ids, edge_index, frames) share one snapshot
+      that is cached until the next mutation.
+    - Other processes write to the same database, so cached reads are
+      only served after checking the database's version counter: when
+      it moved past this storage's own writes, the LRU and the snapshot
+      are dropped. The check costs a round trip, so it runs at most
+      every max_staleness seconds; 0 checks before every cached read.
+
+    client is a Neo4jClient (by default on get_driver()) or an
+    InMemoryClient, which implements the same methods without a server.
+    """
+
+    def __init__(self, directed: bool = False, client: Any = None, batch_size: int = 5_000,
+                 cache_size: int = 10_000, max_staleness: float = 1.0):
+        self.directed = directed
+        self.client = client if client is not None else Neo4jClient(get_driver(), directed=directed)
+        self.batch_size = batch_size
+        self.cache = _LRU(cache_size)
+        self.pending: List[Tuple[str, Dict]] = []
+        self.lock = threading.RLock()
+        self._snapshot: Optional[Snapshot] = None
+        self._view: Optional[nx.Graph] = None
+        self.max_staleness = max_staleness
+        self._version: Optional[int] = None
+        self._checked = float("-inf")
+
+    # -- buffered writes -----------------------------------------------
+
+    def _queue(self, kind: str, rows: Iterable[Dict]) -> None:
+        with self.lock:
+            self.pending.extend((kind, row) for row in rows)
+            self._snapshot = self._view = None
+            if len(self.pending) >= self.batch_size:
+                self.flush()
+
+    def flush(self) -> None:
+        """Send buffered mutations, one UNWIND statement per run of the same kind and batch_size rows"""
+        with self.lock:
+            pending, self.pending = self.pending, []
+            start = 0
+            while start < len(pending):
+                kind = pending[start][0]
+                end = start
+                while end < len(pending) and end - start < self.batch_size and pending[end][0] == kind:
+                    end += 1
+                self._seen(getattr(self.client, kind)([row for _, row in pending[start:end]]), own_write=True)
+                start = end
+
+    def _drop_cached(self) -> None:
+        self.cache.clear()
+        self._snapshot = self._view = None
+
+    def _seen(self, version: int, own_write: bool = False) -> None:
+        """Record the database version; caches survive only our own next write"""
+        with self.lock:
+            expected = self._version + 1 if own_write and self._version is not None else self._version
+            if version != expected:
+                self._drop_cached()
+            self._version = version
+
+    def _validate(self) -> None:
+        """Drop cached reads if another process has written since they were loaded"""
+        now = time.monotonic()
+        if now - self._checked < self.max_staleness:
+            return
+        self.flush()
+        self._seen(self.client.version())
+        self._checked = now
+
+    def _evict_adjacent(self, *node_ids: Hashable) -> None:
+        self.cache.discard(*[(kind, node_id) for node_id in node_ids
+                             for kind in ("neighbors", "predecessors", "incident")])
+
+    def add_node(self, node_id: Hashable, attrs: Dict) -> None:
+        self.cache.discard(("node", node_id))
+        self._queue("merge_nodes", [{"id": node_id, "attrs": _properties(attrs)}])
+
+    def add_edge(self, source: Hashable, target: Hashable, attrs: Dict) -> None:
+        self._evict_adjacent(source, target)
+        self._queue("merge_edges", [{"source": source, "target": target, "attrs": _properties(attrs)}])
+
+    def add_nodes_frame(self, ids: np.ndarray, attrs: pd.DataFrame) -> None:
+        ids = ids.tolist()
+        self.cache.discard(*[("node", node_id) for node_id in ids])
+        self._queue("merge_nodes", ({"id": node_id, "attrs": _properties(record)}
+                                    for node_id, record in zip(ids, frame_records(attrs))))
+
+    def add_edges_frame(self, sources: np.ndarray, targets: np.ndarray, attrs: pd.DataFrame) -> None:
+        sources, targets = sources.tolist(), targets.tolist()
+        self._evict_adjacent(*sources, *targets)
+        self._queue("merge_edges", ({"source": source, "target": target, "attrs": _properties(record)}
+                                    for source, target, record in zip(sources, targets, frame_records(attrs))))
+
+    def remove_node(self, node_id: Hashable) -> None:
+        if not self.has_node(node_id):
+            raise nx.NetworkXError(f"The node {node_id} is not in the graph.")
+        # Neighbour lists of unknown other nodes change too
+        self.cache.clear()
+        self._queue("delete_nodes", [{"id": node_id}])
+
+    def remove_edge(self, source: Hashable, target: Hashable) -> None:
+        if not self.has_edge(source, target):
+            raise nx.NetworkXError(f"The edge {source}-{target} is not in the graph")
+        self._evict_adjacent(source, target)
+        self._queue("delete_edges", [{"source": source, "target": target}])
+
+    # -- reads ---------------------------------------------------------
+
+    def _cached(self, key: Tuple[str, Hashable], load) -> Any:
+        self._validate()
+        value = self.cache.get(key)
+        if value is None:
+            self.flush()
+            value = load()
+            if value is not None:
+                self.cache.put(key, value)
+        return value
+
+    def has_node(self, node_id: Hashable) -> bool:
+        return self._cached(("node", node_id), lambda: self.client.node(node_id)) is not None
+
+    def has_edge(self, source: Hashable, target: Hashable) -> bool:
+        self.flush()
+        return self.client.edge(source, target) is not None
+
+    def neighbors(self, node_id: Hashable) -> List:
+        if not self.has_node(node_id):
+            raise nx.NetworkXError(f"The node {node_id} is not in the graph.")
+        return list(self._cached(("neighbors", node_id), lambda: self.client.neighbors(node_id)))
+
+    def predecessors(self, node_id: Hashable) -> List:
+        if not self.has_node(node_id):
+            raise nx.NetworkXError(f"The node {node_id} is not in the graph.")
+        return list(self._cached(("predecessors", node_id), lambda: self.client.predecessors(node_id)))
+
+    def incident_edges(self, node_id: Hashable) -> List[Tuple[Hashable, Hashable, Dict]]:
+        """(source, target, attrs) of every edge touching node_id: one query, then cached"""
+        if not self.has_node(node_id):
+            raise nx.NetworkXError(f"The node {node_id} is not in the graph.")
+        edges = self._cached(("incident", node_id), lambda: self.client.incident_edges(node_id))
+        return [(source, target, dict(attrs)) for source, target, attrs in edges]
+
+    def degrees(self, node_ids: Sequence[Hashable]) -> np.ndarray:
+        self.flush()
+        return np.array(self.client.degrees(list(node_ids)), dtype=np.int64)
+
+    def expand(self, node_ids: List, hops: int = 1) -> List:
+        """Nodes reachable from node_ids in 1..hops edges, expanded in the database"""
+        self.flush()
+        return self.client.expand(list(node_ids), hops)
+
+    def node_attributes(self, node_id: Hashable) -> Dict:
+        attrs = self._cached(("node", node_id), lambda: self.client.node(node_id))
+        if attrs is None:
+            raise nx.NetworkXError(f"The node {node_id} is not in the graph.")
+        return dict(attrs)
+
+    def edge_attributes(self, source: Hashable, target: Hashable) -> Dict:
+        self.flush()
+        attrs = self.client.edge(source, target)
+        if attrs is None:
+            raise KeyError(f"The edge {source}-{target} is not in the graph.")
+        return attrs
+
+    def number_of_nodes(self) -> int:
+        self.flush()
+        return self.client.counts()[0]
+
+    def number_of_edges(self) -> int:
+        self.flush()
+        return self.client.counts()[1]
+
+    # -- columnar access -----------------------------------------------
+
+    def snapshot(self) -> Snapshot:
+        """Every node and edge, read once and cached until the next mutation"""
+        with self.lock:
+            self._validate()
+            if self._snapshot is None:
+                self.flush()
+                self._snapshot = self.client.snapshot()
+            return self._snapshot
+
+    def node_ids(self) -> List:
+        return list(self.snapshot()[0])
+
+    def edge_index(self) -> Tuple[np.ndarray, np.ndarray]:
+        nodes, _, sources, targets, _ = self.snapshot()
+        index = pd.Index(nodes, dtype=object, tupleize_cols=False)
+        return (index.get_indexer(pd.Index(sources, dtype=object, tupleize_cols=False)).astype(np.int64),
+                index.get_indexer(pd.Index(targets, dtype=object, tupleize_cols=False)).astype(np.int64))
+
+    def node_values(self, key: str) -> Any:
+        return typed_array([attrs.get(key) for attrs in self.snapshot()[1]])
+
+    def edge_values(self, key: str) -> Any:
+        return typed_array([attrs.get(key) for attrs in self.snapshot()[4]])
+
+    def node_frame(self) -> pd.DataFrame:
+        return typed_frame(self.snapshot()[1])
+
+    def edge_frame(self) -> pd.DataFrame:
+        return typed_frame(self.snapshot()[4])
+
+    # -- NetworkX interop ----------------------------------------------
+
+    def to_networkx(self) -> nx.Graph:
+        """NetworkX snapshot of the database, cached until the next mutation"""
+        with self.lock:
+            self._validate()
+            if self._view is None:
+                nodes, node_attrs, sources, targets, edge_attrs = self.snapshot()
+                graph = nx.DiGraph() if self.directed else nx.Graph()
+                graph.add_nodes_from(zip(nodes, node_attrs))
+                graph.add_edges_from(zip(sources, targets, edge_attrs))
+                self._view = graph
+            return self._view
+
+    def from_networkx(self, graph: nx.Graph) -> None:
+        """Replace the database contents with graph"""
+        with self.lock:
+            self.pending = []
+            self.cache.clear()
+            self._seen(self.client.clear(), own_write=True)
+            self._queue("merge_nodes", ({"id": node, "attrs": _properties(attrs)}
+                                        for node, attrs in graph.nodes(data=True)))
+            self._queue("merge_edges", ({"source": source, "target": target, "attrs": _properties(attrs)}
+                                        for source, target, attrs in graph.edges(data=True)))
+            self.flush()
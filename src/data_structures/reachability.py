@@ -0,0 +1,208 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+from .arrays import gather
+
+
+def _csr(src: np.ndarray, dst: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(offsets, targets) with the targets of node i in targets[offsets[i]:offsets[i + 1]]"""
+    order = np.argsort(src, kind="stable")
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=offsets[1:])
+    return offsets, dst[order]
+
+
+def strongly_connected(offsets: np.ndarray, targets: np.ndarray) -> Tuple[np.ndarray, int]:
+    """Iterative Tarjan: component id per node and the component count"""
+    n = len(offsets) - 1
+    offsets, targets = offsets.tolist(), targets.tolist()
+    index, low, comp = [-1] * n, [0] * n, [-1] * n
+    on_stack = [False] * n
+    stack: List[int] = []
+    counter = count = 0
+    for root in range(n):
+        if index[root] != -1:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, offsets[root])]
+        while work:
+            v, i = work[-1]
+            if i < offsets[v + 1]:
+                work[-1] = (v, i + 1)
+                w = targets[i]
+                if index[w] == -1:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = True
+                    work.append((w, offsets[w]))
+                elif on_stack[w] and index[w] < low[v]:
+                    low[v] = index[w]
+                continue
+            work.pop()
+            if work and low[v] < low[work[-1][0]]:
+                low[work[-1][0]] = low[v]
+            if low[v] == index[v]:
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = False
+                    comp[w] = count
+                    if w == v:
+                        break
+                count += 1
+    return np.array(comp, dtype=np.int64), count
+
+
+class ReachabilityIndex:
+    """Precomputed "who can reach whom" over a Graph.
+
+    Strongly connected components are condensed into a DAG, and every
+    component gets a bitset label of the sources (threat nodes by default)
+    that can reach it, computed level by level in topological order.
+    Then:
+
+    - sources_reaching(node) reads one label: O(words)
+    - reaches(source, node) tests one bit: O(1)
+    - reachable_from(source) scans one bit column: O(components), cached
+
+    add_edge between known nodes updates labels in place (only components
+    whose label grows are visited); any other mutation is picked up from
+    Graph.version and triggers a rebuild on the next query.
+    """
+
+    def __init__(self, graph, sources: Optional[Iterable[Hashable]] = None, threat_type: str = "threat"):
+        self.graph = graph
+        self._sources = None if sources is None else list(sources)
+        self.threat_type = threat_type
+        self.version = -1
+        self.build()
+
+    def build(self) -> None:
+        graph = self.graph
+        self.nodes = pd.Index(graph.node_ids(), dtype=object, tupleize_cols=False)
+        n = len(self.nodes)
+        src, dst = graph.edge_index()
+        if not graph.properties.directed:
+            src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+        self.comp, count = strongly_connected(*_csr(src, dst, n))
+        # Condensation DAG
+        cs, cd = self.comp[src], self.comp[dst]
+        keys = np.unique(cs[cs != cd] * max(count, 1) + cd[cs != cd])
+        cs, cd = keys // max(count, 1), keys % max(count, 1)
+        self.offsets, self.targets = _csr(cs, cd, count)
+        self.extra: Dict[int, List[int]] = {}
+        # Members of each component, for expanding component sets to nodes
+        self.members = np.argsort(self.comp, kind="stable")
+        self.member_offsets = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.comp, minlength=count), out=self.member_offsets[1:])
+        # Source bit labels
+        if self._sources is None:
+            # No threats means no sources (an empty index), never every node: labels are n x sources bits
+            threats = pd.Series(graph.node_values("asset_type")).isin([self.threat_type]).to_numpy()
+            self.source_positions = np.flatnonzero(threats)
+        else:
+            self.source_positions = self.nodes.get_indexer(self._sources)
+            self.source_positions = self.source_positions[self.source_positions >= 0]
+        bit = np.arange(len(self.source_positions))
+        self.labels = np.zeros((count, (len(bit) + 63) // 64), dtype=np.uint64)
+        np.bitwise_or.at(self.labels, (self.comp[self.source_positions], bit // 64),
+                         np.left_shift(np.uint64(1), (bit % 64).astype(np.uint64)))
+        self.source_bit = {int(p): int(b) for p, b in zip(self.source_positions, bit)}
+        # Kahn's algorithm one level at a time: a component's label is final
+        # once all its predecessors are, so each level is one vectorized OR
+        indegree = np.bincount(cd, minlength=count)
+        frontier = np.flatnonzero(indegree == 0)
+        while len(frontier):
+            edges = gather(self.offsets, frontier)
+            heads = self.targets[edges]
+            np.bitwise_or.at(self.labels, heads, self.labels[np.repeat(frontier, np.diff(self.offsets)[frontier])])
+            indegree -= np.bincount(heads, minlength=count)
+            heads = np.unique(heads)
+            frontier = heads[indegree[heads] == 0]
+        self._descendants: Dict[int, np.ndarray] = {}
+        self.version = graph.version
+
+    def _current(self) -> None:
+        if self.version != self.graph.version:
+            self.build()
+
+    def edge_added(self, source: Hashable, target: Hashable) -> None:
+        """Fold a new edge into the labels; Graph.add_edge calls this after bumping its version"""
+        if self.version != self.graph.version - 1:
+            return
+        u, v = self.nodes.get_indexer([source, target])
+        if u < 0 or v < 0:
+            return  # new node: rebuilt on the next query
+        pairs = [(self.comp[u], self.comp[v])]
+        if not self.graph.properties.directed:
+            pairs.append((self.comp[v], self.comp[u]))
+        for cu, cv in pairs:
+            if cu == cv:
+                continue
+            self.extra.setdefault(cu, []).append(cv)
+            bits = self.labels[cu].copy()
+            stack = [cv]
+            while stack:
+                c = stack.pop()
+                if ((self.labels[c] | bits) == self.labels[c]).all():
+                    continue
+                self.labels[c] |= bits
+                stack.extend(self.targets[self.offsets[c]:self.offsets[c + 1]].tolist())
+                stack.extend(self.extra.get(c, []))
+        self._descendants.clear()
+        self.version = self.graph.version
+
+    def _position(self, node_id: Hashable) -> int:
+        position = self.nodes.get_indexer([node_id])[0]
+        if position < 0:
+            raise KeyError(f"The node {node_id} is not in the graph.")
+        return position
+
+    def sources_reaching(self, node_id: Hashable) -> List:
+        """Sources (threats) with a path to node_id, excluding node_id itself"""
+        self._current()
+        position = self._position(node_id)
+        bits = np.unpackbits(self.labels[self.comp[position]].view(np.uint8), bitorder="little")
+        found = self.source_positions[np.flatnonzero(bits[:len(self.source_positions)])]
+        return self.nodes[found[found != position]].tolist()
+
+    def reachable_from(self, source_id: Hashable) -> List:
+        """Nodes reachable from a source (threat), excluding the source itself"""
+        self._current()
+        position = self._position(source_id)
+        if position not in self.source_bit:
+            raise KeyError(f"{source_id} is not an indexed source")
+        found = self._descendants.get(position)
+        if found is None:
+            bit = self.source_bit[position]
+            word = self.labels[:, bit // 64] >> np.uint64(bit % 64)
+            comps = np.flatnonzero(word & np.uint64(1))
+            found = self.members[gather(self.member_offsets, comps)]
+            found = self._descendants[position] = found[found != position]
+        return self.nodes[found].tolist()
+
+    def reaches(self, source_id: Hashable, target_id: Hashable) -> bool:
+        """Whether a path leads from source_id to target_id"""
+        self._current()
+        u, v = self._position(source_id), self._position(target_id)
+        if u in self.source_bit:
+            bit = self.source_bit[u]
+            return bool((self.labels[self.comp[v], bit // 64] >> np.uint64(bit % 64)) & np.uint64(1))
+        # Non-source: search the condensation, skipping components whose
+        # label lacks the source's ancestors (they cannot be downstream)
+        start, goal = self.comp[u], self.comp[v]
+        required = self.labels[start]
+        seen, stack = {start}, [start]
+        while stack:
+            c = stack.pop()
+            if c == goal:
+                return True
+            successors = self.targets[self.offsets[c]:self.offsets[c + 1]].tolist() + self.extra.get(c, [])
+            for s in successors:
+                if s not in seen and ((self.labels[s] & required) == required).all():
+                    seen.add(s)
+                    stack.append(s)
+        return False
@@ -0,0 +1,272 @@
+import json
+import os
+import numpy as np
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Sequence
+from .csr import MISSING, Column, ColumnStore, CSRStorage
+
+# Columnar snapshot layout: a directory holding manifest.json plus one .npy
+# file per array, so every array can be memory-mapped on load.
+#
+#   node_names.data.npy / node_names.offsets.npy   interned node ids
+#   node_alive.npy, src.npy, dst.npy, edge_alive.npy
+#   adj_offsets.npy / adj_neighbors.npy / adj_rows.npy   CSR adjacency
+#   node_col<i>.npy, edge_col<i>.npy (+ .categories.* string tables)
+SNAPSHOT_VERSION = 1
+
+
+def _write_array(path: str, array: np.ndarray, chunk_size: int) -> None:
+    """Write array as .npy, copying at most chunk_size rows at a time"""
+    out = np.lib.format.open_memmap(path, mode="w+", dtype=array.dtype, shape=array.shape)
+    for start in range(0, len(array), chunk_size):
+        out[start:start + chunk_size] = array[start:start + chunk_size]
+    out.flush()
+    del out
+
+
+def _read_array(path: str, mmap: bool) -> np.ndarray:
+    # Copy-on-write: pages are read on first touch and mutations stay in memory
+    return np.load(path, mmap_mode="c" if mmap else None)
+
+
+def _write_strings(prefix: str, values: Sequence, chunk_size: int) -> str:
+    """Write values as one UTF-8 blob plus offsets; returns the encoding used"""
+    encoding = "str" if all(isinstance(value, str) for value in values) else "json"
+    encode = (lambda value: value.encode()) if encoding == "str" else (lambda value: json.dumps(value).encode())
+    offsets = np.zeros(len(values) + 1, dtype=np.int64)
+    blobs = []
+    for start in range(0, len(values), chunk_size):
+        chunk = [encode(value) for value in values[start:start + chunk_size]]
+        offsets[start + 1:start + 1 + len(chunk)] = np.cumsum([len(blob) for blob in chunk]) + offsets[start]
+        blobs.append(b"".join(chunk))
+    _write_array(prefix + ".offsets.npy", offsets, chunk_size)
+    _write_array(prefix + ".data.npy", np.frombuffer(b"".join(blobs), dtype=np.uint8), chunk_size)
+    return encoding
+
+
+def freeze(value: Any) -> Any:
+    """JSON turns tuples into lists; turn them back so they can be dict keys"""
+    return tuple(freeze(item) for item in value) if isinstance(value, list) else value
+
+
+def _read_strings(prefix: str, encoding: str, hashable: bool = True) -> List:
+    offsets = np.load(prefix + ".offsets.npy")
+    text = np.load(prefix + ".data.npy").tobytes()
+    values = [text[lo:hi].decode() for lo, hi in zip(offsets[:-1], offsets[1:])]
+    if encoding == "json":
+        decode = (lambda value: freeze(json.loads(value))) if hashable else json.loads
+        values = [decode(value) for value in values]
+    return values
+
+
+class _StringTable:
+    """List of values written by _write_strings, decoded one at a time on access.
+
+    The offsets and UTF-8 blob stay memory-mapped; values appended after
+    loading are kept in a plain list behind them.
+    """
+
+    def __init__(self, prefix: str, encoding: str, mmap: bool, hashable: bool = True):
+        self.offsets = _read_array(prefix + ".offsets.npy", mmap)
+        self.data = _read_array(prefix + ".data.npy", mmap)
+        self.size = len(self.offsets) - 1
+        self.json = encoding == "json"
+        self.hashable = hashable
+        self.extra: List = []
+
+    def _decode(self, blob: bytes) -> Any:
+        value = blob.decode()
+        if self.json:
+            value = json.loads(value)
+            return freeze(value) if self.hashable else value
+        return value
+
+    def __len__(self) -> int:
+        return self.size + len(self.extra)
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        index = int(index)
+        if index < 0:
+            index += len(self)
+        if index < 0:
+            raise IndexError("string table index out of range")
+        if index >= self.size:
+            return self.extra[index - self.size]
+        return self._decode(self.data[self.offsets[index]:self.offsets[index + 1]].tobytes())
+
+    def __iter__(self) -> Iterator[Any]:
+        # One read of the blob for a full pass
+        text, offsets = self.data.tobytes(), self.offsets.tolist()
+        for lo, hi in zip(offsets[:-1], offsets[1:]):
+            yield self._decode(text[lo:hi])
+        yield from self.extra
+
+    def append(self, value: Any) -> None:
+        self.extra.append(value)
+
+
+class _NodeIndex:
+    """CSRStorage.ids for a loaded snapshot: the id -> position dict is built on first lookup.
+
+    Once built, the plain dict replaces this object on the storage.
+    """
+
+    def __init__(self, storage: CSRStorage):
+        self.storage = storage
+        self._ids: Optional[Dict[Hashable, int]] = None
+
+    @property
+    def ids(self) -> Dict[Hashable, int]:
+        if self._ids is None:
+            alive = self.storage.node_alive[:len(self.storage.names)].tolist()
+            self._ids = {name: index for index, (name, live) in enumerate(zip(self.storage.names, alive)) if live}
+            self.storage.ids = self._ids
+        return self._ids
+
+    def get(self, node_id: Hashable, default: Any = None) -> Any:
+        return self.ids.get(node_id, default)
+
+    def __contains__(self, node_id: Hashable) -> bool:
+        return node_id in self.ids
+
+    def __getitem__(self, node_id: Hashable) -> int:
+        return self.ids[node_id]
+
+    def __setitem__(self, node_id: Hashable, index: int) -> None:
+        self.ids[node_id] = index
+
+    def __delitem__(self, node_id: Hashable) -> None:
+        del self.ids[node_id]
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self.ids)
+
+    def __len__(self) -> int:
+        if self._ids is None:
+            return int(self.storage.node_alive[:len(self.storage.names)].sum())
+        return len(self._ids)
+
+
+class _StoredColumn(Column):
+    """Object column read from a snapshot: rows are decoded as they are read,
+    and the whole column is decoded into memory on first write"""
+
+    def __init__(self, strings: _StringTable):
+        super().__init__("object")
+        self.strings = strings
+        self._data: Optional[np.ndarray] = None
+
+    @property
+    def data(self) -> np.ndarray:
+        if self._data is None:
+            self._data = np.fromiter((MISSING if value is None else value for value in self.strings),
+                                     dtype=object, count=len(self.strings))
+        return self._data
+
+    @data.setter
+    def data(self, data: np.ndarray) -> None:
+        self._data = data
+
+    def get(self, row: int) -> Any:
+        if self._data is not None:
+            return super().get(row)
+        value = self.strings[row]
+        return MISSING if value is None else value
+
+    def values(self, rows: np.ndarray) -> List[Any]:
+        rows = np.asarray(rows)
+        if self._data is not None or rows.dtype.kind not in "iu":
+            return super().values(rows)
+        return [MISSING if value is None else value for value in (self.strings[row] for row in rows.tolist())]
+
+
+def _write_columns(path: str, prefix: str, store: ColumnStore, size: int, chunk_size: int) -> List[Dict]:
+    meta = []
+    for i, (key, column) in enumerate(store.columns.items()):
+        name = os.path.join(path, f"{prefix}{i}")
+        entry = {"key": key, "kind": column.kind, "integral": column.integral}
+        if column.kind == "object":
+            # Unhashable values (lists, dicts) are stored as JSON text
+            values = [None if value is MISSING else value for value in column.data[:size]]
+            entry["encoding"] = _write_strings(name, values, chunk_size)
+        else:
+            _write_array(name + ".npy", column.data[:size], chunk_size)
+            if column.kind == "category":
+                entry["encoding"] = _write_strings(name + ".categories", column.categories, chunk_size)
+        meta.append(entry)
+    return meta
+
+
+def _read_columns(path: str, prefix: str, meta: List[Dict], size: int, mmap: bool) -> ColumnStore:
+    store = ColumnStore()
+    store.capacity = size
+    for i, entry in enumerate(meta):
+        name = os.path.join(path, f"{prefix}{i}")
+        column = Column(entry["kind"])
+        column.integral = entry["integral"]
+        if column.kind == "object":
+            column = _StoredColumn(_StringTable(name, entry["encoding"], mmap, hashable=False))
+            column.integral = entry["integral"]
+        else:
+            column.data = _read_array(name + ".npy", mmap)
+            if column.kind == "category":
+                for value in _read_strings(name + ".categories", entry["encoding"]):
+                    column.code(value)
+        store.columns[entry["key"]] = column
+    return store
+
+
+def write_snapshot(storage: CSRStorage, path: str, chunk_size: int = 1_000_000) -> None:
+    """Write a CSRStorage as a columnar snapshot directory"""
+    os.makedirs(path, exist_ok=True)
+    storage.consolidate()
+    nodes, edges = len(storage.names), storage.edge_count
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "directed": storage.directed,
+        "nodes": nodes,
+        "edges": edges,
+        "id_encoding": _write_strings(os.path.join(path, "node_names"), storage.names, chunk_size),
+        "node_columns": _write_columns(path, "node_col", storage.node_attrs, nodes, chunk_size),
+        "edge_columns": _write_columns(path, "edge_col", storage.edge_attrs, edges, chunk_size),
+    }
+    arrays = {
+        "node_alive": storage.node_alive[:nodes],
+        "src": storage.src[:edges],
+        "dst": storage.dst[:edges],
+        "edge_alive": storage.edge_alive[:edges],
+    }
+    arrays.update(zip(["adj_offsets", "adj_neighbors", "adj_rows"], storage.adjacency()))
+    for name, array in arrays.items():
+        _write_array(os.path.join(path, name + ".npy"), array, chunk_size)
+    # Manifest last, so a snapshot without one is known to be incomplete
+    with open(os.path.join(path, "manifest.json"), "w") as f:
+        json.dump(manifest, f)
+
+
+def read_snapshot(path: str, mmap: bool = True) -> CSRStorage:
+    """Open a columnar snapshot; with mmap, arrays are paged in on first access.
+
+    Node ids and object attributes are decoded as they are read, and the
+    id -> position map is built on the first lookup by id, so opening a
+    snapshot does no per-node work in Python.
+    """
+    with open(os.path.join(path, "manifest.json")) as f:
+        manifest = json.load(f)
+    if manifest["version"] != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {manifest['version']}")
+    storage = CSRStorage(directed=manifest["directed"])
+    arrays = {
+        name: _read_array(os.path.join(path, name + ".npy"), mmap)
+        for name in ["node_alive", "src", "dst", "edge_alive", "adj_offsets", "adj_neighbors", "adj_rows"]
+    }
+    storage.names = _StringTable(os.path.join(path, "node_names"), manifest["id_encoding"], mmap)
+    storage.node_alive = arrays["node_alive"]
+    storage.ids = _NodeIndex(storage)
+    storage.node_attrs = _read_columns(path, "node_col", manifest["node_columns"], manifest["nodes"], mmap)
+    storage.src, storage.dst, storage.edge_alive = arrays["src"], arrays["dst"], arrays["edge_alive"]
+    storage.edge_attrs = _read_columns(path, "edge_col", manifest["edge_columns"], manifest["edges"], mmap)
+    storage.edge_count = storage.sorted_count = manifest["edges"]
+    storage._adjacency = (arrays["adj_offsets"], arrays["adj_neighbors"], arrays["adj_rows"])
+    return storage
@@ -0,0 +1,115 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Hashable, List, Sequence, Tuple
+from .ingest import frame_records
+
+
+def typed_array(values: List) -> Any:
+    """Float array for numeric values (NaN = unset), else a Categorical, else objects"""
+    series = pd.Series(values, dtype=object).infer_objects()
+    if series.dtype.kind in "iuf" or series.isna().all():
+        return series.to_numpy(dtype=float)
+    try:
+        return pd.Categorical(series)
+    except TypeError:
+        return series.to_numpy(dtype=object)
+
+
+def typed_frame(records: List[Dict]) -> pd.DataFrame:
+    """Attribute dicts as a DataFrame with one typed_array column per key"""
+    frame = pd.DataFrame.from_records(records, index=pd.RangeIndex(len(records)))
+    return pd.DataFrame({key: typed_array(frame[key].tolist()) for key in frame.columns},
+                        index=pd.RangeIndex(len(records)))
+
+
+class NetworkXStorage:
+    """Default storage: a plain NetworkX graph of attribute dicts"""
+
+    def __init__(self, directed: bool = False):
+        self.graph = nx.DiGraph() if directed else nx.Graph()
+
+    def add_node(self, node_id: Hashable, attrs: Dict) -> None:
+        self.graph.add_node(node_id, **attrs)
+
+    def add_edge(self, source: Hashable, target: Hashable, attrs: Dict) -> None:
+        self.graph.add_edge(source, target, **attrs)
+
+    def add_nodes_frame(self, ids: np.ndarray, attrs: pd.DataFrame) -> None:
+        self.graph.add_nodes_from(zip(ids.tolist(), frame_records(attrs)))
+
+    def add_edges_frame(self, sources: np.ndarray, targets: np.ndarray, attrs: pd.DataFrame) -> None:
+        self.graph.add_edges_from(zip(sources.tolist(), targets.tolist(), frame_records(attrs)))
+
+    def remove_node(self, node_id: Hashable) -> None:
+        self.graph.remove_node(node_id)
+
+    def remove_edge(self, source: Hashable, target: Hashable) -> None:
+        self.graph.remove_edge(source, target)
+
+    def has_node(self, node_id: Hashable) -> bool:
+        return self.graph.has_node(node_id)
+
+    def has_edge(self, source: Hashable, target: Hashable) -> bool:
+        return self.graph.has_edge(source, target)
+
+    def neighbors(self, node_id: Hashable) -> List:
+        return list(self.graph.neighbors(node_id))
+
+    def predecessors(self, node_id: Hashable) -> List:
+        if self.graph.is_directed():
+            return list(self.graph.predecessors(node_id))
+        return self.neighbors(node_id)
+
+    def incident_edges(self, node_id: Hashable) -> List[Tuple[Hashable, Hashable, Dict]]:
+        if not self.graph.has_node(node_id):
+            raise nx.NetworkXError(f"The node {node_id} is not in the graph.")
+        edges = [(source, target, dict(attrs)) for source, target, attrs in self.graph.edges(node_id, data=True)]
+        if self.graph.is_directed():
+            incoming = self.graph.in_edges(node_id, data=True)
+            edges += [(source, target, dict(attrs)) for source, target, attrs in incoming if source != target]
+        return edges
+
+    def degrees(self, node_ids: Sequence[Hashable]) -> np.ndarray:
+        return np.array([self.graph.degree(node_id) if node_id in self.graph else 0 for node_id in node_ids],
+                        dtype=np.int64)
+
+    def node_attributes(self, node_id: Hashable) -> Dict:
+        return dict(self.graph.nodes[node_id])
+
+    def edge_attributes(self, source: Hashable, target: Hashable) -> Dict:
+        return dict(self.graph.edges[source, target])
+
+    def number_of_nodes(self) -> int:
+        return self.graph.number_of_nodes()
+
+    def number_of_edges(self) -> int:
+        return self.graph.number_of_edges()
+
+    def node_ids(self) -> List:
+        return list(self.graph.nodes)
+
+    def edge_index(self) -> Tuple[np.ndarray, np.ndarray]:
+        position = {node: i for i, node in enumerate(self.graph.nodes)}
+        count = self.graph.number_of_edges()
+        src = np.fromiter((position[u] for u, _ in self.graph.edges), dtype=np.int64, count=count)
+        dst = np.fromiter((position[v] for _, v in self.graph.edges), dtype=np.int64, count=count)
+        return src, dst
+
+    def node_values(self, key: str) -> Any:
+        return typed_array([data.get(key) for _, data in self.graph.nodes(data=True)])
+
+    def edge_values(self, key: str) -> Any:
+        return typed_array([data.get(key) for _, _, data in self.graph.edges(data=True)])
+
+    def node_frame(self) -> pd.DataFrame:
+        return typed_frame([data for _, data in self.graph.nodes(data=True)])
+
+    def edge_frame(self) -> pd.DataFrame:
+        return typed_frame([data for _, _, data in self.graph.edges(data=True)])
+
+    def to_networkx(self) -> nx.Graph:
+        return self.graph
+
+    def from_networkx(self, graph: nx.Graph) -> None:
+        self.graph = graph
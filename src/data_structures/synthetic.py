@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+from .graph import Graph, GraphProperties
+
+ASSET_PREFIXES = {"server": "Server", "printer": "Printer", "network_device": "Switch", "threat": "Threat"}
+DEGREE_DISTRIBUTIONS = ("uniform", "lognormal", "powerlaw")
+
+
+@dataclass
+class ThreatGraphSpec:
+    """Shape of a synthetic asset/threat graph.
+
+    edges is the total edge count, threat_share of them threat -> asset
+    "threatens" edges and the rest asset -> asset "connects" edges. The
+    node counts follow from the mean degrees. out_degree and in_degree
+    pick the distribution of expected degrees per asset ("uniform",
+    "lognormal" or "powerlaw" with the given exponent); threats target
+    assets in proportion to their in-degree weight, so popular assets
+    are also the most threatened.
+    """
+    edges: int = 10_000
+    threat_share: float = 0.2
+    mean_degree: float = 4.0
+    threat_fanout: float = 20.0
+    out_degree: str = "lognormal"
+    in_degree: str = "powerlaw"
+    exponent: float = 2.5
+    asset_mix: Dict[str, float] = field(
+        default_factory=lambda: {"server": 0.6, "network_device": 0.3, "printer": 0.1})
+    named: bool = True
+    seed: int = 0
+
+    @property
+    def threat_edges(self) -> int:
+        return int(round(self.edges * self.threat_share))
+
+    @property
+    def assets(self) -> int:
+        return max(2, int(round((self.edges - self.threat_edges) / self.mean_degree)))
+
+    @property
+    def threats(self) -> int:
+        return max(1, int(round(self.threat_edges / self.threat_fanout))) if self.threat_edges else 0
+
+
+def degree_weights(rng: np.random.Generator, n: int, distribution: str, exponent: float = 2.5) -> np.ndarray:
+    """Expected-degree weights of n nodes (Chung-Lu); only their ratios matter"""
+    if distribution == "uniform":
+        return np.ones(n)
+    if distribution == "lognormal":
+        return rng.lognormal(0.0, 1.0, n)
+    if distribution == "powerlaw":
+        # Pareto tail P(w > x) ~ x^(1 - exponent), capped so no node exceeds n
+        return np.minimum((1.0 - rng.random(n)) ** (-1.0 / (exponent - 1.0)), n)
+    raise ValueError(f"Unknown degree distribution: {distribution}")
+
+
+def _draw(rng: np.random.Generator, weights: np.ndarray, count: int) -> np.ndarray:
+    """count positions drawn with probability proportional to weights, in random order"""
+    # One multinomial over the nodes instead of count binary searches
+    draws = np.repeat(np.arange(len(weights)), rng.multinomial(count, weights / weights.sum()))
+    rng.shuffle(draws)
+    return draws
+
+
+def _edges(rng: np.random.Generator, count: int, sources: np.ndarray, targets: np.ndarray,
+           offset: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """count distinct (source, target) pairs without self loops, drawn by source/target weights"""
+    n = len(targets)
+    src, dst = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    for _ in range(10):
+        missing = count - len(src)
+        if missing <= 0:
+            break
+        draw = missing + missing // 20 + 16
+        new_src, new_dst = _draw(rng, sources, draw) + offset, _draw(rng, targets, draw)
+        loop = new_src == new_dst
+        new_dst[loop] = (new_dst[loop] + 1) % n
+        src, dst = np.concatenate([src, new_src]), np.concatenate([dst, new_dst])
+        # Keep the first occurrence of each pair, in draw order
+        first = ~pd.Series(src * n + dst).duplicated().to_numpy()
+        src, dst = src[first], dst[first]
+    return src[:count], dst[:count]
+
+
+def _names(kinds: pd.Series) -> np.ndarray:
+    """Server1, Server2, ..., Switch1, ...: numbered per asset type like create_asset_graph()"""
+    number = kinds.groupby(kinds, observed=True).cumcount() + 1
+    return (kinds.map(ASSET_PREFIXES).fillna(kinds.str.capitalize()) + number.astype(str)).to_numpy(dtype=object)
+
+
+def threat_graph_frames(spec: ThreatGraphSpec) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Nodes (node_id, asset_type) and edges (source, target, name, risk_score) of a synthetic graph.
+
+    Every step is a vectorized draw from one seeded generator, so the
+    same spec always gives the same graph and 10^7 edges take seconds.
+    """
+    rng = np.random.default_rng(spec.seed)
+    assets, threats = spec.assets, spec.threats
+    types = np.array(list(spec.asset_mix), dtype=object)
+    mix = np.array(list(spec.asset_mix.values()), dtype=float)
+    kinds = np.concatenate([types[_draw(rng, mix, assets)], np.full(threats, "threat", dtype=object)])
+
+    out_weights = degree_weights(rng, assets, spec.out_degree, spec.exponent)
+    in_weights = degree_weights(rng, assets, spec.in_degree, spec.exponent)
+    connect_src, connect_dst = _edges(rng, spec.edges - spec.threat_edges, out_weights, in_weights)
+    threat_src, threat_dst = _edges(rng, spec.threat_edges, np.ones(threats),
+                                    in_weights, offset=assets) if threats else (connect_src[:0], connect_dst[:0])
+
+    ids = _names(pd.Series(kinds)) if spec.named else np.arange(assets + threats)
+    risk = np.full(len(connect_src) + len(threat_src), np.nan)
+    risk[len(connect_src):] = rng.uniform(1.0, 10.0, len(threat_src)).round(2)
+    nodes = pd.DataFrame({"node_id": ids, "asset_type": kinds})
+    edges = pd.DataFrame({
+        "source": ids[np.concatenate([connect_src, threat_src])],
+        "target": ids[np.concatenate([connect_dst, threat_dst])],
+        "name": np.repeat(np.array(["connects", "threatens"], dtype=object), [len(connect_src), len(threat_src)]),
+        "risk_score": risk,
+    })
+    return nodes, edges
+
+
+def generate_threat_graph(spec: Optional[ThreatGraphSpec] = None, backend: str = "csr", **options) -> Graph:
+    """Directed Graph from threat_graph_frames(); options override fields of spec"""
+    spec = spec or ThreatGraphSpec()
+    if options:
+        spec = ThreatGraphSpec(**{**spec.__dict__, **options})
+    nodes, edges = threat_graph_frames(spec)
+    graph = Graph(GraphProperties(directed=True, backend=backend))
+    graph.add_nodes_bulk(nodes, chunk_size=1_000_000)
+    graph.add_edges_bulk(edges, chunk_size=1_000_000)
+    return graph
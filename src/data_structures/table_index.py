@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+# Filter operators: ("==", value), ("in", values), ("between", (low, high)),
+# (">=", value), ("<=", value), ("prefix", text)
+OPERATORS = ("==", "in", "between", ">=", "<=", "prefix")
+
+
+def column_kind(series: pd.Series) -> str:
+    """"number", "datetime" or "text": how filter values for a column are compared"""
+    if pd.api.types.is_bool_dtype(series):
+        return "text"
+    if pd.api.types.is_numeric_dtype(series):
+        return "number"
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "datetime"
+    return "text"
+
+
+class TableIndex:
+    """Per-column sorted and hash indexes over a DataFrame, built on first use.
+
+    A sorted index is the stable argsort of a column (missing values last)
+    plus the sorted values, so range and prefix filters are two binary
+    searches and ordering by the column is a lookup. A hash index maps
+    each value to its row positions for == and in filters. Text columns
+    are indexed by their string form; numbers and datetimes keep their
+    type. Queries return row positions, so the frame is never copied.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+        self.kinds = {column: column_kind(frame[column]) for column in frame.columns}
+        self._sorted: Dict[Hashable, Tuple[np.ndarray, np.ndarray]] = {}
+        self._hash: Dict[Hashable, Dict[Any, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def _values(self, column: Hashable) -> pd.Series:
+        series = self.frame[column].reset_index(drop=True)
+        if self.kinds[column] == "text":
+            return series.astype(str).where(series.notna())
+        return series
+
+    def sorted_index(self, column: Hashable) -> Tuple[np.ndarray, np.ndarray]:
+        """(row order, sorted non-missing values) for column"""
+        if column not in self._sorted:
+            values = self._values(column)
+            order = values.sort_values(kind="stable", na_position="last").index.to_numpy()
+            present = int(values.notna().sum())
+            self._sorted[column] = (order, values.to_numpy()[order[:present]])
+        return self._sorted[column]
+
+    def hash_index(self, column: Hashable) -> Dict[Any, np.ndarray]:
+        """value -> row positions for column"""
+        if column not in self._hash:
+            values = self._values(column)
+            self._hash[column] = values.groupby(values, sort=False, observed=True).indices
+        return self._hash[column]
+
+    def coerce(self, column: Hashable, value: Any) -> Any:
+        """value converted to the type column is compared in (e.g. text input to a number)"""
+        kind = self.kinds[column]
+        if kind == "number":
+            return float(value)
+        if kind == "datetime":
+            return pd.Timestamp(value)
+        return str(value)
+
+    def _range(self, column: Hashable, low: Any = None, high: Any = None, high_open: bool = False) -> np.ndarray:
+        order, values = self.sorted_index(column)
+        i = 0 if low is None else int(np.searchsorted(values, low, side="left"))
+        j = len(values) if high is None else int(np.searchsorted(values, high, side="left" if high_open else "right"))
+        return order[i:max(i, j)]
+
+    def positions(self, column: Hashable, op: str, value: Any) -> np.ndarray:
+        """Row positions matching one filter, in no particular order"""
+        if op in ("==", "in"):
+            values = [value] if op == "==" else list(value)
+            index = self.hash_index(column)
+            found = [index[v] for v in dict.fromkeys(self.coerce(column, v) for v in values) if v in index]
+            return np.concatenate(found) if found else np.zeros(0, dtype=np.int64)
+        if op == "between":
+            low, high = value
+            return self._range(column, None if low is None else self.coerce(column, low),
+                               None if high is None else self.coerce(column, high))
+        if op == ">=":
+            return self._range(column, low=self.coerce(column, value))
+        if op == "<=":
+            return self._range(column, high=self.coerce(column, value))
+        if op == "prefix":
+            text = str(value)
+            # Strings starting with text sort between text and text + the highest code point
+            return self._range(column, text, text + "\U0010ffff", high_open=True)
+        raise ValueError(f"Unknown filter operator: {op}")
+
+    def query(self, filters: Iterable[Tuple[Hashable, str, Any]] = (), sort_by: Optional[Hashable] = None,
+              descending: bool = False) -> np.ndarray:
+        """Row positions passing every filter, ordered by sort_by (missing values last)"""
+        keep: Optional[np.ndarray] = None
+        for column, op, value in filters:
+            found = np.zeros(len(self), dtype=bool)
+            found[self.positions(column, op, value)] = True
+            keep = found if keep is None else keep & found
+        if sort_by is None:
+            return np.arange(len(self)) if keep is None else np.flatnonzero(keep)
+        order, values = self.sorted_index(sort_by)
+        if descending:
+            present = len(values)
+            order = np.concatenate([order[:present][::-1], order[present:]])
+        return order if keep is None else order[keep[order]]
+
+    def page(self, rows: np.ndarray, page: int, page_size: int) -> pd.DataFrame:
+        """Rows of the frame for one page (numbered from 1) of a query result"""
+        start = (page - 1) * page_size
+        return self.frame.iloc[rows[start:start + page_size]]
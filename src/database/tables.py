@@ -0,0 +1,177 @@
+import threading
+import pandas as pd
+import sqlalchemy as sa
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Union
+from data_structures.ingest import IngestStats
+from monitoring.metrics import timed
+
+# Bound parameters per INSERT statement; SQLite allows 32766, MySQL 65535
+MAX_PARAMETERS = 32_000
+
+_engines: Dict[str, sa.Engine] = {}
+_engines_lock = threading.Lock()
+
+
+def mysql_url(user: str, password: str, host: str, database: str) -> str:
+    """Connection string for MySQL via PyMySQL, with the password escaped"""
+    url = sa.URL.create("mysql+pymysql", username=user, password=password, host=host, database=database)
+    return url.render_as_string(hide_password=False)
+
+
+def sqlite_url(path: str = ":memory:") -> str:
+    """Connection string for a local SQLite database, a stand-in for the threat database"""
+    return f"sqlite:///{path}"
+
+
+def get_engine(url: str, pool_size: int = 5, max_overflow: int = 10, pool_recycle: int = 3600) -> sa.Engine:
+    """One pooled engine per connection string, created on first use"""
+    with _engines_lock:
+        engine = _engines.get(url)
+        if engine is None:
+            options: Dict[str, Any] = {"pool_pre_ping": True}
+            if not url.startswith("sqlite"):
+                options.update(pool_size=pool_size, max_overflow=max_overflow, pool_recycle=pool_recycle)
+            engine = _engines[url] = sa.create_engine(url, **options)
+            if url.startswith("sqlite") and ":memory:" not in url:
+                # Write-ahead logging lets readers stream a table while another connection writes
+                sa.event.listen(engine, "connect", _sqlite_wal)
+        return engine
+
+
+def _sqlite_wal(connection: Any, record: Any) -> None:
+    connection.execute("PRAGMA journal_mode=WAL")
+
+
+def dispose_engines() -> None:
+    """Close every pooled connection"""
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+
+
+def _table(engine: sa.Engine, name: str) -> sa.Table:
+    # Reflection checks the table and column names, so none are pasted into SQL
+    return sa.Table(name, sa.MetaData(), autoload_with=engine)
+
+
+def _predicate(table: sa.Table, where: Optional[Mapping[str, Any]]) -> List:
+    """WHERE clauses from {column: value}: lists/sets mean IN, (low, high) tuples BETWEEN (None = open)"""
+    clauses = []
+    for name, value in (where or {}).items():
+        column = table.c[name]
+        if isinstance(value, tuple):
+            low, high = value
+            if low is not None:
+                clauses.append(column >= low)
+            if high is not None:
+                clauses.append(column <= high)
+        elif isinstance(value, (list, set, frozenset)):
+            clauses.append(column.in_(list(value)))
+        elif value is None:
+            clauses.append(column.is_(None))
+        else:
+            clauses.append(column == value)
+    return clauses
+
+
+def select_query(engine: sa.Engine, table_name: str, columns: Optional[List[str]] = None,
+                 where: Optional[Mapping[str, Any]] = None, limit: Optional[int] = None) -> sa.Select:
+    """SELECT with the column projection and filters done by the database"""
+    table = _table(engine, table_name)
+    query = sa.select(*[table.c[name] for name in columns]) if columns else sa.select(table)
+    query = query.where(*_predicate(table, where))
+    return query.limit(limit) if limit is not None else query
+
+
+@timed()
+def count_rows(engine: sa.Engine, table_name: str, where: Optional[Mapping[str, Any]] = None) -> int:
+    table = _table(engine, table_name)
+    query = sa.select(sa.func.count()).select_from(table).where(*_predicate(table, where))
+    with engine.connect() as connection:
+        return connection.execute(query).scalar_one()
+
+
+def iter_table(engine: sa.Engine, table_name: str, columns: Optional[List[str]] = None,
+               where: Optional[Mapping[str, Any]] = None, chunk_size: int = 100_000,
+               limit: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """Stream a table as DataFrame chunks over a server-side cursor"""
+    query = select_query(engine, table_name, columns, where, limit)
+    with engine.connect() as connection:
+        connection = connection.execution_options(stream_results=True, max_row_buffer=chunk_size)
+        yield from pd.read_sql(query, connection, chunksize=chunk_size)
+
+
+@timed()
+def read_table(engine: sa.Engine, table_name: str, columns: Optional[List[str]] = None,
+               where: Optional[Mapping[str, Any]] = None, chunk_size: int = 100_000,
+               limit: Optional[int] = None) -> pd.DataFrame:
+    """Whole (projected, filtered) table in memory; use iter_table for large tables"""
+    chunks = list(iter_table(engine, table_name, columns, where, chunk_size, limit))
+    if not chunks:
+        return pd.read_sql(select_query(engine, table_name, columns, where, 0), engine)
+    return pd.concat(chunks, ignore_index=True)
+
+
+@timed()
+def write_table(engine: sa.Engine, table_name: str, data: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+                if_exists: str = "append", chunk_size: int = 10_000, method: Optional[str] = "auto") -> IngestStats:
+    """Write a DataFrame or a stream of them in one transaction, chunk_size rows per INSERT.
+
+    method="auto" sends multi-row INSERTs to server databases, where each
+    statement is a round trip, and uses the driver's executemany on SQLite,
+    which runs in-process and is faster that way.
+    """
+    if method == "auto":
+        method = None if engine.dialect.name == "sqlite" else "multi"
+    stats = IngestStats()
+    frames = [data] if isinstance(data, pd.DataFrame) else data
+    with engine.begin() as connection:
+        for frame in frames:
+            rows = chunk_size
+            if method == "multi":
+                # Keep each INSERT under the driver's bound-parameter limit
+                rows = max(1, min(chunk_size, MAX_PARAMETERS // max(len(frame.columns), 1)))
+            frame.to_sql(table_name, connection, if_exists=if_exists, index=False, chunksize=rows, method=method)
+            if_exists = "append"
+            stats.rows += len(frame)
+    return stats.finish()
+
+
+def _insert_select(engine: sa.Engine, source_table: str, target_table: str, columns: Optional[List[str]],
+                   where: Optional[Mapping[str, Any]], if_exists: str) -> IngestStats:
+    """INSERT INTO target SELECT ... FROM source, run entirely by the database"""
+    stats = IngestStats()
+    query = select_query(engine, source_table, columns, where)
+    with engine.begin() as connection:
+        exists = sa.inspect(connection).has_table(target_table)
+        if exists and if_exists == "fail":
+            raise ValueError(f"Table '{target_table}' already exists.")
+        metadata = sa.MetaData()
+        if exists and if_exists == "append":
+            target = sa.Table(target_table, metadata, autoload_with=connection)
+        else:
+            if exists:
+                sa.Table(target_table, metadata, autoload_with=connection).drop(connection)
+                metadata = sa.MetaData()
+            target = sa.Table(target_table, metadata,
+                              *[sa.Column(column.name, column.type) for column in query.selected_columns])
+            target.create(connection)
+        names = [column.name for column in query.selected_columns]
+        stats.rows = connection.execute(target.insert().from_select(names, query)).rowcount
+    return stats.finish()
+
+
+@timed()
+def copy_table(source: sa.Engine, source_table: str, target: sa.Engine, target_table: str,
+               columns: Optional[List[str]] = None, where: Optional[Mapping[str, Any]] = None,
+               if_exists: str = "append", chunk_size: int = 100_000) -> IngestStats:
+    """Copy rows between tables without holding them in memory.
+
+    Within one database this is a single INSERT ... SELECT; across
+    databases rows are streamed chunk by chunk.
+    """
+    if source is target:
+        return _insert_select(source, source_table, target_table, columns, where, if_exists)
+    chunks = iter_table(source, source_table, columns, where, chunk_size)
+    return write_table(target, target_table, chunks, if_exists=if_exists, chunk_size=chunk_size)
@@ -0,0 +1,113 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+# Make src/ importable when Streamlit runs the dashboard directly
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from analytics.rollups import RollupStore
+from streaming.service import IngestionService
+from streaming.sources import FakeFeed, FileTailSource, SocketSource
+
+COUNTRIES = ["USA", "China", "Russia", "Iran", "North Korea", "Brazil", "India", "Germany"]
+THREAT_TYPES = ["Ransomware", "Malware", "Phishing", "Others"]
+
+
+def demo_events(count, start="2024-01-01", days=10, seed=None):
+    # Random threat events standing in for a feed
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp(start)
+    offsets = rng.integers(0, days * 86_400, count)
+    return pd.DataFrame({
+        "timestamp": start + pd.to_timedelta(np.sort(offsets), unit="s"),
+        "country": pd.Categorical.from_codes(rng.integers(0, len(COUNTRIES), count), COUNTRIES),
+        "threat_type": pd.Categorical.from_codes(rng.integers(0, len(THREAT_TYPES), count), THREAT_TYPES),
+    })
+
+
+@st.cache_resource
+def threat_events():
+    """One pre-aggregated event store per server process, loaded once"""
+    events = RollupStore(["country", "threat_type"])
+    events.append(demo_events(100_000, seed=0))
+    return events
+
+
+def feed_source(feed):
+    # THREAT_FEED: a JSON-lines file to follow, a host:port to read from, or unset for a fake feed
+    if not feed:
+        return FakeFeed(rate=200)
+    host, _, port = feed.rpartition(":")
+    if host and port.isdigit() and not os.path.exists(feed):
+        return SocketSource(host, int(port))
+    return FileTailSource(feed)
+
+
+@st.cache_resource
+def ingestion_service():
+    """One live ingestion service per server process, feeding the shared event store; started by resume()"""
+    return IngestionService(feed_source(os.environ.get("THREAT_FEED")), events=threat_events())
+
+
+def next_day(events):
+    # Start of the day after the latest event, where simulated new events go
+    return events.series("country", "day").index.max() + pd.Timedelta(days=1)
+
+
+def _range(start_date, end_date):
+    # date_input ranges include the end date
+    if start_date is None:
+        return None, None
+    return pd.Timestamp(start_date), pd.Timestamp(end_date) + pd.Timedelta(days=1)
+
+
+# Leading underscore: the store is not hashed; version is the explicit cache key.
+# Each call is a binary search over pre-aggregated buckets, never a scan of events.
+@st.cache_data(max_entries=64, ttl=3600)
+def timeline_frame(_events, version, granularity="day", start_date=None, end_date=None):
+    timeline = _events.series("country", granularity, *_range(start_date, end_date))
+    return pd.DataFrame({"Date": timeline.index, "Threats": timeline["count"].to_numpy()})
+
+
+@st.cache_data(max_entries=64, ttl=3600)
+def geo_frame(_events, version, start_date=None, end_date=None):
+    countries = _events.counts("country", *_range(start_date, end_date))
+    countries = countries[countries > 0]
+    return pd.DataFrame({"country": countries.index.astype(str), "threats": countries.to_numpy()})
+
+
+@st.cache_data(max_entries=64, ttl=3600)
+def distribution_frame(_events, version, start_date=None, end_date=None):
+    types = _events.counts("threat_type", *_range(start_date, end_date))
+    return pd.DataFrame({"Type": types.index.astype(str), "Count": types.to_numpy()})
+
+
+@st.cache_data(max_entries=8, ttl=3600)
+def threat_summary(_events, version):
+    # Compact context for the chat assistant
+    return {
+        "timeline": timeline_frame(_events, version)["Threats"].tolist(),
+        "geo": geo_frame(_events, version).set_index("country")["threats"].to_dict(),
+    }
+
+
+@st.cache_data(max_entries=64, ttl=3600)
+def timeline_figure(_events, version, granularity, start_date, end_date):
+    df_timeline = timeline_frame(_events, version, granularity, start_date, end_date)
+    return px.line(df_timeline, x='Date', y='Threats', title=f'Threat Activity per {granularity.title()}')
+
+
+@st.cache_data(max_entries=64, ttl=3600)
+def geo_figure(_events, version, start_date, end_date):
+    return px.choropleth(geo_frame(_events, version, start_date, end_date), locations='country',
+                         locationmode='country names',
+                         color='threats',
+                         title='Threat Origin Distribution')
+
+
+@st.cache_data(max_entries=64, ttl=3600)
+def distribution_figure(_events, version, start_date, end_date):
+    return px.pie(distribution_frame(_events, version, start_date, end_date), values='Count', names='Type',
+                  title='Threat Distribution')
@@ -1,4 +1,29 @@
 import streamlit as st
+import os
+import sys
+
+# Make src/ importable when Streamlit runs this page directly
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from llm.retrieval import GraphRetriever
+
+RETRIEVE_NODES = 5
+
+
+def graph_answer(graph, question):
+    """Markdown listing of the asset graph nodes and edges most relevant to question"""
+    if "graph_retriever" not in st.session_state:
+        st.session_state["graph_retriever"] = GraphRetriever().build(graph)
+    found = st.session_state["graph_retriever"].retrieve(graph, question, k=RETRIEVE_NODES)
+    if not found:
+        return "No matching assets or threats in the graph."
+    lines = []
+    for item in found:
+        attrs = ", ".join(f"{key}: {value}" for key, value in item["attributes"].items())
+        lines.append(f"**{item['node']}**" + (f" ({attrs})" if attrs else ""))
+        for edge in item["edges"]:
+            risk = f" (risk {edge[3]})" if len(edge) > 3 else ""
+            lines.append(f"- {edge[0]} {edge[1]} {edge[2]}{risk}")
+    return "\n".join(lines)
 
 def main():
     st.title("Simple LLM Chat Interface")
@@ -20,8 +45,11 @@ def main():
         with st.chat_message("user"):
             st.write(user_input)
 
-        # Simple response (placeholder or integrated with model)
-        response = "Placeholder response. Data or actions can be integrated here."
+        # Answer from the asset graph built on the Threat Graph page
+        if "asset_graph" in st.session_state:
+            response = graph_answer(st.session_state["asset_graph"], user_input)
+        else:
+            response = "No asset graph loaded yet. Create one on the Threat Graph page first."
 
         # Example: parse user_input to interact with other app data
         # if user_input.startswith("ADD"):
@@ -1,37 +1,110 @@
 import streamlit as st
-import pandas as pd
-import sqlalchemy
 import time
+import os
+import sys
 
-def get_engine(db_user, db_pass, db_host, db_name):
-    """Create a SQLAlchemy engine for the specified database."""
-    connection_string = f"mysql+pymysql://{db_user}:{db_pass}@{db_host}/{db_name}"
-    return sqlalchemy.create_engine(connection_string)
+# Make src/ importable when Streamlit runs this page directly
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from database.tables import (copy_table, count_rows, get_engine, iter_table, mysql_url, read_table, sqlite_url,
+                             write_table)
+from models.jobs import ScoringJob
+from models.registry import MODEL_NAMES, feature_columns, load_model
+from monitoring.metrics import timed
 
-def import_data_from_db(engine, table_name):
-    """Import data from the specified table."""
-    query = f"SELECT * FROM {table_name}"
-    df = pd.read_sql(query, con=engine)
-    return df
+PREVIEW_ROWS = 1000
 
-def export_data_to_db(engine, table_name, df, if_exists="append"):
-    """Export a dataframe to the specified table."""
-    df.to_sql(table_name, con=engine, if_exists=if_exists, index=False)
+def parse_columns(text):
+    """Column names from a comma-separated list; None (all columns) when blank."""
+    columns = [name.strip() for name in text.split(",") if name.strip()]
+    return columns or None
+
+def parse_filter(text):
+    """Equality filters from "column=value, column=value"."""
+    where = {}
+    for part in text.split(","):
+        if "=" in part:
+            name, value = part.split("=", 1)
+            where[name.strip()] = value.strip()
+    return where
+
+@timed()
+def import_data_from_db(engine, table_name, columns=None, where=None):
+    """Preview and row count of the selected rows; the full table stays in the database."""
+    preview = read_table(engine, table_name, columns, where, limit=PREVIEW_ROWS)
+    return preview, count_rows(engine, table_name, where)
+
+@timed()
+def export_data_to_db(engine, query, table_name, chunk_size, if_exists="append"):
+    """Copy the imported rows to the specified table, streaming in chunks."""
+    return copy_table(engine, query["table"], engine, table_name, query["columns"], query["where"],
+                      if_exists=if_exists, chunk_size=chunk_size)
+
+@timed()
+def start_scoring_job(model, chunk_size, scores_table):
+    """Score the imported rows in the background, streaming predictions to scores_table.
+
+    With a database connection the whole selection is read in chunks and
+    the scores are written back as they are produced; otherwise the
+    preview in memory is scored.
+    """
+    data = st.session_state["imported_data"]
+    keep = [column for column in data.columns if column not in model.features]
+    if "engine" in st.session_state and "import_query" in st.session_state:
+        engine, query = st.session_state["engine"], st.session_state["import_query"]
+        chunks = iter_table(engine, query["table"], query["columns"], query["where"], chunk_size)
+        total = count_rows(engine, query["table"], query["where"])
+        sink = lambda frames: write_table(engine, scores_table, frames, if_exists="replace", chunk_size=chunk_size)
+        return ScoringJob(model, chunks, total, sink=sink, keep=keep).start()
+    chunks = [data.iloc[start:start + chunk_size] for start in range(0, len(data), chunk_size)]
+    return ScoringJob(model, chunks, len(data), keep=keep).start()
+
+def show_scoring_job(job, scores_table):
+    progress = job.progress
+    total = progress.total if progress.total is not None else "?"
+    st.progress(progress.fraction, text=f"{progress.rows} of {total} rows scored, "
+                                        f"{progress.rows_per_second:,.0f} rows/s")
+    if not progress.done:
+        if st.button("Cancel Run"):
+            job.cancel()
+        # Poll the background job without blocking the rest of the page
+        time.sleep(0.5)
+        st.rerun()
+    elif progress.error:
+        st.error(f"Model error: {progress.error}")
+    elif progress.cancelled and job.sink is not None:
+        st.warning(f"Model run cancelled after {progress.rows} rows; '{scores_table}' holds only those scores.")
+    elif progress.cancelled:
+        st.warning(f"Model run cancelled after {progress.rows} rows.")
+        st.dataframe(job.frame(), use_container_width=True)
+    elif job.sink is not None:
+        st.success(f"Model run complete! Wrote {progress.rows} scores to '{scores_table}' in {progress.seconds:.1f}s.")
+    else:
+        st.success(f"Model run complete! Scored {progress.rows} rows in {progress.seconds:.1f}s.")
+        st.dataframe(job.frame(), use_container_width=True)
 
 def model_interface():
     st.title("Model Interface")
 
     # Sidebar for DB configs
     st.sidebar.subheader("Database Connection")
-    db_user = st.sidebar.text_input("DB User", value="root")
-    db_pass = st.sidebar.text_input("DB Password", type="password")
-    db_host = st.sidebar.text_input("DB Host", value="localhost")
-    db_name = st.sidebar.text_input("DB Name", value="threat_db")
+    backend = st.sidebar.radio("Backend", ["MySQL", "SQLite"])
+    if backend == "MySQL":
+        db_user = st.sidebar.text_input("DB User", value="root")
+        db_pass = st.sidebar.text_input("DB Password", type="password")
+        db_host = st.sidebar.text_input("DB Host", value="localhost")
+        db_name = st.sidebar.text_input("DB Name", value="threat_db")
+        url = mysql_url(db_user, db_pass, db_host, db_name)
+    else:
+        url = sqlite_url(st.sidebar.text_input("DB File", value="threat_db.sqlite"))
+    chunk_size = st.sidebar.number_input("Rows per chunk", min_value=1000, value=50_000, step=1000)
 
-    # Get engine on button click
+    # Engines are pooled and shared per connection string, so reconnecting is cheap
     if st.sidebar.button("Connect to DB"):
         try:
-            st.session_state["engine"] = get_engine(db_user, db_pass, db_host, db_name)
+            engine = get_engine(url)
+            with engine.connect():
+                pass
+            st.session_state["engine"] = engine
             st.sidebar.success("Connected to database!")
         except Exception as e:
             st.sidebar.error(f"Connection error: {e}")
@@ -40,12 +113,18 @@ def model_interface():
     st.subheader("Data Import/Export")
 
     table_name_import = st.text_input("Table name to import from", "threat_data")
+    columns_import = st.text_input("Columns (comma-separated, blank for all)", "")
+    filter_import = st.text_input("Filter (column=value, ...)", "")
     if st.button("Import Data"):
         if "engine" in st.session_state:
             try:
-                df_imported = import_data_from_db(st.session_state["engine"], table_name_import)
+                query = {"table": table_name_import, "columns": parse_columns(columns_import),
+                         "where": parse_filter(filter_import)}
+                df_imported, total = import_data_from_db(st.session_state["engine"], query["table"],
+                                                         query["columns"], query["where"])
+                st.session_state["import_query"] = query
                 st.session_state["imported_data"] = df_imported
-                st.success("Data imported successfully!")
+                st.success(f"Selected {total} rows (showing the first {len(df_imported)}).")
                 st.dataframe(df_imported, use_container_width=True)
             except Exception as e:
                 st.error(f"Import error: {e}")
@@ -55,10 +134,11 @@ def model_interface():
     table_name_export = st.text_input("Table name to export to", "export_table")
     if st.button("Export Data"):
         if "engine" in st.session_state:
-            if "imported_data" in st.session_state:
+            if "import_query" in st.session_state:
                 try:
-                    export_data_to_db(st.session_state["engine"], table_name_export, st.session_state["imported_data"])
-                    st.success("Data exported successfully!")
+                    stats = export_data_to_db(st.session_state["engine"], st.session_state["import_query"],
+                                              table_name_export, chunk_size)
+                    st.success(f"Exported {stats.rows} rows in {stats.seconds:.1f}s.")
                 except Exception as e:
                     st.error(f"Export error: {e}")
             else:
@@ -68,37 +148,37 @@ def model_interface():
 
     # Model Selection
     st.subheader("Model Selection")
-    all_models = ["XGBoost", "RandomForest", "NeuralNetwork", "LogisticRegression"]
-    chosen_model = st.selectbox("Select a model", all_models)
+    chosen_model = st.selectbox("Select a model", list(MODEL_NAMES))
+    model_file = st.text_input("Model parameters (.npz, blank for untrained defaults)", "")
 
+    # Models read from a parameters file are loaded once and shared across sessions
     if st.button("Load Model"):
-        st.success(f"{chosen_model} model selected!")
-        st.session_state["model_name"] = chosen_model
+        if "imported_data" in st.session_state:
+            data = st.session_state["imported_data"]
+            try:
+                st.session_state["model"] = load_model(chosen_model, feature_columns(data), model_file or None,
+                                                       sample=data)
+                st.session_state["model_name"] = chosen_model
+                st.success(f"{chosen_model} model loaded on {len(st.session_state['model'].features)} features!")
+                if not st.session_state["model"].trained:
+                    st.warning("No parameters file given: these are untrained defaults and their scores are "
+                               "placeholders.")
+            except Exception as e:
+                st.error(f"Model load error: {e}")
+        else:
+            st.warning("Please import data first; its numeric columns are the model inputs.")
 
     # Run Model
+    scores_table = st.text_input("Table name for scores", "model_scores")
     if st.button("Run Model"):
-        st.subheader("Model Output")
-        running = True
-        i = 0
-        text_area = st.empty()
-        while running:
-            if i%3 == 0:
-                text_area.write("Running model.")
-                time.sleep(2)
-
-            elif i%3 == 1:
-                text_area.write("Running model..")
-                time.sleep(2)
-            elif i%3 == 2:
-                text_area.write("Running model...")
-                time.sleep(2)
-            
-            i += 1
-            if i == 5:
-                running = False
-                break
-
-        st.write("Model run complete!")
+        if "model" in st.session_state:
+            st.session_state["scoring_job"] = start_scoring_job(st.session_state["model"], chunk_size, scores_table)
+        else:
+            st.warning("Please load a model first.")
+    if "scoring_job" in st.session_state:
+        untrained = not st.session_state["scoring_job"].model.trained
+        st.subheader(f"Model Output ({st.session_state.get('model_name')}{', untrained' if untrained else ''})")
+        show_scoring_job(st.session_state["scoring_job"], scores_table)
 
 if __name__ == "__main__":
-    model_interface()
\ No newline at end of file
+    model_interface()
@@ -0,0 +1,69 @@
+import streamlit as st
+import os
+import sys
+
+# Make src/ importable when Streamlit runs this page directly
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from monitoring import metrics
+
+
+def profiler_kinds():
+    # pyinstrument is optional; offer it only when installed
+    try:
+        import pyinstrument  # noqa: F401
+    except ImportError:
+        return ["cprofile"]
+    return list(metrics.PROFILERS)
+
+def latency_panel():
+    st.subheader("Latency per operation")
+    st.caption("Percentiles over the last 4096 calls of each operation; calls and total since the last reset.")
+    summary = metrics.summary()
+    if summary.empty:
+        st.info("Nothing recorded yet. Use the dashboard pages and refresh.")
+    else:
+        st.dataframe(summary.round({"total_s": 3, "p50_ms": 2, "p95_ms": 2, "p99_ms": 2}),
+                     use_container_width=True, hide_index=True)
+    counters = metrics.counters()
+    if counters:
+        st.subheader("Counters")
+        st.dataframe([{"counter": name, "value": value} for name, value in sorted(counters.items())],
+                     use_container_width=True, hide_index=True)
+
+def profile_panel():
+    st.subheader("Profile the next call")
+    operations = metrics.operations()
+    if not operations:
+        st.caption("Operations appear here once they have been called with instrumentation on.")
+        return
+    left, right = st.columns(2)
+    operation = left.selectbox("Operation", operations)
+    kind = right.selectbox("Profiler", profiler_kinds())
+    if st.button("Profile next call"):
+        metrics.profile_next(operation, kind)
+    pending = metrics.armed()
+    if pending:
+        st.caption("Waiting for: " + ", ".join(f"{name} ({kind})" for name, kind in pending.items()))
+    for i, (name, kind, seconds, text) in enumerate(reversed(metrics.reports())):
+        with st.expander(f"{name}: {seconds * 1e3:.1f} ms ({kind})", expanded=i == 0):
+            st.code(text, language=None)
+            st.download_button("Download report", text, file_name=f"{name}.{kind}.txt", key=f"report_{i}")
+
+def main():
+    # Registered by the dashboard's navigation only for .../profiling?debug=1
+    st.title("Profiling")
+    on = st.toggle("Instrumentation on (all sessions)", value=metrics.enabled())
+    if on and not metrics.enabled():
+        metrics.enable()
+    elif not on and metrics.enabled():
+        metrics.disable()
+    left, right = st.columns(2)
+    if left.button("Refresh"):
+        st.rerun()
+    if right.button("Reset"):
+        metrics.reset()
+    latency_panel()
+    profile_panel()
+
+if __name__ == "__main__":
+    main()
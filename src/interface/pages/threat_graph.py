@@ -3,6 +3,21 @@ import networkx as nx
 import random
 import plotly.graph_objects as go
 import pandas as pd
+import numpy as np
+import itertools
+import os
+import sys
+import uuid
+
+# Make src/ importable when Streamlit runs this page directly
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from dashboard_data import ingestion_service
+from data_structures.ego import EgoExplorer
+from data_structures.graph import Graph
+from data_structures.layout import LayoutCache, networkx_arrays
+from data_structures.synthetic import generate_threat_graph
+from monitoring.metrics import timed
 
 
 def create_asset_graph():
@@ -46,29 +61,91 @@ def create_asset_graph():
     
     return G
 
-def display_asset_graph(G):
-    # Generate layout positions
-    pos = nx.spring_layout(G, seed=42)
-
-    # Edge coordinates
-    edge_x = []
-    edge_y = []
-    edge_text = []
-    for source, target, data in G.edges(data=True):
-        x0, y0 = pos[source]
-        x1, y1 = pos[target]
-        edge_x.extend([x0, x1, None])
-        edge_y.extend([y0, y1, None])
-        
-        risk = data.get("risk_score", "")
-        label = data.get("name", "")
-        if risk != "":
-            edge_text.append(f"{label} | Risk: {risk}")
-        else:
-            edge_text.append(label)
-        edge_text.extend(["", ""])  # Align with None spacing
+NODE_COLORS = {"server": "lightblue", "printer": "lightgreen", "network_device": "orange"}  # others: threat, red
+LABEL_LIMIT = 200        # above this many nodes/edges, labels move to hover text
+CLUSTER_LIMIT = 50_000   # above this many edges, nodes are drawn as grid clusters
+CLUSTER_GRID = 64
+EGO_START_OPTIONS = 200  # suggested starting nodes
+WHOLE_GRAPH_LIMIT = 1_000  # larger graphs open in exploration mode
+GRAPH_SIZES = {"Demo": None, "1,000 edges": 1_000, "10,000 edges": 10_000,
+               "100,000 edges": 100_000, "1,000,000 edges": 1_000_000}
+LIVE_GRAPH = "Live feed"  # what the dashboard's ingestion service has built so far
+
+@timed()
+def graph_arrays(G):
+    # One pass over the graph into arrays; everything after this is vectorized
+    nodes, src, dst = networkx_arrays(G)
+    asset_types = pd.Series([data.get("asset_type") for _, data in G.nodes(data=True)], dtype=object)
+    names = pd.Series([data.get("name", "") for _, _, data in G.edges(data=True)], dtype=object).astype(str)
+    risks = pd.Series([data.get("risk_score") for _, _, data in G.edges(data=True)], dtype=object)
+    edge_text = names.where(risks.isna(), names + " | Risk: " + risks.astype(str))
+    return nodes, src, dst, asset_types, edge_text.to_numpy()
+
+def graph_key(G):
+    # A token kept on the graph object plus its size: unlike id(G), a token is never
+    # reused by a later graph, and the page replaces its graph instead of mutating it
+    if not hasattr(G, "layout_token"):
+        G.layout_token = uuid.uuid4().hex
+    return G.layout_token, G.number_of_nodes(), G.number_of_edges()
+
+@timed()
+def graph_layout(nodes, src, dst, cache=None, key=None):
+    # Positions persist across reruns: the same key reuses them as they are, a new key
+    # re-lays out only the changed parts of the graph
+    if cache is None:
+        if "layout_cache" not in st.session_state:
+            st.session_state["layout_cache"] = LayoutCache()
+        cache = st.session_state["layout_cache"]
+    return cache.positions_for(nodes, src, dst, key=key)
+
+def edge_lines(positions, src, dst):
+    # x0, x1, NaN per edge: one polyline trace for all edges
+    xy = np.full((len(src), 3, 2), np.nan)
+    xy[:, 0], xy[:, 1] = positions[src], positions[dst]
+    return xy[:, :, 0].ravel(), xy[:, :, 1].ravel()
+
+def cluster_nodes(positions, src, dst, asset_types, grid=CLUSTER_GRID):
+    # Level of detail: one marker per occupied grid cell, coloured by its most common
+    # asset type, and one line per pair of connected cells
+    low = positions.min(axis=0)
+    extent = max(np.ptp(positions, axis=0).max(), 1e-9)
+    xy = np.minimum(((positions - low) / extent * grid).astype(np.int64), grid - 1)
+    cell = xy[:, 0] * grid + xy[:, 1]
+    cells, members = np.unique(cell, return_inverse=True)
+    counts = np.bincount(members)
+    centres = np.stack([np.bincount(members, positions[:, 0]), np.bincount(members, positions[:, 1])], axis=1)
+    centres /= counts[:, None]
+    types = pd.DataFrame({"cluster": members, "asset_type": asset_types.fillna("threat").to_numpy()})
+    dominant = types.groupby(["cluster", "asset_type"]).size().sort_values().groupby(level=0).tail(1)
+    dominant = dominant.reset_index().set_index("cluster")["asset_type"].reindex(np.arange(len(cells)))
+    a, b = members[src], members[dst]
+    pairs = np.unique(np.stack([a[a != b], b[a != b]], axis=1), axis=0).reshape(-1, 2)
+    return centres, counts, dominant.to_numpy(), pairs[:, 0], pairs[:, 1]
+
+def node_colors(asset_types):
+    return asset_types.map(NODE_COLORS).fillna("red").to_numpy()
 
-    edge_trace = go.Scatter(
+@timed()
+def asset_graph_figure(G, layout_cache=None, key=None):
+    # Plotly figure of the graph; layout_cache defaults to the session's, key to graph_key(G)
+    nodes, src, dst, asset_types, edge_text = graph_arrays(G)
+    positions = graph_layout(nodes, src, dst, layout_cache, graph_key(G) if key is None else key)
+    title = 'Directed Threat & Asset Graph'
+
+    if len(src) > CLUSTER_LIMIT:
+        positions, counts, types, src, dst = cluster_nodes(positions, src, dst, asset_types)
+        title += f" ({len(nodes)} nodes in {len(counts)} clusters)"
+        node_text = [f"{count} nodes, mostly {kind}" for count, kind in zip(counts, types)]
+        sizes = np.clip(6 + 3 * np.log2(counts), 6, 40)
+        colors = node_colors(pd.Series(types, dtype=object))
+        edge_text = None
+    else:
+        node_text = [str(node) for node in nodes]
+        sizes = 15
+        colors = node_colors(asset_types)
+
+    edge_x, edge_y = edge_lines(positions, src, dst)
+    edge_trace = go.Scattergl(
         x=edge_x, 
         y=edge_y,
         line=dict(width=1, color='gray'),
@@ -76,117 +153,172 @@ def display_asset_graph(G):
         mode='lines'
     )
 
-    # Node coordinates and colors
-    node_x = []
-    node_y = []
-    node_text = []
-    node_colors = []
-    for node, ndata in G.nodes(data=True):
-        x, y = pos[node]
-        node_x.append(x)
-        node_y.append(y)
-        node_text.append(str(node))
-        
-        # Color by asset type
-        if ndata.get('asset_type') == "server":
-            node_colors.append("lightblue")
-        elif ndata.get('asset_type') == "printer":
-            node_colors.append("lightgreen")
-        elif ndata.get('asset_type') == "network_device":
-            node_colors.append("orange")
-        else:  # threat
-            node_colors.append("red")
-
-    node_trace = go.Scatter(
-        x=node_x, 
-        y=node_y,
-        mode='markers+text',
+    labeled = len(node_text) <= LABEL_LIMIT
+    node_trace = go.Scattergl(
+        x=positions[:, 0], 
+        y=positions[:, 1],
+        mode='markers+text' if labeled else 'markers',
         text=node_text,
         textposition='top center',
         marker=dict(
-            size=15,
-            color=node_colors,
+            size=sizes,
+            color=colors,
             line=dict(width=1, color='black')
         ),
         hoverinfo='text'
     )
+    traces = [edge_trace, node_trace]
 
-    # Edge label placement (calculate midpoints)
-    mid_x = []
-    mid_y = []
-    for i in range(0, len(edge_x), 3):
-        if i + 1 < len(edge_x):
-            x_mid = (edge_x[i] + edge_x[i+1]) / 2 if edge_x[i+1] is not None else edge_x[i]
-            y_mid = (edge_y[i] + edge_y[i+1]) / 2 if edge_y[i+1] is not None else edge_y[i]
-            mid_x.append(x_mid)
-            mid_y.append(y_mid)
-
-    edge_label_trace = go.Scatter(
-        x=mid_x,
-        y=mid_y,
-        text=edge_text,
-        mode='text',
-        textposition='top center',
-        hoverinfo='none'
-    )
+    # Edge labels at the midpoints; hover-only on larger graphs
+    if edge_text is not None:
+        mid = (positions[src] + positions[dst]) / 2
+        if len(edge_text) <= LABEL_LIMIT:
+            traces.append(go.Scattergl(x=mid[:, 0], y=mid[:, 1], text=edge_text, mode='text',
+                                       textposition='top center', hoverinfo='none'))
+        else:
+            traces.append(go.Scattergl(x=mid[:, 0], y=mid[:, 1], text=edge_text, mode='markers',
+                                       marker=dict(size=4, opacity=0), hoverinfo='text'))
 
-    fig = go.Figure(data=[edge_trace, node_trace, edge_label_trace],
+    fig = go.Figure(data=traces,
                     layout=go.Layout(
-                        title='Directed Threat & Asset Graph',
+                        title=title,
                         showlegend=False,
                         xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
                         yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
                         margin=dict(b=20, l=5, r=5, t=40)
                     ))
-    
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+@timed()
+def display_asset_graph(G):
+    st.plotly_chart(asset_graph_figure(G), use_container_width=True)
 
+@timed()
+def graph_tables(G):
+    # Wide typed frames: one row per node/edge, one column per attribute
+    graph = Graph.from_networkx(G)
+    return graph.nodes_frame(), graph.edges_frame()
+
+def paginated_table(title, frame, key):
+    # Only the current page is sent to the browser
+    st.subheader(title)
+    left, right = st.columns(2)
+    page_size = left.selectbox("Rows per page", [25, 100, 500], key=f"{key}_page_size")
+    pages = max(1, -(-len(frame) // page_size))
+    page = right.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key=f"{key}_page")
+    start = (page - 1) * page_size
+    st.dataframe(frame.iloc[start:start + page_size], use_container_width=True, hide_index=True)
+    st.caption(f"{len(frame)} rows")
+
+@timed()
 def display_graph_tables(G):
-    # Prepare separate tabular data for nodes and edges
-    node_data = []
-    edge_data = []
-    
-    # Gather node data
-    for node, attrs in G.nodes(data=True):
-        node_type = attrs.get("asset_type", "unknown")
-        for key, val in attrs.items():
-            node_data.append({
-                "Node Name": node,
-                "Node Type": node_type,
-                "Property_Name": key,
-                "Property_Value": val
-            })
-    
-    # Gather edge data
-    for u, v, attrs in G.edges(data=True):
-        edge_name = f"{u} -> {v}"
-        edge_type = attrs.get("name", "unknown")
-        for key, val in attrs.items():
-            edge_data.append({
-                "Edge Name": edge_name,
-                "Edge Type": edge_type,
-                "Property_Name": key,
-                "Property_Value": val
-            })
-
-    # Convert to DataFrame
-    node_df = pd.DataFrame(node_data, columns=["Node Name", "Node Type", "Property_Name", "Property_Value"])
-    edge_df = pd.DataFrame(edge_data, columns=["Edge Name", "Edge Type", "Property_Name", "Property_Value"])
-    
-    # Display
-    st.subheader("Nodes Table")
-    st.data_editor(node_df, use_container_width=True, hide_index=True)
-    
-    st.subheader("Edges Table")
-    st.data_editor(edge_df, use_container_width=True, hide_index=True)
+    if "graph_tables" not in st.session_state:
+        st.session_state["graph_tables"] = graph_tables(G)
+    node_df, edge_df = st.session_state["graph_tables"]
+    paginated_table("Nodes Table", node_df, "nodes")
+    paginated_table("Edges Table", edge_df, "edges")
+
+def start_nodes(G, limit=EGO_START_OPTIONS):
+    # Threats make the natural starting points; any nodes if there are none
+    threats = (node for node, data in G.nodes(data=True) if data.get("asset_type") == "threat")
+    return list(itertools.islice(threats, limit)) or list(itertools.islice(G.nodes, limit))
+
+def node_id(G, text):
+    # Typed ids are strings; integer ids are matched too
+    if text in G or not text.lstrip("-").isdigit():
+        return text
+    return int(text)
+
+def ego_explorer(G, max_neighbors, max_nodes, rank_by, min_risk):
+    # Kept across reruns so fetched neighbourhoods stay cached; rebuilt when the caps change
+    settings = (max_neighbors, max_nodes, rank_by, min_risk)
+    if st.session_state.get("ego_settings") != settings:
+        st.session_state["ego_explorer"] = EgoExplorer(Graph.from_networkx(G), max_neighbors, max_nodes,
+                                                       rank_by, min_risk)
+        st.session_state["ego_settings"] = settings
+    return st.session_state["ego_explorer"]
+
+@timed()
+def explore_asset_graph(G):
+    # Only the visible neighbourhood is fetched, laid out and tabulated
+    if "ego_start_nodes" not in st.session_state:
+        st.session_state["ego_start_nodes"] = start_nodes(G)
+    left, right = st.columns(2)
+    start = left.selectbox("Start from", st.session_state["ego_start_nodes"])
+    typed = right.text_input("or node id").strip()
+    col1, col2, col3, col4 = st.columns(4)
+    hops = col1.slider("Hops", 1, 3, 1)
+    max_neighbors = col2.number_input("Neighbours per node", min_value=1, max_value=500, value=25)
+    rank_by = col3.selectbox("Keep strongest by", ["risk", "degree"])
+    min_risk = col4.slider("Minimum risk score", 0.0, 10.0, 0.0, 0.5)
+    explorer = ego_explorer(G, max_neighbors, 500, rank_by, min_risk or None)
+
+    if st.button("Explore") or "ego_view" not in st.session_state:
+        center = node_id(G, typed) if typed else start
+        if center not in G:
+            st.error(f"The node {center} is not in the graph.")
+            return
+        st.session_state["ego_view"] = explorer.ego(center, hops)
+        st.session_state["ego_layout_cache"] = LayoutCache()
+    view = st.session_state["ego_view"]
+
+    sub = explorer.subgraph(view)
+    # The subgraph is rebuilt every rerun; the view only grows, so its size identifies it
+    fig = asset_graph_figure(sub, st.session_state["ego_layout_cache"], (len(view.nodes), len(view.edges)))
+    event = st.plotly_chart(fig, use_container_width=True, on_select="rerun", selection_mode="points",
+                            key="ego_chart")
+    # Clicking nodes expands them; the layout cache keeps everything else in place
+    nodes = list(sub.nodes)
+    clicked = [nodes[point["point_index"]] for point in event.selection.points if point["curve_number"] == 1]
+    if any(node not in view.expanded for node in clicked):
+        for node in clicked:
+            explorer.expand(view, node)
+        st.rerun()
+
+    frontier = view.frontier()
+    left, right = st.columns([3, 1])
+    chosen = left.selectbox("Expand node", frontier[:EGO_START_OPTIONS]) if frontier else None
+    if right.button("Expand", disabled=chosen is None):
+        explorer.expand(view, chosen)
+        st.rerun()
+    hidden = sum(explorer.hidden(view, node) for node in view.expanded)
+    info = explorer.cache_info()
+    st.caption(f"{len(view.nodes)} nodes and {len(view.edges)} edges shown around {view.center}; "
+               f"{hidden} neighbours hidden by the caps; {len(frontier)} nodes not yet expanded; "
+               f"neighbourhood cache {info['hits']} hits / {info['misses']} misses")
+
+    node_df, edge_df = graph_tables(sub)
+    paginated_table("Visible Nodes", node_df, "ego_nodes")
+    paginated_table("Visible Edges", edge_df, "ego_edges")
 
 
 def main():
     st.title("Directed Threat & Asset Graph")
+    size = st.selectbox("Graph size", [*GRAPH_SIZES, LIVE_GRAPH])
     if st.button("Create & Display Graph"):
-        graph = create_asset_graph()
-        display_asset_graph(graph)
-        display_graph_tables(graph)
+        if size == LIVE_GRAPH:
+            # A snapshot of the live graph; pressing the button again picks up newer events
+            service = ingestion_service()
+            if not service.running or service.paused:
+                st.info("The live feed is off; switch it on from the dashboard to grow this graph.")
+            st.session_state["asset_graph"] = service.asset_graph()
+        else:
+            edges = GRAPH_SIZES[size]
+            # Larger sizes come from the seeded synthetic generator
+            st.session_state["asset_graph"] = create_asset_graph() if edges is None else generate_threat_graph(edges=edges).graph
+        for key in ("graph_tables", "graph_retriever", "ego_view", "ego_settings", "ego_start_nodes"):
+            st.session_state.pop(key, None)
+    # Kept in session state so paging through the tables does not discard the graph
+    if "asset_graph" in st.session_state:
+        graph = st.session_state["asset_graph"]
+        modes = ["Explore", "Whole graph"]
+        mode = st.radio("View", modes, horizontal=True,
+                        index=int(graph.number_of_edges() <= WHOLE_GRAPH_LIMIT))
+        if mode == "Explore":
+            explore_asset_graph(graph)
+        else:
+            display_asset_graph(graph)
+            display_graph_tables(graph)
 
 if __name__ == "__main__":
     main()
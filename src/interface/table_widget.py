@@ -0,0 +1,74 @@
+import os
+import sys
+import streamlit as st
+
+# Make src/ importable when Streamlit runs the dashboard directly
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from data_structures.table_index import TableIndex
+
+OPERATORS_BY_KIND = {
+    "number": ["==", "between", ">=", "<="],
+    "datetime": ["between", ">=", "<="],
+    "text": ["==", "in", "prefix"],
+}
+
+
+@st.cache_resource(max_entries=16, ttl=3600)
+def table_index(_frame, key):
+    # Indexes are built once per table version and reused across reruns
+    return TableIndex(_frame)
+
+
+def filter_controls(index, key, title):
+    """Filter column, operator and value inputs; returns the filters to apply"""
+    column = st.selectbox(f"Filter column ({title})", list(index.frame.columns), key=f"{key}_filter_col")
+    kind = index.kinds[column]
+    op = st.selectbox(f"Filter operator ({title})", OPERATORS_BY_KIND[kind], key=f"{key}_filter_op")
+    if op == "between":
+        low_col, high_col = st.columns(2)
+        low = low_col.text_input(f"From ({title})", key=f"{key}_filter_low")
+        high = high_col.text_input(f"To ({title})", key=f"{key}_filter_high")
+        value = (low or None, high or None)
+        if value == (None, None):
+            return []
+    else:
+        value = st.text_input(f"Filter value ({title})", key=f"{key}_filter_val")
+        if not value:
+            return []
+        if op == "in":
+            value = [part.strip() for part in value.split(",")]
+    try:
+        for part in (value if isinstance(value, (list, tuple)) else [value]):
+            if part is not None:
+                index.coerce(column, part)
+    except ValueError:
+        st.warning(f"Filter value is not a valid {kind}.")
+        return []
+    return [(column, op, value)]
+
+
+def table_widget(frame, key, version=0, title=None, page_sizes=(25, 100, 500)):
+    """Filterable, sortable, paginated data editor over frame.
+
+    key and version identify the data: indexes are cached until either
+    changes, so filtering, sorting and paging are index lookups.
+    """
+    title = title or key
+    index = table_index(frame, (key, version))
+    st.markdown(f"#### Filter & Sort {title} Data")
+    filters = filter_controls(index, key, title)
+    sort_col = st.selectbox(f"Sort by column ({title})", list(frame.columns), key=f"{key}_sort_col")
+    descending = st.checkbox(f"Sort descending ({title})", key=f"{key}_desc")
+    rows = index.query(filters, sort_col, descending)
+
+    size_col, page_col = st.columns(2)
+    page_size = size_col.selectbox(f"Rows per page ({title})", list(page_sizes), key=f"{key}_page_size")
+    pages = max(1, -(-len(rows) // page_size))
+    page = page_col.number_input(f"Page of {pages} ({title})", min_value=1, max_value=pages, value=1,
+                                 key=f"{key}_page")
+    st.data_editor(
+        index.page(rows, min(page, pages), page_size),
+        hide_index=True,
+        num_rows="dynamic"
+    )
+    st.caption(f"{len(rows)} of {len(index)} rows")
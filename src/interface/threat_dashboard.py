@@ -1,55 +1,94 @@
 import streamlit as st
-import plotly.express as px
-import pandas as pd
-import numpy as np
-from datetime import datetime
-import json
-from groq import Groq
-
+import os
+import sys
+
+# Make src/ importable when Streamlit runs the dashboard directly
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from llm.client import ResponseCache, make_client, stream_text
+from llm.context import ChatContext
+from llm.retrieval import GraphRetriever
+from dashboard_data import (demo_events, distribution_figure, geo_figure, geo_frame, ingestion_service, next_day,
+                            threat_events, threat_summary, timeline_figure, timeline_frame)
+from table_widget import table_widget
+from monitoring.metrics import count, timed, timer
+
+KEY_FILE = "/home/frank/threat_intel_poc_key.json"
+MAX_TOKENS = 2048
+RETRIEVE_NODES = 5
+LIVE_REFRESH_SECONDS = 2
+LIVE_PANEL_SECONDS = 5  # charts and tables cost more to redraw than the stat cards
+
+@st.cache_resource
+def chat_client():
+    # Created once per server process and reused across reruns and sessions
+    return make_client(KEY_FILE)
+
+@st.cache_resource
+def response_cache():
+    # Answers shared by all analysts; repeated questions on unchanged data skip the LLM
+    return ResponseCache(max_entries=256)
+
+@timed()
 def groq_chat():
-    api_key = json.load(open("/home/frank/threat_intel_poc_key.json"))["tipoc"]
-    client = Groq(api_key=api_key)
+    client = chat_client()
+    cache = response_cache()
 
     if "llm_model" not in st.session_state:
         st.session_state["llm_model"] = "llama-3.3-70b-versatile"
 
-    if "messages" not in st.session_state:
-        st.session_state.messages = []
+    # History, threat data snapshot and token budget for this session
+    if "chat_context" not in st.session_state:
+        st.session_state["chat_context"] = ChatContext(token_budget=6000, reserve_tokens=MAX_TOKENS)
+    context = st.session_state["chat_context"]
 
     # Display chat history
-    for message in st.session_state.messages:
+    for message in context.visible_messages():
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
 
     if prompt := st.chat_input("Ask about threats, assets, or incidents..."):
-        # Add user message
-        threat_data_reference = st.session_state.get("threat_data", {})
-        st.session_state.messages.append({"role": "user", "content": str("threat_data-->" + str(threat_data_reference))})
-        st.session_state.messages.append({"role": "user", "content": prompt})
+        # Threat data goes into the context once; later turns only carry what changed
+        context.set_threat_data(st.session_state.get("threat_data", {}))
+        context.add("user", prompt)
         with st.chat_message("user"):
             st.markdown(prompt)
 
-        # Example: Access threat data in session state
-        threat_data_reference = st.session_state.get("threat_data", {})
-        # Incorporate logic to use `threat_data_reference` if desired.
-        #st.write(threat_data_reference)
-        with st.chat_message("assistant"):
-            response = client.chat.completions.create(
-                model=st.session_state["llm_model"],
-                messages=[
-                   
-                    {"role": m["role"], "content": m["content"]}
-                    for m in st.session_state.messages
-                ],
-                temperature=0.7,
-                max_tokens=2048
-            )
-            assistant_msg = response.choices[0].message.content   
-            st.session_state.messages.append({"role": "assistant", "content": assistant_msg})
-            st.markdown(assistant_msg)
+        # Ground the answer in the part of the asset graph the question is about
+        graph = st.session_state.get("asset_graph")
+        if graph is not None:
+            with timer("groq_chat.retrieval"):
+                if "graph_retriever" not in st.session_state:
+                    st.session_state["graph_retriever"] = GraphRetriever().build(graph)
+                context.set_retrieved(st.session_state["graph_retriever"].context(graph, prompt, k=RETRIEVE_NODES))
 
-def threat_dashboard():
-    st.title("Threat Intelligence Dashboard")
+        key = cache.key(st.session_state["llm_model"], prompt, [context.threat_data, context.retrieved])
+        with st.chat_message("assistant"):
+            assistant_msg = cache.get(key)
+            if assistant_msg is not None:
+                count("groq_chat.cache_hit")
+                st.markdown(assistant_msg)
+            else:
+                # Tokens are rendered as they arrive
+                with timer("groq_chat.llm_response"):
+                    assistant_msg = st.write_stream(stream_text(
+                        client,
+                        st.session_state["llm_model"],
+                        context.build(),
+                        on_usage=context.record_usage,
+                        temperature=0.7,
+                        max_tokens=MAX_TOKENS
+                    ))
+                count("groq_chat.llm_call")
+                cache.put(key, assistant_msg)
+            context.add("assistant", assistant_msg)
+
+    if context.usage:
+        last = context.usage[-1]
+        reported = f", {last.reported_prompt_tokens} reported" if last.reported_prompt_tokens is not None else ""
+        st.caption(f"Last request: ~{last.prompt_tokens} prompt tokens{reported} in {last.messages} messages; "
+                   f"response cache {cache.hits} hits / {cache.misses} misses")
+
+def stat_cards():
     # High-level stat cards
     colA, colB, colC, colD = st.columns(4)
     with colA:
@@ -60,6 +99,89 @@ def threat_dashboard():
         st.metric("Avg Severity Score", "7.5", "+0.3")
     with colD:
         st.metric("High Risk Assets", "15")
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def live_stat_cards():
+    # Only this fragment reruns on the timer; counters are updated by the service per batch
+    service = ingestion_service()
+    current = service.counters.snapshot()
+    previous = st.session_state.get("live_counters", current)
+    st.session_state["live_counters"] = current
+    colA, colB, colC, colD = st.columns(4)
+    with colA:
+        st.metric("Active Incidents", current["incidents"], current["incidents"] - previous["incidents"])
+    with colB:
+        st.metric("Critical Threats", current["critical"], current["critical"] - previous["critical"])
+    with colC:
+        st.metric("Avg Severity Score", current["average_severity"],
+                  round(current["average_severity"] - previous["average_severity"], 2))
+    with colD:
+        st.metric("High Risk Assets", current["high_risk_assets"],
+                  current["high_risk_assets"] - previous["high_risk_assets"])
+    metrics = service.metrics
+    error = f"; last error: {service.error}" if service.error else ""
+    st.caption(f"Live feed: {metrics.events} events, {metrics.events_per_second:.0f}/s, "
+               f"lag {metrics.lag_seconds:.2f}s (max {metrics.max_lag_seconds:.2f}s), "
+               f"{metrics.queued} chunks queued{error}")
+
+def date_range_input(min_date, max_date):
+    # Keyed so the analyst's range survives reruns; a range ending on the latest
+    # day keeps following new days as events arrive
+    chosen = st.session_state.get("date_range")
+    latest = st.session_state.get("latest_date")
+    if not chosen:
+        st.session_state["date_range"] = (min_date, max_date)
+    elif len(chosen) == 2 and chosen[1] == latest and latest != max_date:
+        st.session_state["date_range"] = (chosen[0], max_date)
+    st.session_state["latest_date"] = max_date
+    date_range = st.date_input("Select Date Range", key="date_range")
+    if len(date_range) == 2:
+        return date_range
+    return min_date, max_date
+
+def threat_panels(events):
+    # Frames and figures are cached on the store version, so redrawing unchanged data is cheap
+    version = events.version
+    st.session_state["threat_data"] = threat_summary(events, version)
+
+    st.subheader("Threat Timeline")
+    df_timeline = timeline_frame(events, version)
+
+    # Slicers to control time series
+    start_date, end_date = date_range_input(df_timeline["Date"].min().date(), df_timeline["Date"].max().date())
+    granularity = st.selectbox("Granularity", ["day", "hour", "minute"])
+
+    fig_timeline = timeline_figure(events, version, granularity, start_date, end_date)
+    st.plotly_chart(fig_timeline, use_container_width=True)
+
+    st.subheader("Geographic Distribution")
+    df_geo = geo_frame(events, version, start_date, end_date)
+    fig_geo = geo_figure(events, version, start_date, end_date)
+    st.plotly_chart(fig_geo, use_container_width=True)
+    st.subheader("Threat Distribution (Pie)")
+    fig_dist = distribution_figure(events, version, start_date, end_date)
+    st.plotly_chart(fig_dist, use_container_width=True)
+    st.subheader("Geo Data & Timeline Data Editors")
+
+    table_widget(df_geo, "geo", (version, start_date, end_date), title="Geo")
+    table_widget(df_timeline, "time", version, title="Timeline")
+
+@st.fragment(run_every=LIVE_PANEL_SECONDS)
+def live_threat_panels(events):
+    # Redrawn on a timer while the feed runs, so new incidents show up without a full rerun
+    threat_panels(events)
+
+def threat_dashboard():
+    st.title("Threat Intelligence Dashboard")
+    # One live feed per server process, shared by every session: switching it off pauses it for all
+    live = st.toggle("Live feed", key="live_feed")
+    service = ingestion_service()
+    if live:
+        service.resume()
+        live_stat_cards()
+    else:
+        service.pause()
+        stat_cards()
     # Toggle Chat
     if 'show_chat_interface' not in st.session_state:
         st.session_state.show_chat_interface = False
@@ -67,12 +189,10 @@ def threat_dashboard():
     if st.button("Toggle Chat"):
         st.session_state.show_chat_interface = not st.session_state.show_chat_interface
 
-    # Generate or load threat data
-    # (For demonstration, we use random data. Store in session state.)
-    st.session_state["threat_data"] = {
-        "timeline": list(np.random.randint(10, 50, size=10)),
-        "geo": {"USA": 45, "China": 32, "Russia": 28}
-    }
+    # Threat data is pre-aggregated once per server process and updated incrementally
+    events = threat_events()
+    if st.button("Load New Events"):
+        events.append(demo_events(10_000, start=next_day(events), days=1))
 
     # Columns based on chat toggle
     if st.session_state.show_chat_interface:
@@ -81,95 +201,26 @@ def threat_dashboard():
         col1, _ = st.columns((1, 0.0001))
 
     with col1:
-        st.subheader("Threat Timeline")
-        dates = pd.date_range(start='2024-01-01', periods=10, freq='D')
-        df_timeline = pd.DataFrame({'Date': dates, 'Threats': st.session_state["threat_data"]["timeline"]})
-        
-        # Slicers to control time series
-        min_date = df_timeline["Date"].min()
-        max_date = df_timeline["Date"].max()
-        date_range = st.date_input("Select Date Range", [min_date, max_date])
-
-        if len(date_range) == 2:
-            start_date, end_date = date_range
-            # Filter data according to selected dates
-            df_filtered = df_timeline[(df_timeline["Date"] >= pd.to_datetime(start_date)) &
-                                      (df_timeline["Date"] <= pd.to_datetime(end_date))]
+        if live:
+            live_threat_panels(events)
         else:
-            df_filtered = df_timeline
-
-        fig_timeline = px.line(df_filtered, x='Date', y='Threats', title='Daily Threat Activity')
-        st.plotly_chart(fig_timeline, use_container_width=True)
-
-        st.subheader("Geographic Distribution")
-        geo_dict = st.session_state["threat_data"]["geo"]
-        df_geo = pd.DataFrame(list(geo_dict.items()), columns=["country", "threats"])
-        fig_geo = px.choropleth(df_geo, locations='country',
-                                locationmode='country names',
-                                color='threats',
-                                title='Threat Origin Distribution')
-        st.plotly_chart(fig_geo, use_container_width=True)
-        st.subheader("Threat Distribution (Pie)")
-        df_distribution = pd.DataFrame({
-            "Type": ["Ransomware", "Malware", "Phishing", "Others"], 
-            "Count": [12, 18, 7, 5]
-        })
-        fig_dist = px.pie(df_distribution, values='Count', names='Type', title='Threat Distribution')
-        st.plotly_chart(fig_dist, use_container_width=True)
-        st.subheader("Geo Data & Timeline Data Editors")
-
-        # Filtering and sorting controls for df_geo
-        st.markdown("#### Filter & Sort Geo Data")
-        geo_filter_col = st.selectbox("Filter column (Geo)", df_geo.columns, key="geo_filter_col")
-        geo_filter_val = st.text_input("Filter value (Geo)", key="geo_filter_val")
-        geo_sort_col = st.selectbox("Sort by column (Geo)", df_geo.columns, key="geo_sort_col")
-        geo_desc = st.checkbox("Sort descending (Geo)", key="geo_desc")
-
-        df_geo_filtered = df_geo.copy()
-
-        # Apply filter (simple equality check)
-        if geo_filter_val:
-            df_geo_filtered = df_geo_filtered[df_geo_filtered[geo_filter_col].astype(str) == geo_filter_val]
-
-        # Apply sorting
-        df_geo_filtered = df_geo_filtered.sort_values(by=geo_sort_col, ascending=not geo_desc)
-
-        # Data editor for df_geo
-        st.data_editor(
-            df_geo_filtered, 
-            hide_index=True, 
-            num_rows="dynamic"
-        )
-
-        # Filtering and sorting controls for df_timeline
-        st.markdown("#### Filter & Sort Timeline Data")
-        time_filter_col = st.selectbox("Filter column (Timeline)", df_timeline.columns, key="time_filter_col")
-        time_filter_val = st.text_input("Filter value (Timeline)", key="time_filter_val")
-        time_sort_col = st.selectbox("Sort by column (Timeline)", df_timeline.columns, key="time_sort_col")
-        time_desc = st.checkbox("Sort descending (Timeline)", key="time_desc")
-
-        df_timeline_filtered = df_timeline.copy()
-
-        # Apply filter (simple equality check)
-        if time_filter_val:
-            df_timeline_filtered = df_timeline_filtered[
-                df_timeline_filtered[time_filter_col].astype(str) == time_filter_val
-            ]
-
-        # Apply sorting
-        df_timeline_filtered = df_timeline_filtered.sort_values(by=time_sort_col, ascending=not time_desc)
-
-        # Data editor for df_timeline
-        st.data_editor(
-            df_timeline_filtered, 
-            hide_index=True, 
-            num_rows="dynamic"
-        )
+            threat_panels(events)
 
     if st.session_state.show_chat_interface:
         with col2:
             st.subheader("Threat Intelligence Chat Assistant")
             groq_chat()
 
+def navigation():
+    # Pages are registered here instead of being discovered from pages/, so the
+    # profiling page is only listed (and reachable) when the URL has ?debug=1
+    pages = [st.Page(threat_dashboard, default=True),
+             st.Page("pages/threat_graph.py"),
+             st.Page("pages/model_interface.py"),
+             st.Page("pages/llm_interface.py")]
+    if st.query_params.get("debug") == "1":
+        pages.append(st.Page("pages/profiling.py"))
+    st.navigation(pages).run()
+
 if __name__ == "__main__":
-    threat_dashboard()
\ No newline at end of file
+    navigation()
\ No newline at end of file
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from .context import estimate_tokens, message_tokens
+
+
+class OfflineClient:
+    """Stand-in for the Groq client with the same chat.completions.create call.
+
+    It answers without a network call by echoing the question along with
+    the size of the prompt it received, so the chat UI and context
+    handling can be exercised without an API key. With stream=True it
+    yields the answer word by word in Groq's chunk format.
+    """
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        self.requests: List[List[Dict[str, str]]] = []
+
+    def create(self, model: str, messages: List[Dict[str, str]], stream: bool = False, **kwargs: Any) -> Any:
+        self.requests.append(messages)
+        question = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+        content = (f"[offline {model}] Received {len(messages)} messages. "
+                   f"You asked: {question}")
+        usage = SimpleNamespace(prompt_tokens=message_tokens(messages), completion_tokens=estimate_tokens(content))
+        if stream:
+            return self._chunks(content, usage)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=usage)
+
+    @staticmethod
+    def _chunks(content: str, usage: SimpleNamespace) -> Iterator[SimpleNamespace]:
+        for piece in re.findall(r"\S+\s*", content):
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))], x_groq=None)
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=None))],
+                              x_groq=SimpleNamespace(usage=usage))
+
+
+def make_client(key_file: str, key_name: str = "tipoc") -> Any:
+    """Groq client when key_file exists, otherwise an OfflineClient"""
+    if not os.path.exists(key_file):
+        return OfflineClient()
+    from groq import Groq
+    with open(key_file) as f:
+        return Groq(api_key=json.load(f)[key_name])
+
+
+def stream_text(client: Any, model: str, messages: List[Dict[str, str]],
+                on_usage: Optional[Callable[[Any], None]] = None, **kwargs: Any) -> Iterator[str]:
+    """Text deltas of a streamed completion; on_usage receives the usage reported with the last chunk"""
+    for chunk in client.chat.completions.create(model=model, messages=messages, stream=True, **kwargs):
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+        usage = getattr(getattr(chunk, "x_groq", None), "usage", None)
+        if usage is not None and on_usage:
+            on_usage(usage)
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Lower case, single spaces, no trailing punctuation: "What's up?" and "what's  up" match"""
+    return re.sub(r"\s+", " ", prompt.lower()).strip().rstrip("?!. ")
+
+
+def data_hash(data: Any) -> str:
+    """Stable digest of JSON-serializable data"""
+    return hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class ResponseCache:
+    """LRU cache of answers keyed on (model, normalized prompt, threat data hash)"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # Shared by every session through st.cache_resource
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(model: str, prompt: str, data: Any) -> Tuple[str, str, str]:
+        return model, normalize_prompt(prompt), data_hash(data)
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[str]:
+        with self.lock:
+            answer = self.entries.get(key)
+            if answer is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return answer
+
+    def put(self, key: Tuple[str, str, str], answer: str) -> None:
+        with self.lock:
+            self.entries[key] = answer
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
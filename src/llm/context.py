@@ -0,0 +1,179 @@
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+Message = Dict[str, str]
+
+# Roughly how BPE tokenizers split text: short word pieces and single punctuation marks
+_TOKEN_PATTERN = re.compile(r"\w{1,4}|[^\w\s]")
+# Per-message overhead of the chat format (role, separators)
+MESSAGE_OVERHEAD = 4
+
+DEFAULT_SYSTEM_PROMPT = ("You are a threat intelligence assistant. Answer questions about threats, "
+                         "assets and incidents using the threat data provided.")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of text, without a model-specific tokenizer"""
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+def message_tokens(messages: List[Message]) -> int:
+    return sum(estimate_tokens(message["content"]) + MESSAGE_OVERHEAD for message in messages)
+
+
+def dumps(data: Any) -> str:
+    """Compact JSON: no whitespace, floats rounded"""
+    def shorten(value):
+        if isinstance(value, float):
+            return round(value, 2)
+        if isinstance(value, dict):
+            return {str(key): shorten(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [shorten(item) for item in value]
+        if hasattr(value, "item"):
+            return shorten(value.item())
+        return value
+    return json.dumps(shorten(data), separators=(",", ":"), default=str)
+
+
+def summarize_threat_data(data: Dict[str, Any], top_k: int = 5) -> Dict[str, Any]:
+    """Summary of the dashboard threat data: timeline statistics and the top_k countries"""
+    summary: Dict[str, Any] = {}
+    timeline = [float(value) for value in data.get("timeline", [])]
+    if timeline:
+        summary["timeline"] = {
+            "days": len(timeline), "total": sum(timeline), "mean": sum(timeline) / len(timeline),
+            "min": min(timeline), "max": max(timeline), "last": timeline[-3:],
+        }
+    geo = data.get("geo", {})
+    if geo:
+        ranked = sorted(geo.items(), key=lambda item: item[1], reverse=True)
+        top = dict(ranked[:top_k])
+        if len(ranked) > top_k:
+            top["others"] = sum(count for _, count in ranked[top_k:])
+        summary["geo_top"] = top
+    for key, value in data.items():
+        if key not in ("timeline", "geo"):
+            summary[key] = value
+    return summary
+
+
+def diff(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Entries of new that are missing from or differ in old (None marks removed keys)"""
+    changed = {key: value for key, value in new.items() if old.get(key) != value}
+    changed.update({key: None for key in old if key not in new})
+    return changed
+
+
+def extractive_summary(summary: str, messages: List[Message], max_tokens: int) -> str:
+    """summary extended with the first sentence of each message, oldest lines dropped to fit max_tokens"""
+    lines = summary.splitlines() if summary else []
+    for message in messages:
+        first = re.split(r"(?<=[.!?])\s", message["content"].strip(), maxsplit=1)[0]
+        lines.append(f"{message['role']}: {first}")
+    text = "\n".join(lines)
+    while lines and estimate_tokens(text) > max_tokens:
+        lines.pop(0)
+        text = "\n".join(lines)
+    return text
+
+
+@dataclass
+class RequestUsage:
+    """Token accounting for one chat request"""
+    prompt_tokens: int
+    messages: int
+    evicted: int
+    completion_tokens: Optional[int] = None
+    reported_prompt_tokens: Optional[int] = None
+
+
+class ChatContext:
+    """Chat history kept within a token budget.
+
+    - The threat data is summarized (statistics, top-k) and serialized as
+      compact JSON in the pinned system message, so every request carries
+      exactly one copy. When it changes between turns, only the changed
+      keys are noted in the history.
+    - build() sends the system message, a running summary of older turns
+      and the newest turns that fit in token_budget minus the tokens
+      reserved for the answer. Turns that fall out of the window are
+      folded into the summary by summarize (extractive by default; an
+      LLM call can be passed in).
+    - Graph data retrieved for the current question (set_retrieved) goes
+      in the system message of the next request only; it is replaced, not
+      accumulated, on every question.
+    - Every build() is recorded in usage for per-request token reporting.
+    """
+
+    def __init__(self, token_budget: int = 4000, reserve_tokens: int = 1024, summary_tokens: int = 200,
+                 system_prompt: str = DEFAULT_SYSTEM_PROMPT, top_k: int = 5,
+                 summarize: Callable[[str, List[Message], int], str] = extractive_summary):
+        self.token_budget = token_budget
+        self.reserve_tokens = reserve_tokens
+        self.summary_tokens = summary_tokens
+        self.system_prompt = system_prompt
+        self.top_k = top_k
+        self.summarize = summarize
+        self.messages: List[Message] = []
+        self.threat_data: Dict[str, Any] = {}
+        self.summary = ""
+        self.summarized = 0  # messages[:summarized] are covered by summary
+        self.retrieved = ""
+        self.usage: List[RequestUsage] = []
+
+    def set_threat_data(self, data: Dict[str, Any]) -> None:
+        """Update the threat data snapshot, noting what changed in the history"""
+        summary = summarize_threat_data(data, self.top_k)
+        if self.threat_data and summary != self.threat_data:
+            self.add("system", "Threat data update: " + dumps(diff(self.threat_data, summary)))
+        self.threat_data = summary
+
+    def set_retrieved(self, text: str) -> None:
+        """Graph data relevant to the current question, e.g. GraphRetriever.context()"""
+        self.retrieved = text
+
+    def add(self, role: str, content: str) -> None:
+        self.messages.append({"role": role, "content": content})
+
+    def system_message(self) -> Message:
+        content = self.system_prompt
+        if self.threat_data:
+            content += "\nThreat data: " + dumps(self.threat_data)
+        if self.retrieved:
+            content += "\nRelevant asset graph data: " + self.retrieved
+        if self.summary:
+            content += "\nEarlier conversation: " + self.summary
+        return {"role": "system", "content": content}
+
+    def build(self) -> List[Message]:
+        """Messages for the next request, within the token budget"""
+        available = self.token_budget - self.reserve_tokens
+        window_start = len(self.messages)
+        used = message_tokens([self.system_message()])
+        # Newest turns first, keeping room for the summary of what is left out
+        while window_start > self.summarized:
+            cost = message_tokens(self.messages[window_start - 1:window_start])
+            if used + cost + self.summary_tokens > available and window_start < len(self.messages):
+                break
+            used += cost
+            window_start -= 1
+        evicted = window_start - self.summarized
+        if evicted:
+            self.summary = self.summarize(self.summary, self.messages[self.summarized:window_start], self.summary_tokens)
+            self.summarized = window_start
+        messages = [self.system_message()] + self.messages[window_start:]
+        self.usage.append(RequestUsage(message_tokens(messages), len(messages), evicted))
+        return messages
+
+    def record_usage(self, usage: Any) -> None:
+        """Attach the token counts reported by the API (response.usage) to the last request"""
+        if self.usage and usage is not None:
+            self.usage[-1].completion_tokens = getattr(usage, "completion_tokens", None)
+            self.usage[-1].reported_prompt_tokens = getattr(usage, "prompt_tokens", None)
+
+    def visible_messages(self) -> List[Message]:
+        """The user and assistant turns, for display"""
+        return [message for message in self.messages if message["role"] in ("user", "assistant")]
@@ -0,0 +1,440 @@
+import json
+import os
+import re
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+from data_structures.graph import Graph
+from data_structures.snapshot import freeze
+from .context import dumps
+
+# The full node id counts this many times, so a node outranks its neighbours for its own name
+ID_WEIGHT = 3
+# Candidate documents taken per query term and segment, see GraphRetriever.search
+CHAMPIONS = 1000
+STOPWORDS = frozenset("a an and are at be by for from has have how i in is it me of on or show tell that the "
+                      "their there these this to was what when where which who why with".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens; "Server12" also yields "server" and "12" """
+    tokens = []
+    for word in re.findall(r"[a-z0-9]+", str(text).lower()):
+        if word in STOPWORDS:
+            continue
+        tokens.append(word)
+        parts = re.findall(r"[a-z]+|[0-9]+", word)
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+def _token_pairs(texts: pd.Series) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """tokenize() over a Series of texts through pandas string methods.
+
+    Returns (row, token) pairs plus the first token of each row (None for
+    rows without one).
+    """
+    words = texts.astype(str).str.lower().str.findall(r"[a-z0-9]+").explode().dropna()
+    words = words[~words.isin(STOPWORDS)]
+    parts = words.str.findall(r"[a-z]+|[0-9]+")
+    parts = parts[parts.str.len() > 1].explode()
+    rows = np.concatenate([words.index.to_numpy(dtype=np.int64), parts.index.to_numpy(dtype=np.int64)])
+    tokens = np.concatenate([words.to_numpy(dtype=object), parts.to_numpy(dtype=object)])
+    first = np.full(len(texts), None, dtype=object)
+    present = ~words.index.duplicated()
+    first[words.index[present]] = words.to_numpy(dtype=object)[present]
+    return rows, tokens, first
+
+
+def _ranges(offsets: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """Concatenated index ranges offsets[r]:offsets[r + 1] for each r in rows"""
+    starts, stops = offsets[rows], offsets[rows + 1]
+    lengths = stops - starts
+    if not lengths.sum():
+        return np.zeros(0, dtype=np.int64)
+    return np.repeat(stops - np.cumsum(lengths), lengths) + np.arange(lengths.sum())
+
+
+def _text(values: Any) -> np.ndarray:
+    """Object array of strings, "" for missing values"""
+    series = pd.Series(values, dtype=object)
+    return series.where(series.notna(), "").astype(str).to_numpy(dtype=object)
+
+
+def _flatten(term_lists: List[List[int]]) -> Tuple[np.ndarray, np.ndarray]:
+    """(offsets, concatenated term ids) for a list of term id lists"""
+    offsets = np.zeros(len(term_lists) + 1, dtype=np.int64)
+    np.cumsum([len(terms) for terms in term_lists], out=offsets[1:])
+    flat = np.fromiter((t for terms in term_lists for t in terms), dtype=np.int64, count=offsets[-1])
+    return offsets, flat
+
+
+def _as_graph(graph: Any) -> Graph:
+    return graph if isinstance(graph, Graph) else Graph.from_networkx(graph)
+
+
+class _Segment:
+    """Postings for a batch of documents: for each term, the documents containing it (ascending) and how often"""
+
+    def __init__(self, offsets: np.ndarray, docs: np.ndarray, tf: np.ndarray):
+        self.offsets = offsets
+        self.docs = docs
+        self.tf = tf
+        self.terms = len(offsets) - 1
+        self.champions: Dict[int, np.ndarray] = {}
+
+    @classmethod
+    def build(cls, docs: np.ndarray, terms: np.ndarray, vocabulary: int) -> "_Segment":
+        """Segment from (doc, term) pairs, one pair per occurrence"""
+        width = int(docs.max(initial=0)) + 1
+        # One posting per distinct (term, doc), sorted by term then doc
+        keys, tf = np.unique(terms.astype(np.int64) * width + docs, return_counts=True)
+        offsets = np.zeros(vocabulary + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys // width, minlength=vocabulary), out=offsets[1:])
+        return cls(offsets, keys % width, tf.astype(np.float32))
+
+    def postings(self, term: int) -> Tuple[np.ndarray, np.ndarray]:
+        if term >= self.terms:
+            return self.docs[:0], self.tf[:0]
+        lo, hi = self.offsets[term], self.offsets[term + 1]
+        return self.docs[lo:hi], self.tf[lo:hi]
+
+    def frequency(self, term: int) -> int:
+        return int(self.offsets[term + 1] - self.offsets[term]) if term < self.terms else 0
+
+    def counts(self, term: int, docs: np.ndarray) -> np.ndarray:
+        """Occurrences of term in each of docs (0 where absent)"""
+        found, tf = self.postings(term)
+        if not len(found):
+            return np.zeros(len(docs), dtype=np.float32)
+        i = np.minimum(np.searchsorted(found, docs), len(found) - 1)
+        return np.where(found[i] == docs, tf[i], 0)
+
+    def champion_docs(self, term: int, weight: np.ndarray, limit: int) -> np.ndarray:
+        """The limit documents where term weighs most (all of them for rarer terms); cached per term"""
+        docs, tf = self.postings(term)
+        if len(docs) <= limit:
+            return docs
+        if term not in self.champions:
+            impact = tf / (tf + weight[docs])
+            self.champions[term] = docs[np.argpartition(-impact, limit - 1)[:limit]]
+        return self.champions[term]
+
+
+class GraphRetriever:
+    """BM25 index over the nodes of a threat graph, for grounding chat answers.
+
+    Every node is a document made of its id, its text attributes
+    (asset_type, ...), the names of the edges touching it and, across
+    threat edges ("threatens"), the id of the node on the other side, so
+    "what threatens Server3" finds both Server3 and its threats.
+
+    Postings are kept in NumPy segments. update() indexes added or changed
+    nodes into a new small segment and retires their old documents;
+    segments are merged once there are more than max_segments. search()
+    scores a bounded candidate set (champion lists), so its cost does not
+    grow with the graph, and retrieve() adds the 1-hop neighbourhood of
+    each hit from the index's own adjacency lists.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, threat_edges: Sequence[str] = ("threatens",),
+                 max_segments: int = 8):
+        self.k1 = k1
+        self.b = b
+        self.threat_edges = list(threat_edges)
+        self.max_segments = max_segments
+        self.vocabulary: Dict[str, int] = {}
+        self.segments: List[_Segment] = []
+        self.doc_nodes: List[Hashable] = []  # document -> node id
+        self.node_docs: Dict[Hashable, int] = {}  # node id -> its current document
+        self.doc_length = np.zeros(0, dtype=np.float32)
+        self.alive = np.zeros(0, dtype=bool)
+        # Adjacency of the built graph as CSR over node positions, both directions,
+        # plus the edges recorded by update() since
+        self.nodes: List[Hashable] = []
+        self.position: Dict[Hashable, int] = {}
+        self.edge_names: List[str] = []
+        self.adj_offsets = np.zeros(1, dtype=np.int64)
+        self.adj_nodes = np.zeros(0, dtype=np.int64)
+        self.adj_outgoing = np.zeros(0, dtype=bool)
+        self.adj_names = np.zeros(0, dtype=np.int64)
+        self.added_edges: Dict[Hashable, List[Tuple[Hashable, bool, str]]] = {}
+        self.removed: Set[Hashable] = set()
+        # BM25 length normalisation per document, reset when documents change
+        self._weight: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.node_docs)
+
+    def _term_ids(self, tokens: Iterable[str]) -> List[int]:
+        ids = []
+        for token in tokens:
+            term = self.vocabulary.get(token)
+            if term is None:
+                term = self.vocabulary[token] = len(self.vocabulary)
+            ids.append(term)
+        return ids
+
+    def _add_segment(self, docs: np.ndarray, terms: np.ndarray, count: int) -> None:
+        """Index count new documents numbered from len(alive); docs and terms are their (doc, term) pairs"""
+        first = len(self.alive)
+        length = np.bincount(docs - first, minlength=count).astype(np.float32)
+        self.doc_length = np.concatenate([self.doc_length, length])
+        self.alive = np.concatenate([self.alive, np.ones(count, dtype=bool)])
+        self._weight = None
+        if len(docs):
+            self.segments.append(_Segment.build(docs, terms, len(self.vocabulary)))
+        if len(self.segments) > self.max_segments:
+            self.merge()
+
+    def build(self, graph: Any) -> "GraphRetriever":
+        """Index every node of a Graph or NetworkX graph, replacing the current contents"""
+        graph = _as_graph(graph)
+        nodes = graph.node_ids()
+        n = len(nodes)
+        src, dst = graph.edge_index()
+        names = _text(graph.edge_values("name")) if len(src) else np.zeros(0, dtype=object)
+        name_codes, edge_names = pd.factorize(names)
+        ends, others = np.concatenate([src, dst]), np.concatenate([dst, src])
+        order = np.argsort(ends, kind="stable")
+        self.nodes = list(nodes)
+        self.position = {node: i for i, node in enumerate(nodes)}
+        self.edge_names = [str(name) for name in edge_names]
+        self.adj_offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(ends, minlength=n), out=self.adj_offsets[1:])
+        self.adj_nodes = others[order]
+        self.adj_outgoing = (order < len(src))
+        self.adj_names = np.concatenate([name_codes, name_codes])[order]
+        self.added_edges = {}
+        self.removed = set()
+
+        # (doc, term) pairs; node ids are tokenized through pandas, other
+        # values once per distinct value and expanded with _ranges
+        rows, tokens, first = _token_pairs(pd.Series(nodes, dtype=object))
+        has_first = pd.notna(first)
+        codes, uniques = pd.factorize(np.concatenate([tokens, first[has_first]]))
+        term_ids = np.array(self._term_ids(uniques), dtype=np.int64)[codes]
+        first_term = np.full(n, -1, dtype=np.int64)
+        first_term[has_first] = term_ids[len(tokens):]
+        named = np.flatnonzero(first_term >= 0)
+        docs = [rows, np.repeat(named, ID_WEIGHT - 1)]
+        terms = [term_ids[:len(tokens)], np.repeat(first_term[named], ID_WEIGHT - 1)]
+        frame = graph.nodes_frame().drop(columns="node_id")
+        for column in frame.columns:
+            if frame[column].dtype.kind in "iufbM":
+                continue
+            codes, uniques = pd.factorize(_text(frame[column]))
+            offsets, flat = _flatten([self._term_ids(tokenize(value)) for value in uniques])
+            docs.append(np.repeat(np.arange(n), np.diff(offsets)[codes]))
+            terms.append(flat[_ranges(offsets, codes)])
+        if len(src):
+            offsets, flat = _flatten([self._term_ids(tokenize(name)) for name in self.edge_names])
+            for ends in (src, dst):
+                docs.append(np.repeat(ends, np.diff(offsets)[name_codes]))
+                terms.append(flat[_ranges(offsets, name_codes)])
+            threat = np.isin(names, self.threat_edges)
+            for a, b in ((src[threat], dst[threat]), (dst[threat], src[threat])):
+                # Only the full id of the node on the other side, not its parts
+                keep = first_term[b] >= 0
+                docs.append(a[keep])
+                terms.append(first_term[b[keep]])
+
+        self.doc_nodes = list(nodes)
+        self.node_docs = dict(self.position)
+        self.doc_length = np.zeros(0, dtype=np.float32)
+        self.alive = np.zeros(0, dtype=bool)
+        self.segments = []
+        self._add_segment(np.concatenate(docs), np.concatenate(terms), n)
+        return self
+
+    def neighbours(self, node: Hashable, limit: Optional[int] = None) -> List[Tuple[Hashable, bool, str]]:
+        """(neighbour, outgoing, edge name) for the edges of node, up to limit"""
+        found = []
+        i = self.position.get(node)
+        if i is not None and node not in self.removed:
+            lo, hi = self.adj_offsets[i], self.adj_offsets[i + 1]
+            if limit is not None and not self.removed:
+                hi = min(hi, lo + limit)
+            found = [(self.nodes[j], outgoing, self.edge_names[name]) for j, outgoing, name in
+                     zip(self.adj_nodes[lo:hi].tolist(), self.adj_outgoing[lo:hi].tolist(),
+                         self.adj_names[lo:hi].tolist())]
+        found += self.added_edges.get(node, [])
+        if self.removed:
+            found = [entry for entry in found if entry[0] not in self.removed]
+        return found[:limit]
+
+    def _document(self, graph: Graph, node: Hashable) -> List[str]:
+        tokens = tokenize(node)
+        tokens.extend(tokens[:1] * (ID_WEIGHT - 1))
+        for value in graph.get_node_attributes(node).values():
+            if isinstance(value, str):
+                tokens.extend(tokenize(value))
+        for neighbour, _, name in self.neighbours(node):
+            tokens.extend(tokenize(name))
+            if name in self.threat_edges:
+                tokens.extend(tokenize(neighbour)[:1])
+        return tokens
+
+    def update(self, graph: Any, nodes: Iterable[Hashable] = (),
+               edges: Iterable[Tuple[Hashable, Hashable]] = ()) -> None:
+        """Re-index nodes added or changed in graph, and record edges added between nodes.
+
+        Only the given nodes and the endpoints of the given edges are
+        tokenized again; the rest of the index is untouched.
+        """
+        graph = _as_graph(graph)
+        nodes = list(nodes)
+        for source, target in edges:
+            name = str(graph.get_edge_attributes(source, target).get("name") or "")
+            self.added_edges.setdefault(source, []).append((target, True, name))
+            self.added_edges.setdefault(target, []).append((source, False, name))
+            nodes.extend([source, target])
+        nodes = list(dict.fromkeys(nodes))
+        first = len(self.alive)
+        docs, terms = [], []
+        for i, node in enumerate(nodes):
+            old = self.node_docs.get(node)
+            if old is not None:
+                self.alive[old] = False
+            self.removed.discard(node)
+            self.node_docs[node] = first + i
+            self.doc_nodes.append(node)
+            term_ids = self._term_ids(self._document(graph, node))
+            docs.extend([first + i] * len(term_ids))
+            terms.extend(term_ids)
+        if nodes:
+            self._add_segment(np.array(docs, dtype=np.int64), np.array(terms, dtype=np.int64), len(nodes))
+
+    def remove(self, nodes: Iterable[Hashable]) -> None:
+        """Drop nodes and their edges from the index"""
+        for node in nodes:
+            doc = self.node_docs.pop(node, None)
+            if doc is not None:
+                self.alive[doc] = False
+                self._weight = None
+            self.added_edges.pop(node, None)
+            self.removed.add(node)
+
+    def merge(self) -> None:
+        """Fold all segments into one, dropping the postings of retired documents"""
+        docs, terms = [], []
+        for segment in self.segments:
+            keep = self.alive[segment.docs]
+            repeats = segment.tf.astype(np.int64)[keep]
+            segment_terms = np.repeat(np.arange(segment.terms), np.diff(segment.offsets))
+            docs.append(np.repeat(segment.docs[keep], repeats))
+            terms.append(np.repeat(segment_terms[keep], repeats))
+        self.segments = []
+        if docs and sum(len(d) for d in docs):
+            self.segments = [_Segment.build(np.concatenate(docs), np.concatenate(terms), len(self.vocabulary))]
+
+    # -- queries -------------------------------------------------------
+
+    def query_terms(self, question: str) -> List[int]:
+        """Term ids for question; a word the index does not know is looked up by its parts"""
+        terms = []
+        for word in re.findall(r"[a-z0-9]+", question.lower()):
+            if word in STOPWORDS:
+                continue
+            words = [word] if word in self.vocabulary else re.findall(r"[a-z]+|[0-9]+", word)
+            terms.extend(self.vocabulary[w] for w in words if w in self.vocabulary)
+        return list(dict.fromkeys(terms))
+
+    def search(self, question: str, k: int = 5) -> List[Tuple[Hashable, float]]:
+        """The k nodes scoring highest for question under BM25.
+
+        Candidates are the documents of each query term's champion list
+        (all of its documents when it has at most CHAMPIONS in a segment),
+        then every candidate is scored exactly on all query terms. Retired
+        documents count towards term frequencies until the next merge.
+        """
+        terms = self.query_terms(question)
+        documents = len(self.node_docs)
+        if not terms or not documents:
+            return []
+        if self._weight is None:
+            average = float(self.doc_length[self.alive].mean()) or 1.0
+            self._weight = self.k1 * (1 - self.b + self.b * self.doc_length / average)
+        found = [segment.champion_docs(term, self._weight, CHAMPIONS) for term in terms for segment in self.segments]
+        candidates = np.unique(np.concatenate(found))
+        candidates = candidates[self.alive[candidates]]
+        if not len(candidates):
+            return []
+        weight = self._weight[candidates]
+        scores = np.zeros(len(candidates))
+        for term in terms:
+            frequency = sum(segment.frequency(term) for segment in self.segments)
+            idf = np.log1p((max(documents - frequency, 0) + 0.5) / (frequency + 0.5))
+            tf = sum(segment.counts(term, candidates) for segment in self.segments)
+            scores += idf * tf * (self.k1 + 1) / (tf + weight)
+        top = np.argpartition(-scores, k - 1)[:k] if len(scores) > k else np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.doc_nodes[candidates[i]], float(scores[i])) for i in top if scores[i] > 0]
+
+    def neighbourhood(self, graph: Any, node: Hashable, limit: int = 20) -> Dict[str, Any]:
+        """node with its attributes and up to limit incident edges"""
+        graph = _as_graph(graph)
+        if not graph.storage.has_node(node):
+            return {"node": node, "attributes": {}, "edges": []}
+        edges = []
+        for neighbour, outgoing, name in self.neighbours(node, limit):
+            source, target = (node, neighbour) if outgoing else (neighbour, node)
+            if not graph.storage.has_edge(source, target):
+                continue
+            attrs = graph.get_edge_attributes(source, target)
+            edges.append([source, name, target] + ([attrs["risk_score"]] if "risk_score" in attrs else []))
+        return {"node": node, "attributes": graph.get_node_attributes(node), "edges": edges}
+
+    def retrieve(self, graph: Any, question: str, k: int = 5, limit: int = 20) -> List[Dict[str, Any]]:
+        """Neighbourhoods of the k nodes most relevant to question"""
+        graph = _as_graph(graph)
+        return [self.neighbourhood(graph, node, limit) for node, _ in self.search(question, k)]
+
+    def context(self, graph: Any, question: str, k: int = 5, limit: int = 20) -> str:
+        """Compact JSON of the retrieved subgraph, for the prompt"""
+        return dumps(self.retrieve(graph, question, k, limit))
+
+    # -- persistence ---------------------------------------------------
+
+    def save(self, directory: str) -> None:
+        """Write the index to directory: arrays as .npy, vocabulary and node ids as JSON"""
+        self.merge()
+        os.makedirs(directory, exist_ok=True)
+        segment = self.segments[0] if self.segments else _Segment.build(
+            np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), len(self.vocabulary))
+        arrays = {"offsets": segment.offsets, "docs": segment.docs, "tf": segment.tf,
+                  "doc_length": self.doc_length, "alive": self.alive, "adj_offsets": self.adj_offsets,
+                  "adj_nodes": self.adj_nodes, "adj_outgoing": self.adj_outgoing, "adj_names": self.adj_names}
+        for name, array in arrays.items():
+            np.save(os.path.join(directory, f"{name}.npy"), array)
+        with open(os.path.join(directory, "index.json"), "w") as f:
+            json.dump({"k1": self.k1, "b": self.b, "threat_edges": self.threat_edges,
+                       "max_segments": self.max_segments,
+                       "vocabulary": sorted(self.vocabulary, key=self.vocabulary.get),
+                       "doc_nodes": self.doc_nodes, "nodes": self.nodes, "edge_names": self.edge_names,
+                       "added_edges": [[node, edges] for node, edges in self.added_edges.items()],
+                       "removed": list(self.removed)}, f)
+
+    @classmethod
+    def load(cls, directory: str) -> "GraphRetriever":
+        """Index written by save()"""
+        with open(os.path.join(directory, "index.json")) as f:
+            meta = json.load(f)
+        index = cls(meta["k1"], meta["b"], meta["threat_edges"], meta["max_segments"])
+        arrays = {name[:-4]: np.load(os.path.join(directory, name))
+                  for name in os.listdir(directory) if name.endswith(".npy")}
+        index.vocabulary = {term: i for i, term in enumerate(meta["vocabulary"])}
+        index.segments = [_Segment(arrays["offsets"], arrays["docs"], arrays["tf"])]
+        index.doc_length, index.alive = arrays["doc_length"], arrays["alive"]
+        # JSON turns tuple node ids into lists
+        index.doc_nodes = [freeze(node) for node in meta["doc_nodes"]]
+        index.node_docs = {node: doc for doc, node in enumerate(index.doc_nodes) if index.alive[doc]}
+        index.nodes = [freeze(node) for node in meta["nodes"]]
+        index.position = {node: i for i, node in enumerate(index.nodes)}
+        index.edge_names = meta["edge_names"]
+        index.adj_offsets, index.adj_nodes = arrays["adj_offsets"], arrays["adj_nodes"]
+        index.adj_outgoing, index.adj_names = arrays["adj_outgoing"], arrays["adj_names"]
+        index.added_edges = {freeze(node): [freeze(edge) for edge in edges] for node, edges in meta["added_edges"]}
+        index.removed = {freeze(node) for node in meta["removed"]}
+        return index
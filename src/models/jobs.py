@@ -0,0 +1,138 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from .registry import Model
+
+_pools: Dict[int, ThreadPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def worker_pool(workers: int = 4) -> ThreadPoolExecutor:
+    """Shared thread pool for scoring; NumPy and torch release the GIL inside predict"""
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scoring")
+        return pool
+
+
+def score_frame(model: Model, frame: pd.DataFrame, batch_size: int = 8192,
+                keep: Optional[List[str]] = None, column: str = "score") -> pd.DataFrame:
+    """frame's keep columns (all when None) plus model scores, computed batch_size rows at a time"""
+    X = model.matrix(frame)
+    scores = np.empty(len(frame), dtype=np.float32)
+    for start in range(0, len(frame), batch_size):
+        scores[start:start + batch_size] = model.predict(X[start:start + batch_size])
+    result = frame if keep is None else frame[keep]
+    return result.assign(**{column: scores})
+
+
+@dataclass
+class JobProgress:
+    """Rows scored so far; total is None when the input size is unknown.
+
+    cancelled is set when cancel() stopped the job before the input ran
+    out; done is still set once the chunks in flight have finished.
+    """
+    rows: int = 0
+    total: Optional[int] = None
+    seconds: float = 0.0
+    done: bool = False
+    cancelled: bool = False
+    error: Optional[str] = None
+    started: float = field(default_factory=time.perf_counter, repr=False)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    @property
+    def fraction(self) -> float:
+        if self.done and not self.cancelled:
+            return 1.0
+        return min(self.rows / self.total, 1.0) if self.total else 0.0
+
+
+class ScoringJob:
+    """Scores a stream of DataFrame chunks in the background.
+
+    Chunks are scored concurrently on a worker pool, at most max_pending
+    at a time, and handed in input order to sink, e.g. a database writer
+    that takes an iterable of frames (write_table). Without a sink the
+    scored chunks are kept in results. progress is updated after every
+    chunk, so a UI can poll it while the job runs.
+    """
+
+    def __init__(self, model: Model, chunks: Iterable[pd.DataFrame], total: Optional[int] = None,
+                 sink: Optional[Callable[[Iterable[pd.DataFrame]], object]] = None, batch_size: int = 8192,
+                 keep: Optional[List[str]] = None, workers: int = 4, max_pending: int = 8):
+        self.model = model
+        self.chunks = chunks
+        self.sink = sink
+        self.batch_size = batch_size
+        self.keep = keep
+        self.workers = workers
+        self.max_pending = max_pending
+        self.progress = JobProgress(total=total)
+        self.results: List[pd.DataFrame] = []
+        self.cancelled = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def _scored(self) -> Iterator[pd.DataFrame]:
+        pool = worker_pool(self.workers)
+        pending = deque()
+        chunks = iter(self.chunks)
+        exhausted = False
+        while True:
+            while len(pending) < self.max_pending and not exhausted:
+                if self.cancelled.is_set():
+                    self.progress.cancelled = True
+                    break
+                chunk = next(chunks, None)
+                if chunk is None:
+                    exhausted = True
+                    break
+                pending.append(pool.submit(score_frame, self.model, chunk, self.batch_size, self.keep))
+            if not pending:
+                return
+            scored = pending.popleft().result()
+            self.progress.rows += len(scored)
+            self.progress.seconds = time.perf_counter() - self.progress.started
+            yield scored
+
+    def run(self) -> JobProgress:
+        """Score every chunk in the calling thread"""
+        try:
+            if self.sink is not None:
+                self.sink(self._scored())
+            else:
+                self.results.extend(self._scored())
+        except Exception as e:
+            self.progress.error = str(e)
+        self.progress.seconds = time.perf_counter() - self.progress.started
+        self.progress.done = True
+        return self.progress
+
+    def start(self) -> "ScoringJob":
+        """Run in a daemon thread; poll progress, wait() or cancel()"""
+        self.thread = threading.Thread(target=self.run, name="scoring-job", daemon=True)
+        self.thread.start()
+        return self
+
+    def wait(self, timeout: Optional[float] = None) -> JobProgress:
+        if self.thread is not None:
+            self.thread.join(timeout)
+        return self.progress
+
+    def cancel(self) -> None:
+        """Stop reading new chunks; chunks already submitted still finish"""
+        self.cancelled.set()
+
+    def frame(self) -> pd.DataFrame:
+        """All scored chunks kept in results, as one frame"""
+        return pd.concat(self.results, ignore_index=True) if self.results else pd.DataFrame()
@@ -0,0 +1,260 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+MODEL_NAMES = ("XGBoost", "RandomForest", "NeuralNetwork", "LogisticRegression")
+
+
+def feature_columns(frame: pd.DataFrame) -> List[str]:
+    """Numeric columns of frame other than ids, the model inputs"""
+    return [column for column in frame.columns
+            if pd.api.types.is_numeric_dtype(frame[column]) and not pd.api.types.is_bool_dtype(frame[column])
+            and not (str(column).lower() == "id" or str(column).lower().endswith("_id"))]
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+class Model:
+    """A scoring model over a fixed list of numeric features.
+
+    Inputs are standardized with the mean and scale stored with the
+    model; predict() takes a float32 matrix and returns one score in
+    [0, 1] per row. Subclasses hold their parameters in NumPy arrays so
+    they can be saved to and loaded from .npz files. trained is False for
+    the random stand-ins of initial_model(), whose scores mean nothing.
+    """
+    trained = True
+
+    def __init__(self, features: Sequence[str], mean: np.ndarray, scale: np.ndarray):
+        self.features = list(features)
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.scale = np.asarray(scale, dtype=np.float32)
+
+    def matrix(self, frame: pd.DataFrame) -> np.ndarray:
+        """Standardized feature matrix of frame (missing values at the mean)"""
+        X = frame[self.features].to_numpy(dtype=np.float32, na_value=np.nan)
+        X = (X - self.mean) / self.scale
+        return np.nan_to_num(X, nan=0.0, posinf=0.0, neginf=0.0)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def parameters(self) -> Dict[str, np.ndarray]:
+        return {}
+
+    def save(self, path: str) -> None:
+        np.savez(path, features=np.array(self.features), mean=self.mean, scale=self.scale, **self.parameters())
+
+
+class LinearModel(Model):
+    """Logistic regression: sigmoid(X @ weights + bias)"""
+
+    def __init__(self, features, mean, scale, weights: np.ndarray, bias: float = 0.0):
+        super().__init__(features, mean, scale)
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = np.float32(bias)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return _sigmoid(X @ self.weights + self.bias)
+
+    def parameters(self) -> Dict[str, np.ndarray]:
+        return {"weights": self.weights, "bias": np.array(self.bias)}
+
+
+class TreeEnsemble(Model):
+    """Decision trees stored as arrays, one row per tree.
+
+    feature[t, i] is the feature tested at node i of tree t (-1 for a
+    leaf), threshold the split value (go left when x <= threshold), left
+    and right the child nodes and value the leaf output. All trees are
+    walked for a whole batch at once, one level per step, so a batch
+    costs depth vectorized gathers. combine="mean" averages the leaves
+    (random forest); combine="logit" sums them and applies a sigmoid
+    (gradient boosting).
+    """
+
+    def __init__(self, features, mean, scale, feature: np.ndarray, threshold: np.ndarray,
+                 left: np.ndarray, right: np.ndarray, value: np.ndarray, combine: str = "mean"):
+        super().__init__(features, mean, scale)
+        if combine not in ("mean", "logit"):
+            raise ValueError(f"Unknown tree combination: {combine}")
+        self.feature = np.asarray(feature, dtype=np.int64)
+        self.threshold = np.asarray(threshold, dtype=np.float32)
+        self.left = np.asarray(left, dtype=np.int64)
+        self.right = np.asarray(right, dtype=np.int64)
+        self.value = np.asarray(value, dtype=np.float32)
+        self.combine = combine
+        # Flat copies for predict: node ids offset per tree, leaves pointing at themselves
+        trees, width = self.feature.shape
+        offsets = (np.arange(trees) * width)[:, None]
+        leaf = self.feature < 0
+        nodes = np.arange(width) + offsets
+        self._feature = np.where(leaf, 0, self.feature).ravel().astype(np.int32)
+        self._threshold = self.threshold.ravel()
+        self._left = np.where(leaf, nodes, self.left + offsets).ravel().astype(np.int32)
+        self._right = np.where(leaf, nodes, self.right + offsets).ravel().astype(np.int32)
+        self._roots = offsets[:, 0].astype(np.int32)
+        self.depth = 0
+        frontier = self._roots
+        while (~leaf.ravel()[frontier]).any():
+            frontier = np.unique(np.concatenate([self._left[frontier], self._right[frontier]]))
+            self.depth += 1
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        rows, features = X.shape
+        flat = X.ravel()
+        base = (np.arange(rows, dtype=np.int64) * features)[:, None]
+        node = np.broadcast_to(self._roots, (rows, len(self._roots)))
+        for _ in range(self.depth):
+            go_left = flat[base + self._feature[node]] <= self._threshold[node]
+            node = np.where(go_left, self._left[node], self._right[node])
+        leaves = self.value.ravel()[node]
+        if self.combine == "mean":
+            return leaves.mean(axis=1)
+        return _sigmoid(leaves.sum(axis=1))
+
+    def parameters(self) -> Dict[str, np.ndarray]:
+        return {"feature": self.feature, "threshold": self.threshold, "left": self.left, "right": self.right,
+                "value": self.value, "combine": np.array(self.combine)}
+
+
+class TorchModel(Model):
+    """Feed-forward network run with torch on CPU; weights are (in, out) matrices per layer"""
+
+    def __init__(self, features, mean, scale, **layers: np.ndarray):
+        super().__init__(features, mean, scale)
+        import torch
+        self.torch = torch
+        count = len([name for name in layers if name.startswith("weight")])
+        linear = []
+        for i in range(count):
+            weight = torch.from_numpy(np.asarray(layers[f"weight{i}"], dtype=np.float32))
+            layer = torch.nn.Linear(weight.shape[0], weight.shape[1])
+            with torch.no_grad():
+                layer.weight.copy_(weight.T)
+                layer.bias.copy_(torch.from_numpy(np.asarray(layers[f"bias{i}"], dtype=np.float32)))
+            linear.append(layer)
+        modules = []
+        for layer in linear[:-1]:
+            modules.extend([layer, torch.nn.ReLU()])
+        self.network = torch.nn.Sequential(*modules, linear[-1], torch.nn.Sigmoid()).eval()
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        with self.torch.inference_mode():
+            return self.network(self.torch.from_numpy(np.ascontiguousarray(X))).numpy()[:, 0]
+
+    def parameters(self) -> Dict[str, np.ndarray]:
+        layers = [module for module in self.network if isinstance(module, self.torch.nn.Linear)]
+        parameters = {}
+        for i, layer in enumerate(layers):
+            parameters[f"weight{i}"] = layer.weight.detach().numpy().T
+            parameters[f"bias{i}"] = layer.bias.detach().numpy()
+        return parameters
+
+
+def _random_trees(rng: np.random.Generator, features: int, trees: int, depth: int,
+                  combine: str) -> Dict[str, Any]:
+    """Complete binary trees of the given depth with random splits on standardized features"""
+    inner, total = 2 ** depth - 1, 2 ** (depth + 1) - 1
+    nodes = np.arange(total)
+    feature = np.where(nodes < inner, rng.integers(0, features, (trees, total)), -1)
+    scale = 1.0 if combine == "mean" else 0.3
+    return {
+        "feature": feature,
+        "threshold": rng.normal(0.0, 0.7, (trees, total)),
+        "left": np.broadcast_to(np.minimum(2 * nodes + 1, total - 1), (trees, total)),
+        "right": np.broadcast_to(np.minimum(2 * nodes + 2, total - 1), (trees, total)),
+        "value": rng.uniform(0.0, 1.0, (trees, total)) if combine == "mean" else rng.normal(0.0, scale, (trees, total)),
+        "combine": combine,
+    }
+
+
+def initial_model(name: str, features: Sequence[str], sample: Optional[pd.DataFrame] = None,
+                  seed: int = 42) -> Model:
+    """Seeded, untrained model of the given kind.
+
+    Stands in until trained parameters are saved with Model.save(), and
+    is marked trained=False; sample, when given, sets the input
+    standardization.
+    """
+    model = _initial_model(name, features, sample, seed)
+    model.trained = False
+    return model
+
+
+def _initial_model(name: str, features: Sequence[str], sample: Optional[pd.DataFrame], seed: int) -> Model:
+    if not len(features):
+        raise ValueError("A model needs at least one feature column")
+    rng = np.random.default_rng(seed)
+    n = len(features)
+    mean, scale = np.zeros(n), np.ones(n)
+    if sample is not None and len(sample):
+        values = sample[list(features)].to_numpy(dtype=np.float64, na_value=np.nan)
+        mean = np.nan_to_num(np.nanmean(values, axis=0)) if len(values) else mean
+        scale = np.nan_to_num(np.nanstd(values, axis=0), nan=1.0)
+        scale[scale == 0] = 1.0
+    if name == "LogisticRegression":
+        return LinearModel(features, mean, scale, rng.normal(0.0, 1.0 / np.sqrt(max(n, 1)), n))
+    if name == "RandomForest":
+        return TreeEnsemble(features, mean, scale, **_random_trees(rng, max(n, 1), trees=100, depth=8, combine="mean"))
+    if name == "XGBoost":
+        return TreeEnsemble(features, mean, scale, **_random_trees(rng, max(n, 1), trees=200, depth=6, combine="logit"))
+    if name == "NeuralNetwork":
+        sizes = [n, 64, 32, 1]
+        layers = {}
+        for i, (fan_in, fan_out) in enumerate(zip(sizes[:-1], sizes[1:])):
+            layers[f"weight{i}"] = rng.normal(0.0, np.sqrt(2.0 / max(fan_in, 1)), (fan_in, fan_out))
+            layers[f"bias{i}"] = np.zeros(fan_out)
+        return TorchModel(features, mean, scale, **layers)
+    raise ValueError(f"Unknown model: {name}")
+
+
+def read_model(name: str, path: str) -> Model:
+    """Model saved with Model.save()"""
+    with np.load(path) as data:
+        arrays = {key: data[key] for key in data.files}
+    features, mean, scale = arrays.pop("features").tolist(), arrays.pop("mean"), arrays.pop("scale")
+    if name == "LogisticRegression":
+        return LinearModel(features, mean, scale, arrays["weights"], float(arrays["bias"]))
+    if name in ("RandomForest", "XGBoost"):
+        arrays["combine"] = str(arrays["combine"])
+        return TreeEnsemble(features, mean, scale, **arrays)
+    if name == "NeuralNetwork":
+        return TorchModel(features, mean, scale, **arrays)
+    raise ValueError(f"Unknown model: {name}")
+
+
+_models: Dict[Tuple, Model] = {}
+_models_lock = threading.Lock()
+
+
+def load_model(name: str, features: Sequence[str], path: Optional[str] = None,
+               sample: Optional[pd.DataFrame] = None) -> Model:
+    """One model per (name, features, path), loaded on first use and shared afterwards.
+
+    Parameters come from path; without one the model is a fresh
+    initial_model() (untrained) standardized on sample, and is not
+    cached, since it depends on the sample. A path that does not exist
+    raises FileNotFoundError rather than falling back to untrained weights.
+    """
+    if not len(features):
+        raise ValueError("A model needs at least one feature column")
+    if not path:
+        return initial_model(name, features, sample)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No model parameters at {path}")
+    key = (name, tuple(features), path)
+    with _models_lock:
+        model = _models.get(key)
+        if model is None:
+            model = _models[key] = read_model(name, path)
+        return model
+
+
+def clear_models() -> None:
+    with _models_lock:
+        _models.clear()
@@ -0,0 +1,190 @@
+import cProfile
+import functools
+import io
+import os
+import pstats
+import threading
+import time
+import numpy as np
+import pandas as pd
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Off unless THREAT_INTEL_METRICS is set or enable() is called; while off,
+# an instrumented call costs one extra function call and a flag check.
+_enabled = os.environ.get("THREAT_INTEL_METRICS", "") not in ("", "0")
+_histograms: Dict[str, "RingHistogram"] = {}
+_counters: Dict[str, int] = {}
+_lock = threading.Lock()
+# Operations whose next call is profiled, and the reports collected so far
+_armed: Dict[str, str] = {}
+_reports: List[Tuple[str, str, float, str]] = []
+MAX_REPORTS = 20
+PROFILERS = ("cprofile", "pyinstrument")
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+class RingHistogram:
+    """Durations of the last capacity calls of one operation, plus all-time count and total.
+
+    Samples live in a fixed NumPy ring buffer, so memory stays constant
+    however long the server runs and percentiles describe recent calls.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self.samples = np.zeros(capacity)
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.samples[self.count % len(self.samples)] = seconds
+        self.count += 1
+        self.total += seconds
+
+    def recent(self) -> np.ndarray:
+        return self.samples[:min(self.count, len(self.samples))]
+
+    def percentiles(self, q=(50, 95, 99)) -> np.ndarray:
+        recent = self.recent()
+        return np.percentile(recent, q) if len(recent) else np.full(len(q), np.nan)
+
+
+def record(name: str, seconds: float) -> None:
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = RingHistogram()
+        histogram.record(seconds)
+
+
+def count(name: str, amount: int = 1) -> None:
+    """Add to a named counter (when enabled)"""
+    if _enabled:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + amount
+
+
+def _profiled(name: str, kind: str, fn: Callable, args, kwargs) -> Any:
+    """Run fn under the given profiler and keep the text report"""
+    start = time.perf_counter()
+    if kind == "pyinstrument":
+        from pyinstrument import Profiler
+        profiler = Profiler()
+        profiler.start()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profiler.stop()
+            _keep_report(name, kind, time.perf_counter() - start, profiler.output_text(unicode=True))
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(fn, *args, **kwargs)
+    finally:
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(40)
+        _keep_report(name, kind, time.perf_counter() - start, out.getvalue())
+
+
+def _keep_report(name: str, kind: str, seconds: float, text: str) -> None:
+    record(name, seconds)
+    with _lock:
+        _reports.append((name, kind, seconds, text))
+        del _reports[:-MAX_REPORTS]
+
+
+def timed(name: Optional[str] = None) -> Callable:
+    """Decorator recording each call's duration under name (default: the function's qualified name)"""
+    def decorate(fn: Callable) -> Callable:
+        operation = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            if _armed and operation in _armed:
+                kind = _armed.pop(operation, None)
+                if kind is not None:
+                    return _profiled(operation, kind, fn, args, kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(operation, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+class timer:
+    """Context manager recording the duration of a block: with timer("llm.response"): ..."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = None
+
+    def __enter__(self) -> "timer":
+        if _enabled:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self.start is not None:
+            record(self.name, time.perf_counter() - self.start)
+
+
+def profile_next(name: str, kind: str = "cprofile") -> None:
+    """Profile the next call of a @timed operation (in whichever thread makes it)"""
+    if kind not in PROFILERS:
+        raise ValueError(f"Unknown profiler: {kind}")
+    with _lock:
+        _armed[name] = kind
+
+
+def armed() -> Dict[str, str]:
+    with _lock:
+        return dict(_armed)
+
+
+def reports() -> List[Tuple[str, str, float, str]]:
+    """(operation, profiler, seconds, text) of the latest profiled calls, newest last"""
+    with _lock:
+        return list(_reports)
+
+
+def operations() -> List[str]:
+    with _lock:
+        return sorted(_histograms)
+
+
+def summary() -> pd.DataFrame:
+    """Calls, total time and p50/p95/p99 latency per operation, slowest p95 first"""
+    with _lock:
+        rows = [(name, histogram.count, histogram.total, *histogram.percentiles())
+                for name, histogram in _histograms.items()]
+    frame = pd.DataFrame(rows, columns=["operation", "calls", "total_s", "p50_ms", "p95_ms", "p99_ms"])
+    frame[["p50_ms", "p95_ms", "p99_ms"]] *= 1e3
+    return frame.sort_values("p95_ms", ascending=False, ignore_index=True)
+
+
+def counters() -> Dict[str, int]:
+    with _lock:
+        return dict(_counters)
+
+
+def reset() -> None:
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+        _armed.clear()
+        del _reports[:]
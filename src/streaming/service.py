@@ -0,0 +1,254 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+import networkx as nx
+import numpy as np
+import pandas as pd
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+from data_structures.graph import Graph, GraphProperties
+from monitoring.metrics import timed
+
+CRITICAL_RISK = 9.0
+HIGH_RISK = 7.0
+RATE_WINDOW = 10.0  # seconds of history behind events_per_second
+
+
+def event_seconds(values: pd.Series, default: float) -> np.ndarray:
+    """Epoch seconds of event timestamps given as numbers or date strings; default where unset"""
+    seconds = np.array(pd.to_numeric(values, errors="coerce"), dtype=float)
+    text = np.isnan(seconds) & values.notna().to_numpy()
+    if text.any():
+        parsed = pd.to_datetime(values[text], errors="coerce", utc=True)
+        seconds[text] = (parsed - pd.Timestamp(0, tz="UTC")).dt.total_seconds().to_numpy()
+    return np.where(np.isnan(seconds), default, seconds)
+
+
+@dataclass
+class IngestMetrics:
+    """Throughput and lag of the service; lag is apply time minus event time"""
+    events: int = 0
+    batches: int = 0
+    skipped: int = 0
+    queued: int = 0
+    lag_seconds: float = 0.0
+    max_lag_seconds: float = 0.0
+    started: float = field(default_factory=time.monotonic, repr=False)
+    window: Deque[Tuple[float, int]] = field(default_factory=deque, repr=False)
+
+    def record(self, events: int, lag: float) -> None:
+        now = time.monotonic()
+        self.events += events
+        self.batches += 1
+        self.lag_seconds = lag
+        self.max_lag_seconds = max(self.max_lag_seconds, lag)
+        self.window.append((now, events))
+        while self.window and self.window[0][0] < now - RATE_WINDOW:
+            self.window.popleft()
+
+    @property
+    def events_per_second(self) -> float:
+        span = min(RATE_WINDOW, time.monotonic() - self.started)
+        return sum(count for _, count in self.window) / span if span > 0 else 0.0
+
+
+@dataclass
+class LiveCounters:
+    """Dashboard stat cards, updated per batch instead of recomputed from all events"""
+    incidents: int = 0
+    critical: int = 0
+    severity_sum: float = 0.0
+    scored: int = 0
+    high_risk_assets: Set = field(default_factory=set, repr=False)
+
+    @property
+    def average_severity(self) -> float:
+        return self.severity_sum / self.scored if self.scored else 0.0
+
+    def snapshot(self) -> Dict[str, float]:
+        return {"incidents": self.incidents, "critical": self.critical,
+                "average_severity": round(self.average_severity, 2), "high_risk_assets": len(self.high_risk_assets)}
+
+
+class IngestionService:
+    """Consumes threat events from a source into a Graph and an event RollupStore.
+
+    The source's chunks go through a bounded queue of queue_size chunks:
+    when the consumer falls behind, the producer waits on put() and stops
+    reading, so memory stays flat and the backlog stays at the source.
+    The consumer gathers chunks into micro-batches of up to batch_size
+    events or max_delay seconds and applies each batch in a worker
+    thread: threat/asset nodes and threatens edges are upserted with
+    add_nodes_bulk/add_edges_bulk, events are appended to the rollups and
+    counters and metrics are updated. Readers take lock around graph
+    access; counters and metrics are plain values safe to poll.
+    pause() stops reading the source (the backlog again stays there)
+    until resume(), which also starts the service on first use.
+    """
+
+    def __init__(self, source: Any, graph: Optional[Graph] = None, events: Any = None,
+                 batch_size: int = 5_000, max_delay: float = 0.5, queue_size: int = 64):
+        self.source = source
+        self.graph = graph if graph is not None else Graph(GraphProperties(directed=True, backend="csr"))
+        self.events = events
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.queue_size = queue_size
+        self.metrics = IngestMetrics()
+        self.counters = LiveCounters()
+        self.lock = threading.Lock()
+        self.error: Optional[str] = None
+        self.paused = False
+        self.thread: Optional[threading.Thread] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.task: Optional[asyncio.Task] = None
+
+    # -- pipeline ------------------------------------------------------
+
+    async def _produce(self, queue: asyncio.Queue) -> None:
+        try:
+            async for chunk in self.source.events():
+                while self.paused:
+                    await asyncio.sleep(self.max_delay)
+                await queue.put(chunk)
+                self.metrics.queued = queue.qsize()
+        finally:
+            await queue.put(None)
+
+    async def _batches(self, queue: asyncio.Queue):
+        """Lists of events, each at most batch_size events or max_delay seconds of arrivals"""
+        loop = asyncio.get_running_loop()
+        while True:
+            chunk = await queue.get()
+            if chunk is None:
+                return
+            batch = list(chunk)
+            deadline = loop.time() + self.max_delay
+            finished = False
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    chunk = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if chunk is None:
+                    finished = True
+                    break
+                batch.extend(chunk)
+            self.metrics.queued = queue.qsize()
+            yield batch
+            if finished:
+                return
+
+    async def run(self) -> None:
+        """Ingest until the source ends or the task is cancelled"""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        producer = asyncio.create_task(self._produce(queue))
+        try:
+            async for batch in self._batches(queue):
+                try:
+                    await asyncio.to_thread(self.apply, batch)
+                except Exception as e:
+                    # A malformed batch is dropped; the feed keeps going
+                    self.error = str(e)
+                    self.metrics.skipped += len(batch)
+        finally:
+            producer.cancel()
+
+    async def _main(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.task = asyncio.current_task()
+        try:
+            await self.run()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self.error = str(e)
+
+    def start(self) -> "IngestionService":
+        """Run in a daemon thread with its own event loop"""
+        self.thread = threading.Thread(target=asyncio.run, args=(self._main(),), name="ingestion", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        if self.running and self.task is not None:
+            self.loop.call_soon_threadsafe(self.task.cancel)
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def pause(self) -> None:
+        self.paused = True
+
+    def resume(self) -> "IngestionService":
+        self.paused = False
+        if self.thread is None:
+            self.start()
+        return self
+
+    @property
+    def running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    # -- applying a batch ------------------------------------------------
+
+    @timed()
+    def apply(self, events: List[Dict]) -> int:
+        """Upsert one micro-batch into the graph, rollups and counters; returns the events applied"""
+        now = time.time()
+        frame = pd.DataFrame.from_records(events)
+        for column in ("threat", "asset"):
+            if column not in frame:
+                frame[column] = None
+        valid = frame["threat"].notna() & frame["asset"].notna()
+        self.metrics.skipped += int((~valid).sum())
+        frame = frame[valid].reset_index(drop=True)
+        if not len(frame):
+            return 0
+        seconds = event_seconds(frame.get("timestamp", pd.Series(np.nan, index=frame.index)), now)
+        risk = pd.to_numeric(frame.get("risk_score", pd.Series(np.nan, index=frame.index)), errors="coerce")
+        frame = frame.assign(timestamp=seconds, risk_score=risk.to_numpy(dtype=float))
+
+        # Repeated (threat, asset) pairs in a batch become one edge update
+        edges = frame.groupby(["threat", "asset"], sort=False).agg(
+            risk_score=("risk_score", "last"), last_seen=("timestamp", "max")).reset_index()
+        threats = pd.DataFrame({"node_id": frame["threat"].unique()}).assign(asset_type="threat")
+        if "threat_type" in frame:
+            types = frame.dropna(subset=["threat_type"]).groupby("threat", sort=False)["threat_type"].last()
+            threats["threat_type"] = threats["node_id"].map(types)
+        assets = None
+        if "asset_type" in frame:
+            # Only assets whose type is known; the others come in with their edges
+            known = frame.dropna(subset=["asset_type"]).groupby("asset", sort=False)["asset_type"].last()
+            assets = pd.DataFrame({"node_id": known.index, "asset_type": known.to_numpy()})
+        with self.lock:
+            self.graph.add_nodes_bulk(threats)
+            if assets is not None and len(assets):
+                self.graph.add_nodes_bulk(assets)
+            self.graph.add_edges_bulk(edges.rename(columns={"threat": "source", "asset": "target"})
+                                      .assign(name="threatens"))
+
+        if self.events is not None:
+            rollup = pd.DataFrame({self.events.time_column: pd.to_datetime(seconds, unit="s")})
+            for dimension in self.events.dimensions:
+                values = frame[dimension] if dimension in frame else pd.Series(None, index=frame.index, dtype=object)
+                rollup[dimension] = values.fillna("Unknown").to_numpy(dtype=object)
+            self.events.append(rollup)
+
+        scored = frame["risk_score"].dropna()
+        counters = self.counters
+        counters.incidents += len(frame)
+        counters.critical += int((scored >= CRITICAL_RISK).sum())
+        counters.severity_sum += float(scored.sum())
+        counters.scored += len(scored)
+        counters.high_risk_assets.update(frame.loc[frame["risk_score"] >= HIGH_RISK, "asset"].tolist())
+        self.metrics.record(len(frame), float(time.time() - seconds.min()))
+        return len(frame)
+
+    def asset_graph(self) -> nx.Graph:
+        """NetworkX snapshot of the live graph for display"""
+        with self.lock:
+            return self.graph.graph
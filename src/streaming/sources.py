@@ -0,0 +1,168 @@
+import asyncio
+import json
+import os
+import time
+import numpy as np
+from typing import AsyncIterator, Dict, List, Optional
+
+# An event is a dict with at least "threat" and "asset" (node ids); optional
+# "timestamp" (epoch seconds or ISO string), "risk_score", "country",
+# "threat_type" and "asset_type". Sources yield lists of events, whatever
+# arrived together, so the service can batch without per-event overhead.
+
+COUNTRIES = ["USA", "China", "Russia", "Iran", "North Korea", "Brazil", "India", "Germany"]
+THREAT_TYPES = ["Ransomware", "Malware", "Phishing", "Others"]
+ASSET_TYPES = ["server", "network_device", "printer"]
+
+
+def _parse_lines(lines: List[str]) -> List[Dict]:
+    """JSON objects of a list of lines; blank and malformed lines are skipped"""
+    events = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            event = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(event, dict):
+            events.append(event)
+    return events
+
+
+class FileTailSource:
+    """JSON-lines events appended to a file, followed like tail -F.
+
+    Reads everything available per poll, holds back a trailing partial
+    line, and reopens the file when it is truncated or replaced (log
+    rotation). from_start=False skips what the file already contains.
+    """
+
+    def __init__(self, path: str, poll_interval: float = 0.25, from_start: bool = False,
+                 max_lines: int = 10_000):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.from_start = from_start
+        self.max_lines = max_lines
+
+    async def events(self) -> AsyncIterator[List[Dict]]:
+        handle, inode, partial = None, None, ""
+        while True:
+            if handle is None:
+                if not os.path.exists(self.path):
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                handle = open(self.path, "r")
+                inode = os.fstat(handle.fileno()).st_ino
+                if not self.from_start:
+                    handle.seek(0, os.SEEK_END)
+                self.from_start = True  # rotated files are read from the start
+            lines = handle.readlines(self.max_lines * 256)
+            if lines:
+                lines[0] = partial + lines[0]
+                partial = "" if lines[-1].endswith("\n") else lines.pop()
+                events = _parse_lines(lines)
+                if events:
+                    yield events
+                continue
+            try:
+                stat = os.stat(self.path)
+                rotated = stat.st_ino != inode or stat.st_size < handle.tell()
+            except FileNotFoundError:
+                rotated = True
+            if rotated:
+                handle.close()
+                handle, partial = None, ""
+            await asyncio.sleep(self.poll_interval)
+
+
+class SocketSource:
+    """JSON-lines events read from a TCP feed, reconnecting after failures.
+
+    While the service is busy this source stops reading, so TCP flow
+    control slows the sender down instead of buffering in memory.
+    """
+
+    def __init__(self, host: str, port: int, retry_interval: float = 1.0, chunk_size: int = 1 << 20):
+        self.host = host
+        self.port = port
+        self.retry_interval = retry_interval
+        self.chunk_size = chunk_size
+
+    async def events(self) -> AsyncIterator[List[Dict]]:
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            except OSError:
+                await asyncio.sleep(self.retry_interval)
+                continue
+            partial = b""
+            try:
+                while True:
+                    # Everything buffered so far, up to chunk_size bytes
+                    chunk = await reader.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    lines = (partial + chunk).split(b"\n")
+                    partial = lines.pop()
+                    events = _parse_lines([line.decode("utf-8", "replace") for line in lines])
+                    if events:
+                        yield events
+            except OSError:
+                pass
+            finally:
+                writer.close()
+            await asyncio.sleep(self.retry_interval)
+
+
+class FakeFeed:
+    """Local stand-in for a live feed: rate random events per second in ticks.
+
+    Threats and assets are drawn from fixed pools ("Threat17" ->
+    "Server4"), so the graph grows to at most threats + assets nodes and
+    later events update existing edges. limit stops the feed after that
+    many events.
+    """
+
+    def __init__(self, rate: float = 1_000, assets: int = 2_000, threats: int = 200, tick: float = 0.1,
+                 limit: Optional[int] = None, seed: Optional[int] = None):
+        self.rate = rate
+        self.assets = assets
+        self.threats = threats
+        self.tick = tick
+        self.limit = limit
+        self.rng = np.random.default_rng(seed)
+        kinds = self.rng.integers(0, len(ASSET_TYPES), assets)
+        self.asset_types = np.array(ASSET_TYPES, dtype=object)[kinds]
+        prefixes = np.array(["Server", "Switch", "Printer"], dtype=object)[kinds]
+        self.asset_ids = prefixes + np.arange(1, assets + 1).astype(str).astype(object)
+
+    def batch(self, count: int) -> List[Dict]:
+        rng = self.rng
+        assets = rng.integers(0, self.assets, count)
+        threats = rng.integers(1, self.threats + 1, count)
+        columns = {
+            "timestamp": [time.time()] * count,
+            "threat": ("Threat" + threats.astype(str).astype(object)).tolist(),
+            "asset": self.asset_ids[assets].tolist(),
+            "asset_type": self.asset_types[assets].tolist(),
+            "risk_score": rng.uniform(1.0, 10.0, count).round(2).tolist(),
+            "country": np.array(COUNTRIES, dtype=object)[rng.integers(0, len(COUNTRIES), count)].tolist(),
+            "threat_type": np.array(THREAT_TYPES, dtype=object)[rng.integers(0, len(THREAT_TYPES), count)].tolist(),
+        }
+        return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+    async def events(self) -> AsyncIterator[List[Dict]]:
+        sent = 0
+        carry = 0.0
+        while self.limit is None or sent < self.limit:
+            carry += self.rate * self.tick
+            count = int(carry)
+            carry -= count
+            if self.limit is not None:
+                count = min(count, self.limit - sent)
+            if count:
+                yield self.batch(count)
+                sent += count
+            await asyncio.sleep(self.tick)
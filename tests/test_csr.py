@@ -0,0 +1,28 @@
+import random
+import pytest
+from data_structures.csr import CSRStorage
+from data_structures.storage import NetworkXStorage
+
+
+@pytest.mark.parametrize("directed", [True, False])
+def test_degrees_match_networkx_storage(directed):
+    rng = random.Random(1)
+    for _ in range(50):
+        store, expected = CSRStorage(directed), NetworkXStorage(directed)
+        for node in range(8):
+            store.add_node(node, {})
+            expected.add_node(node, {})
+        for step in range(rng.randint(0, 60)):
+            source, target = rng.randrange(8), rng.randrange(8)
+            draw = rng.random()
+            if draw < 0.15 and expected.graph.has_edge(source, target):
+                store.remove_edge(source, target)
+                expected.remove_edge(source, target)
+            elif draw < 0.2:
+                store.consolidate()
+            else:
+                # Repeats and self-loops stay unconsolidated rows until the next consolidate()
+                store.add_edge(source, target, {"step": step})
+                expected.add_edge(source, target, {"step": step})
+        nodes = list(range(8)) + ["missing"]
+        assert store.degrees(nodes).tolist() == expected.degrees(nodes).tolist()
@@ -0,0 +1,50 @@
+import json
+import networkx as nx
+import pytest
+from data_structures.graph import Graph, GraphProperties
+
+
+def replace_from_dict(graph, other, tmp_path):
+    graph.from_dict(nx.node_link_data(other))
+
+
+def replace_with_setter(graph, other, tmp_path):
+    graph.graph = other
+
+
+def replace_from_json(graph, other, tmp_path):
+    path = tmp_path / "graph.json"
+    path.write_text(json.dumps(nx.node_link_data(other)))
+    graph.load(str(path))
+
+
+def replace_from_snapshot(graph, other, tmp_path):
+    loaded = Graph(GraphProperties(directed=True, backend="csr"))
+    loaded.graph = other
+    loaded.save(str(tmp_path / "snapshot"), format="columnar")
+    graph.load(str(tmp_path / "snapshot"))
+
+
+@pytest.mark.parametrize("backend", ["csr", "networkx"])
+@pytest.mark.parametrize("replace", [replace_from_dict, replace_with_setter, replace_from_json, replace_from_snapshot])
+def test_replacing_the_graph_survives_a_restart(tmp_path, backend, replace):
+    directory = str(tmp_path / "log")
+    graph = Graph(GraphProperties(directed=True, backend=backend))
+    graph.add_node("old")
+    graph.open_delta_log(directory)
+    graph.add_node("old2")
+    replace(graph, nx.DiGraph([("x", "y")]), tmp_path)
+    graph.add_edge("y", "z")
+    graph.close_delta_log()
+
+    restored = Graph(GraphProperties(directed=True, backend=backend))
+    restored.open_delta_log(directory)
+    assert sorted(restored.graph.nodes) == ["x", "y", "z"]
+    assert sorted(restored.graph.edges) == [("x", "y"), ("y", "z")]
+    restored.compact(wait=True)
+    restored.close_delta_log()
+
+    compacted = Graph(GraphProperties(directed=True, backend=backend))
+    compacted.open_delta_log(directory)
+    assert sorted(compacted.graph.edges) == [("x", "y"), ("y", "z")]
+    compacted.close_delta_log()
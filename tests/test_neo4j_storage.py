@@ -0,0 +1,238 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+from data_structures.neo4j_storage import InMemoryClient, Neo4jClient, Neo4jStorage
+from data_structures.storage import NetworkXStorage
+
+
+def storage(directed=True, client=None, **options):
+    return Neo4jStorage(directed, client if client is not None else InMemoryClient(directed), **options)
+
+
+def test_writes_are_buffered_until_a_read():
+    store = storage(batch_size=100)
+    store.add_nodes_frame(np.array(["a", "b", "c"]), pd.DataFrame({"kind": ["x", "y", "z"]}))
+    store.add_edge("a", "b", {})
+    assert store.client.transactions == 0
+    assert store.has_node("a")
+    assert store.client.transactions == 2
+
+
+def test_flush_sends_one_statement_per_run_and_batch():
+    store = storage(batch_size=3)
+    store.add_nodes_frame(np.arange(7), pd.DataFrame(index=range(7)))
+    # The buffer passed batch_size: 7 rows as 3 + 3 + 1
+    assert store.client.transactions == 3
+    store.add_node("a", {})
+    store.add_node("b", {})
+    store.add_edge("a", "b", {})
+    store.remove_edge("a", "b")
+    # remove_edge checks the edge exists, which flushes the two runs before it
+    assert store.client.transactions == 5
+    store.flush()
+    assert store.client.transactions == 6
+    assert store.client.counts() == (9, 0)
+
+
+def test_cached_reads_skip_the_database():
+    store = storage()
+    store.add_node("a", {"x": 1})
+    store.add_edge("a", "b", {})
+    assert store.node_attributes("a") == {"x": 1}
+    assert store.neighbors("a") == ["b"]
+    reads = store.client.reads
+    assert store.node_attributes("a") == {"x": 1}
+    assert store.neighbors("a") == ["b"]
+    assert store.client.reads == reads
+
+
+def test_staleness_checks_cost_a_round_trip():
+    store = storage(max_staleness=0)
+    store.add_node("a", {})
+    store.node_attributes("a")
+    reads = store.client.reads
+    store.node_attributes("a")
+    assert store.client.reads == reads + 1
+
+
+def test_own_mutations_evict_cached_entries():
+    store = storage()
+    store.add_node("a", {"x": 1})
+    store.add_edge("a", "b", {})
+    store.node_attributes("a"), store.neighbors("a"), store.predecessors("b")
+    store.add_node("a", {"x": 2})
+    store.add_edge("a", "c", {})
+    assert store.node_attributes("a") == {"x": 2}
+    assert sorted(store.neighbors("a")) == ["b", "c"]
+    store.remove_edge("a", "b")
+    assert store.neighbors("a") == ["c"]
+    assert store.predecessors("b") == []
+
+
+def test_least_recently_used_entries_are_evicted():
+    store = storage(cache_size=2)
+    for node in "abc":
+        store.add_node(node, {})
+    store.node_attributes("a")
+    store.node_attributes("b")
+    store.node_attributes("c")
+    assert len(store.cache.entries) == 2
+    reads = store.client.reads
+    store.node_attributes("c")
+    assert store.client.reads == reads
+    store.node_attributes("a")
+    assert store.client.reads == reads + 1
+
+
+def test_other_writers_invalidate_the_cache():
+    client = InMemoryClient(directed=True)
+    first, second = storage(client=client), storage(client=client, max_staleness=0)
+    first.add_node("a", {"x": 1})
+    first.add_edge("a", "b", {})
+    first.flush()
+    assert second.neighbors("a") == ["b"]
+    assert second.node_attributes("a") == {"x": 1}
+    assert len(second.node_ids()) == 2
+    first.add_edge("a", "c", {})
+    first.add_node("a", {"x": 2})
+    first.flush()
+    assert sorted(second.neighbors("a")) == ["b", "c"]
+    assert second.node_attributes("a") == {"x": 2}
+    assert len(second.node_ids()) == 3
+    assert second.to_networkx().has_edge("a", "c")
+
+
+def test_max_staleness_defers_the_version_check():
+    client = InMemoryClient(directed=True)
+    first, second = storage(client=client), storage(client=client, max_staleness=3600)
+    first.add_edge("a", "b", {})
+    first.flush()
+    assert second.neighbors("a") == ["b"]
+    first.add_edge("a", "c", {})
+    first.flush()
+    assert second.neighbors("a") == ["b"]
+
+
+def build(store, edges):
+    for node in range(6):
+        store.add_node(node, {"kind": "even" if node % 2 == 0 else "odd"})
+    for source, target in edges:
+        store.add_edge(source, target, {"weight": float(source + target)})
+
+
+def assert_same(store, expected):
+    assert sorted(store.node_ids()) == sorted(expected.node_ids())
+    assert store.number_of_nodes() == expected.number_of_nodes()
+    assert store.number_of_edges() == expected.number_of_edges()
+    for node in expected.node_ids():
+        assert sorted(store.neighbors(node)) == sorted(expected.neighbors(node))
+        assert sorted(store.predecessors(node)) == sorted(expected.predecessors(node))
+        assert store.node_attributes(node) == expected.node_attributes(node)
+    assert nx.utils.edges_equal(store.to_networkx().edges(data=True), expected.to_networkx().edges(data=True))
+
+
+@pytest.mark.parametrize("directed", [True, False])
+def test_removals_match_networkx_storage(directed):
+    edges = [(0, 1), (1, 2), (2, 0), (2, 3), (3, 4), (4, 5), (5, 3), (1, 4)]
+    store, expected = storage(directed), NetworkXStorage(directed)
+    build(store, edges)
+    build(expected, edges)
+    assert_same(store, expected)
+    for other in (store, expected):
+        other.remove_edge(1, 2)
+        other.remove_node(3)
+    assert_same(store, expected)
+    assert store.has_edge(1, 4) and not store.has_edge(1, 2)
+    if not directed:
+        store.remove_edge(4, 1)
+        expected.remove_edge(4, 1)
+        assert_same(store, expected)
+
+
+@pytest.mark.parametrize("directed", [True, False])
+def test_missing_nodes_and_edges_raise_like_networkx_storage(directed):
+    store, expected = storage(directed), NetworkXStorage(directed)
+    build(store, [(0, 1)])
+    build(expected, [(0, 1)])
+    for other in (store, expected):
+        with pytest.raises(nx.NetworkXError):
+            other.remove_node(9)
+        with pytest.raises(nx.NetworkXError):
+            other.remove_edge(0, 2)
+        with pytest.raises(nx.NetworkXError):
+            other.neighbors(9)
+
+
+class FakeTransaction:
+    def __init__(self, driver):
+        self.driver = driver
+        self.statements = []
+
+    def run(self, query, **params):
+        self.statements.append(query)
+        return FakeResult(self.driver)
+
+
+class FakeResult:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def consume(self):
+        pass
+
+    def single(self):
+        self.driver.version += 1
+        return {"version": self.driver.version}
+
+    def __iter__(self):
+        return iter([{"version": self.driver.version}])
+
+
+class FakeSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def _transaction(self, work, log):
+        tx = FakeTransaction(self.driver)
+        result = work(tx)
+        log.append(tx.statements)
+        return result
+
+    def execute_write(self, work):
+        return self._transaction(work, self.driver.writes)
+
+    def execute_read(self, work):
+        return self._transaction(work, self.driver.reads)
+
+
+class FakeDriver:
+    def __init__(self):
+        self.writes = []
+        self.reads = []
+        self.version = 0
+
+    def session(self, database=None):
+        return FakeSession(self)
+
+
+def test_client_keeps_schema_changes_out_of_data_transactions():
+    driver = FakeDriver()
+    client = Neo4jClient(driver, directed=True)
+    assert len(driver.writes) == 1
+    assert len(driver.writes[0]) == 1 and driver.writes[0][0].startswith("CREATE CONSTRAINT")
+    assert client.merge_nodes([{"id": "a", "attrs": {}}]) == 1
+    assert client.merge_edges([{"source": "a", "target": "b", "attrs": {}}]) == 2
+    for statements in driver.writes[1:]:
+        assert len(statements) == 2
+        assert statements[0].startswith("UNWIND $rows")
+        assert "GraphVersion" in statements[1]
+        assert not any("CONSTRAINT" in statement for statement in statements)
+    assert client.version() == 2
+    assert driver.reads == [["MATCH (v:GraphVersion {label: $label}) RETURN v.version AS version"]]
@@ -0,0 +1,62 @@
+import networkx as nx
+import pytest
+from data_structures.csr import CSRStorage
+from data_structures.snapshot import read_snapshot, write_snapshot
+
+
+def build(directed):
+    storage = CSRStorage(directed)
+    storage.add_node("a", {"asset_type": "server", "risk": 2.5, "tags": ["web", "dmz"]})
+    storage.add_node(("b", 1), {"asset_type": "threat", "tags": {"source": "feed"}})
+    storage.add_node(7, {"risk": 4})
+    storage.add_edge("a", ("b", 1), {"name": "threatens", "risk_score": 9.0})
+    storage.add_edge(7, "a", {"name": "connects", "ports": [22, 443]})
+    storage.add_edge(7, 7, {"name": "loop"})
+    storage.remove_node(7)
+    storage.add_node(8, {})
+    storage.add_edge(8, "a", {"name": "connects"})
+    return storage
+
+
+def assert_same(loaded, expected):
+    assert nx.utils.nodes_equal(loaded.to_networkx().nodes(data=True), expected.to_networkx().nodes(data=True))
+    assert nx.utils.edges_equal(loaded.to_networkx().edges(data=True), expected.to_networkx().edges(data=True))
+
+
+@pytest.mark.parametrize("directed", [True, False])
+@pytest.mark.parametrize("mmap", [True, False])
+def test_snapshot_round_trip(tmp_path, directed, mmap):
+    expected = build(directed)
+    write_snapshot(expected, str(tmp_path))
+    loaded = read_snapshot(str(tmp_path), mmap=mmap)
+    assert_same(loaded, expected)
+    assert loaded.number_of_nodes() == expected.number_of_nodes()
+    assert loaded.node_attributes(("b", 1)) == {"asset_type": "threat", "tags": {"source": "feed"}}
+    assert not loaded.has_node(7)
+    assert sorted(map(str, loaded.neighbors("a"))) == sorted(map(str, expected.neighbors("a")))
+
+
+def test_snapshot_is_decoded_on_access(tmp_path):
+    write_snapshot(build(True), str(tmp_path))
+    loaded = read_snapshot(str(tmp_path))
+    # Nothing is decoded until a node is looked up by id
+    assert not isinstance(loaded.ids, dict)
+    assert loaded.number_of_nodes() == 3
+    tags = loaded.node_attrs.columns["tags"]
+    assert tags.get(0) == ["web", "dmz"] and tags._data is None
+    assert loaded.has_node("a")
+    assert isinstance(loaded.ids, dict)
+
+
+def test_loaded_snapshot_accepts_writes(tmp_path):
+    expected = build(False)
+    write_snapshot(expected, str(tmp_path / "first"))
+    loaded = read_snapshot(str(tmp_path / "first"))
+    for storage in (loaded, expected):
+        storage.add_node("c", {"tags": ["new"]})
+        storage.add_edge("c", ("b", 1), {"name": "connects"})
+        storage.add_node("a", {"tags": ["changed"]})
+        storage.remove_edge(8, "a")
+    assert_same(loaded, expected)
+    write_snapshot(loaded, str(tmp_path / "second"))
+    assert_same(read_snapshot(str(tmp_path / "second")), expected)